@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional
+
+from PIL import Image
+from pydantic import BaseModel
+
+_active_cache: ContextVar[Optional["InferenceRequestCache"]] = ContextVar(
+    "inference_request_cache", default=None
+)
+_prefetching: ContextVar[bool] = ContextVar("inference_prefetching", default=False)
+
+
+@dataclass
+class InferenceCacheStats:
+    # Requests made by callers, not counting prefetches
+    requests: int = 0
+    hits: int = 0
+    prefetched: int = 0
+    # Request time callers did not spend waiting, compared to each caller
+    # running its own request
+    saved_seconds: float = 0.0
+
+
+class InferenceRequestCache:
+    """Shares inference requests between callers within one scope (a chat turn).
+
+    Requests are keyed by method and arguments, with images keyed by their
+    pixels, so identical requests run once. Requests started ahead of time
+    with `prefetch` are awaited by the first caller that makes the same
+    request. A failed request is not shared; callers retry it themselves.
+    A request is cancelled when every caller waiting for it is cancelled.
+
+    Generative requests sample a new result on every call, so they are
+    never shared: each prefetched one is claimed by a single caller (see
+    `claim`), and identical calls still get different results.
+    """
+
+    def __init__(self) -> None:
+        self._requests: Dict[Hashable, asyncio.Task] = {}
+        # Prefetched generative requests no caller has claimed yet
+        self._unclaimed: Dict[Hashable, List[asyncio.Task]] = {}
+        self._durations: Dict[asyncio.Task, float] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.stats = InferenceCacheStats()
+
+    def prefetch(self, request: Awaitable[Any]) -> asyncio.Task:
+        """Start an inference client call in the background under this cache."""
+
+        async def run() -> Any:
+            _prefetching.set(True)
+            try:
+                return await request
+            except Exception:
+                # The caller that needs the result repeats the request
+                return None
+
+        self.stats.prefetched += 1
+        return self.run_in_background(run())
+
+    def run_in_background(self, work: Awaitable[Any]) -> asyncio.Task:
+        """Run work as a task under this cache."""
+
+        async def run() -> Any:
+            with use_inference_cache(self):
+                return await work
+
+        return asyncio.create_task(run())
+
+    async def get(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        counted = not _prefetching.get()
+        task = self._requests.get(key)
+        if task is not None and not _has_failed(task):
+            self.stats.hits += counted
+        else:
+            task = self._start(call)
+            self._requests[key] = task
+        self.stats.requests += counted
+
+        start = time.perf_counter()
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()
+                if self._requests.get(key) is task:
+                    del self._requests[key]
+            raise
+        except Exception:
+            # Let this caller see the failure, but never share it
+            if self._requests.get(key) is task:
+                del self._requests[key]
+            raise
+        finally:
+            self._waiters[task] -= 1
+        if counted:
+            waited = time.perf_counter() - start
+            duration = self._durations.get(task, waited)
+            self.stats.saved_seconds += max(0.0, duration - waited)
+        return _copy_result(result)
+
+    async def claim(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Get the result of a request made for this caller alone.
+
+        A caller takes over a prefetched request with the same key, if one
+        is unclaimed, and otherwise makes its own request.
+        """
+        if _prefetching.get():
+            task = self._start(call)
+            self._unclaimed.setdefault(key, []).append(task)
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Nobody has claimed the request, so nobody needs it
+                if self._release(key, task):
+                    task.cancel()
+                raise
+
+        self.stats.requests += 1
+        task = self._take_unclaimed(key)
+        if task is not None:
+            self.stats.hits += 1
+        else:
+            task = self._start(call)
+
+        start = time.perf_counter()
+        result = await task
+        waited = time.perf_counter() - start
+        duration = self._durations.get(task, waited)
+        self.stats.saved_seconds += max(0.0, duration - waited)
+        return result
+
+    def cancel_pending(self) -> None:
+        tasks = [*self._requests.values()]
+        tasks += [task for unclaimed in self._unclaimed.values() for task in unclaimed]
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    def _start(self, call: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.create_task(call())
+        task.add_done_callback(self._get_timer())
+        return task
+
+    def _take_unclaimed(self, key: Hashable) -> Optional[asyncio.Task]:
+        unclaimed = self._unclaimed.get(key, [])
+        while unclaimed:
+            task = unclaimed.pop(0)
+            if not _has_failed(task):
+                return task
+        return None
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> bool:
+        unclaimed = self._unclaimed.get(key, [])
+        if task not in unclaimed:
+            return False
+        unclaimed.remove(task)
+        return True
+
+    def _get_timer(self) -> Callable[[asyncio.Task], None]:
+        start = time.perf_counter()
+
+        def record(task: asyncio.Task) -> None:
+            self._durations[task] = time.perf_counter() - start
+
+        return record
+
+
+@contextmanager
+def use_inference_cache(cache: Optional[InferenceRequestCache]) -> Iterator[None]:
+    token = _active_cache.set(cache)
+    try:
+        yield
+    finally:
+        _active_cache.reset(token)
+
+
+def get_inference_cache() -> Optional[InferenceRequestCache]:
+    return _active_cache.get()
+
+
+def shared_inference_request(method: Callable) -> Callable:
+    """Route a deterministic `InferenceClient` method through the active
+    request cache, sharing its results between identical calls."""
+    return _route_through_cache(method, InferenceRequestCache.get)
+
+
+def claimed_inference_request(method: Callable) -> Callable:
+    """Route a generative `InferenceClient` method through the active request
+    cache, which can prefetch it but gives each result to a single call."""
+    return _route_through_cache(method, InferenceRequestCache.claim)
+
+
+def _route_through_cache(method: Callable, request: Callable) -> Callable:
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        cache = _active_cache.get()
+        if cache is None:
+            return await method(self, *args, **kwargs)
+
+        # Key on the bound arguments so positional and keyword calls match
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = {
+            name: value for name, value in bound.arguments.items() if name != "self"
+        }
+        key = (method.__name__, _make_key(arguments))
+        return await request(cache, key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+def _make_key(value: Any) -> Hashable:
+    if isinstance(value, Image.Image):
+        digest = hashlib.blake2b(value.tobytes(), digest_size=16).hexdigest()
+        return ("image", value.mode, value.size, digest)
+    if isinstance(value, BaseModel):
+        return (type(value).__name__, value.model_dump_json())
+    if isinstance(value, dict):
+        return tuple(sorted((key, _make_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_make_key(item) for item in value)
+    return value
+
+
+def _has_failed(task: asyncio.Task) -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
+
+
+def _copy_result(result: Any) -> Any:
+    # Shared results must not leak mutations between callers
+    if isinstance(result, Image.Image):
+        return result.copy()
+    if isinstance(result, list):
+        return [_copy_result(item) for item in result]
+    return deepcopy(result)
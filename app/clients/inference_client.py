@@ -7,6 +7,10 @@ from zipfile import ZipFile
 import httpx
 from PIL import Image
 
+from app.clients.inference_cache import (
+    claimed_inference_request,
+    shared_inference_request,
+)
 from app.env import INFERENCE_API_URL
 from app.schemas.common_schemas import Box, GeneratedMask, MaskLabeledPoint
 
@@ -29,6 +33,7 @@ class InferenceClient:
     async def close(self):
         await self._client.aclose()
 
+    @shared_inference_request
     async def sam3_generate_mask(
         self,
         image: Image.Image,
@@ -59,6 +64,7 @@ class InferenceClient:
         mask_bytes = BytesIO(response.content)
         return Image.open(mask_bytes).convert("L")
 
+    @shared_inference_request
     async def sam3_generate_masks_by_text(
         self, image: Image.Image, text: str
     ) -> List[GeneratedMask]:
@@ -95,6 +101,7 @@ class InferenceClient:
 
         return masks
 
+    @shared_inference_request
     async def object_clear_inpaint(
         self, image: Image.Image, mask: Image.Image, prompt: str
     ) -> Image.Image:
@@ -124,6 +131,7 @@ class InferenceClient:
         result_bytes = BytesIO(response.content)
         return Image.open(result_bytes).convert("RGB")
 
+    @claimed_inference_request
     async def flux_generate(self, prompt: str) -> Image.Image:
         """Generate an image from a text prompt using Flux."""
         url = f"{self._api_url}/flux/generate"
@@ -138,6 +146,7 @@ class InferenceClient:
         result_bytes = BytesIO(response.content)
         return Image.open(result_bytes).convert("RGB")
 
+    @claimed_inference_request
     async def gligen_inpaint(
         self,
         image: Image.Image,
@@ -183,6 +192,7 @@ class InferenceClient:
         result_bytes = BytesIO(response.content)
         return Image.open(result_bytes).convert("RGB")
 
+    @claimed_inference_request
     async def sd_inpaint(
         self,
         image: Image.Image,
@@ -240,6 +250,7 @@ class InferenceClient:
         result_bytes = BytesIO(response.content)
         return Image.open(result_bytes).convert("RGB")
 
+    @shared_inference_request
     async def aesthetic_regressor_score(
         self, image: Image.Image
     ) -> dict:
@@ -0,0 +1,247 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from chat2edit.models import Message
+
+_IMAGE_NAME_PATTERN = re.compile(r"image_(\d+)")
+# Referenced variables that are not objects cannot be edited without segmenting
+_NON_OBJECT_NAME_PATTERN = re.compile(r"(?:box|point|scribble|text)_\d+")
+
+_TARGET = (
+    r"(?:(?P<pronoun>it)|(?:the |this )?(?:image|photo|picture)"
+    r"|@(?P<target>[a-z_][a-z0-9_]*))"
+)
+_AMOUNT = r"(?P<amount>\d+(?:\.\d+)?) ?(?:%|percent)"
+_ANGLE = r"(?P<angle>\d+(?:\.\d+)?)(?: ?(?:degrees?|°))?"
+
+_DECREASE_VERBS = frozenset({"decrease", "reduce", "lower", "darken"})
+_COUNTERCLOCKWISE = frozenset(
+    {"counterclockwise", "counter-clockwise", "anticlockwise", "ccw"}
+)
+
+
+@dataclass(frozen=True)
+class ParsedCommand:
+    thinking: str
+    code: str
+
+    def to_answer(self) -> str:
+        """Render as an answer in the format the prompt asks the LLM for."""
+        return f"thinking: {self.thinking}\ncommands:\n```python\n{self.code}\n```"
+
+
+@dataclass(frozen=True)
+class _Target:
+    image: str
+    # Referenced object, None for the whole image
+    entity: Optional[str]
+    output: str
+
+    @property
+    def description(self) -> str:
+        return "the object" if self.entity else "the image"
+
+
+def parse_command(
+    request: Message, names: Iterable[str], follow_up: bool = False
+) -> Optional[ParsedCommand]:
+    """Parse a simple edit request into the program the LLM would write.
+
+    Only requests matching one of the command patterns as a whole are
+    parsed, on a single attached image or an object referenced in it,
+    so anything ambiguous is left to the LLM.
+
+    Args:
+        request: The contextualized request
+        names: Names already bound in the context, to pick an unused name
+            for the edited image
+        follow_up: Whether earlier turns exist, where "it" can refer to
+            something other than the image
+    """
+    text = _normalize(request.text)
+    for pattern, create_command in _RULES:
+        match = pattern.fullmatch(text)
+        if match is None:
+            continue
+        if follow_up and match.groupdict().get("pronoun"):
+            return None
+        target = _resolve_target(request, match.groupdict().get("target"), names)
+        if target is None:
+            return None
+        return create_command(match, target)
+    return None
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    text = re.sub(r"^(?:please,? )|(?:,? please)$", "", text)
+    return text.rstrip(".!")
+
+
+def _resolve_target(
+    request: Message, target: Optional[str], names: Iterable[str]
+) -> Optional[_Target]:
+    images = [name for name in request.attachments if _IMAGE_NAME_PATTERN.fullmatch(name)]
+    if len(images) != 1:
+        return None
+
+    image = images[0]
+    if target is None or target == image:
+        entity = None
+    elif target in request.attachments and not _NON_OBJECT_NAME_PATTERN.fullmatch(target):
+        entity = target
+    else:
+        return None
+
+    indices = [
+        int(match.group(1))
+        for name in [*names, *request.attachments]
+        if (match := _IMAGE_NAME_PATTERN.fullmatch(name))
+    ]
+    return _Target(image, entity, f"image_{max(indices, default=-1) + 1}")
+
+
+def _create_program(target: _Target, call: str, response: str) -> str:
+    return (
+        f"{target.output} = {call}\n"
+        f"respond_user(text={response!r}, attachments=[{target.output}])"
+    )
+
+
+def _create_filter_adjustment(match: re.Match, target: _Target) -> Optional[ParsedCommand]:
+    filter_name = match.group("filter") or "brightness"
+    decrease = match.group("verb") in _DECREASE_VERBS
+    amount = float(match.group("amount"))
+    value = round(-amount / 100 if decrease else amount / 100, 4)
+    if not 0 < abs(value) <= 1 or (filter_name == "blur" and value < 0):
+        return None
+
+    change = "decreased" if decrease else "increased"
+    entities = f", entities=[{target.entity}]" if target.entity else ""
+    call = (
+        f"apply_filter({target.image}, filter_name={filter_name!r}, "
+        f"filter_value={value}{entities})"
+    )
+    return ParsedCommand(
+        thinking=(
+            f"The user wants the {filter_name} of {target.description} {change} "
+            f"by {amount:g}%. I should apply a {filter_name} filter with value {value}."
+        ),
+        code=_create_program(
+            target, call, f"The {filter_name} has been {change} by {amount:g}%"
+        ),
+    )
+
+
+def _create_simple_filter(
+    filter_name: str, effect: str
+) -> Callable[[re.Match, _Target], ParsedCommand]:
+    def create_command(match: re.Match, target: _Target) -> ParsedCommand:
+        entities = f", entities=[{target.entity}]" if target.entity else ""
+        call = f"apply_filter({target.image}, filter_name={filter_name!r}{entities})"
+        return ParsedCommand(
+            thinking=(
+                f"The user wants {target.description} {effect}. "
+                f"I should apply the {filter_name} filter."
+            ),
+            code=_create_program(
+                target, call, f"{target.description.capitalize()} has been {effect}"
+            ),
+        )
+
+    return create_command
+
+
+def _create_flip(match: re.Match, target: _Target) -> Optional[ParsedCommand]:
+    # flip_entities only transforms the image's objects, never the base image
+    if target.entity is None:
+        return None
+
+    vertical = "vertically" in match.group(0) or "upside down" in match.group(0)
+    axis = "y" if vertical else "x"
+    direction = "vertically" if vertical else "horizontally"
+    call = (
+        f"flip_entities({target.image}, entities=[{target.entity}], axes=[{axis!r}])"
+    )
+    return ParsedCommand(
+        thinking=(
+            f"The user wants {target.description} flipped {direction}. "
+            f"I should flip it along the {axis} axis."
+        ),
+        code=_create_program(
+            target, call, f"{target.description.capitalize()} has been flipped {direction}"
+        ),
+    )
+
+
+def _create_rotation(match: re.Match, target: _Target) -> Optional[ParsedCommand]:
+    angle = float(match.group("angle"))
+    # rotate_entities only transforms the image's objects, never the base image
+    if target.entity is None or not 0 < angle < 360:
+        return None
+
+    direction = "ccw" if match.group("direction") in _COUNTERCLOCKWISE else "cw"
+    direction_name = "counterclockwise" if direction == "ccw" else "clockwise"
+    call = (
+        f"rotate_entities({target.image}, entities=[{target.entity}], "
+        f"angles=[{angle:g}], units=['degree'], directions=[{direction!r}])"
+    )
+    return ParsedCommand(
+        thinking=(
+            f"The user wants {target.description} rotated {angle:g} degrees "
+            f"{direction_name}."
+        ),
+        code=_create_program(
+            target,
+            call,
+            f"{target.description.capitalize()} has been rotated {angle:g} degrees "
+            f"{direction_name}",
+        ),
+    )
+
+
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern.format(target=_TARGET, amount=_AMOUNT, angle=_ANGLE))
+
+
+_BLACK_WHITE = r"(?:black and white|black & white|black-and-white|grayscale|greyscale|monochrome)"
+
+_RULES: List[Tuple[re.Pattern, Callable[[re.Match, _Target], Optional[ParsedCommand]]]] = [
+    (
+        _compile(
+            r"(?P<verb>increase|raise|boost|decrease|reduce|lower) (?:the )?"
+            r"(?P<filter>brightness|contrast|saturation|blur)(?: of {target})? by {amount}"
+        ),
+        _create_filter_adjustment,
+    ),
+    (
+        _compile(r"(?P<verb>brighten|darken) {target} by {amount}(?P<filter>)"),
+        _create_filter_adjustment,
+    ),
+    (
+        _compile(r"(?:make|turn|convert) {target} (?:to |into )?" + _BLACK_WHITE),
+        _create_simple_filter("blackWhite", "converted to black and white"),
+    ),
+    (
+        _compile(r"invert (?:the colou?rs of )?{target}(?:'s colou?rs)?"),
+        _create_simple_filter("invert", "inverted"),
+    ),
+    (
+        _compile(r"invert the colou?rs"),
+        _create_simple_filter("invert", "inverted"),
+    ),
+    (
+        _compile(r"(?:flip|mirror) {target} (?:horizontally|vertically)"),
+        _create_flip,
+    ),
+    (_compile(r"(?:flip|turn) {target} upside down"), _create_flip),
+    (_compile(r"mirror {target}"), _create_flip),
+    (
+        _compile(
+            r"rotate {target}(?: by)? {angle}"
+            r"(?: (?P<direction>clockwise|counterclockwise|counter-clockwise|anticlockwise|cw|ccw))?"
+        ),
+        _create_rotation,
+    ),
+]
@@ -0,0 +1,57 @@
+import ast
+import textwrap
+from typing import List, Optional, Tuple
+
+COMMANDS_MARKER = "commands:"
+CODE_FENCE_START = "```python"
+CODE_FENCE_END = "```"
+
+
+def extract_streamed_statements(text: str) -> List[str]:
+    """Get the complete statements of the commands block in a partial answer.
+
+    Statements are normalized the way `DefaultExecutionStrategy.parse`
+    normalizes them, so they compare equal to the blocks of the final code.
+    A statement is complete once a newline ends it, or, for compound
+    statements, once the block is closed.
+    """
+    code, closed = _get_partial_commands(text)
+    if code is None:
+        return []
+
+    lines = code.split("\n")
+    if not closed:
+        # The last line is still being written
+        lines = lines[:-1]
+
+    while lines:
+        try:
+            tree = ast.parse(textwrap.dedent("\n".join(lines)))
+            break
+        except SyntaxError:
+            # A statement spans lines that have not all arrived
+            lines = lines[:-1]
+    else:
+        return []
+
+    nodes = tree.body
+    if not closed and nodes and hasattr(nodes[-1], "body"):
+        # More of its block can follow
+        nodes = nodes[:-1]
+    return [ast.unparse(node).strip() for node in nodes]
+
+
+def _get_partial_commands(text: str) -> Tuple[Optional[str], bool]:
+    marker = text.rfind(COMMANDS_MARKER)
+    if marker == -1:
+        return None, False
+
+    start = text.find(CODE_FENCE_START, marker)
+    if start == -1:
+        return None, False
+
+    code = text[start + len(CODE_FENCE_START) :]
+    end = code.find(CODE_FENCE_END)
+    if end != -1:
+        return code[:end].strip("\n"), True
+    return code.lstrip("\n"), False
@@ -0,0 +1,181 @@
+import ast
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# Calling one of these ends the program: later statements never execute
+RESPONSE_FUNCTIONS = frozenset({"respond_user"})
+
+
+class UnsupportedExpressionError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class EditNode:
+    """One top-level statement of a generated program."""
+
+    index: int
+    code: str
+    # Names the statement binds and reads, and the functions it calls by name
+    targets: FrozenSet[str]
+    uses: FrozenSet[str]
+    calls: FrozenSet[str]
+    # Set when the statement is a single call `f(...)`, `x = f(...)` or the
+    # awaited form of either; `target` is `x`
+    function: Optional[str] = None
+    call: Optional[ast.Call] = None
+    target: Optional[str] = None
+    responds: bool = False
+
+
+class EditGraph:
+    """Def-use graph over the statements of a generated program.
+
+    Nodes are only ever executed in program order; the graph tells which
+    later statements already have their inputs, so their work can start
+    early, and which statements can never run.
+    """
+
+    def __init__(self, nodes: List[EditNode]) -> None:
+        self.nodes = nodes
+        self.end = next(
+            (node.index + 1 for node in nodes if node.responds), len(nodes)
+        )
+
+    def get_live_nodes(self, start: int = 0) -> List[EditNode]:
+        """Get the nodes from `start` that can execute, stopping at the response."""
+        return self.nodes[start : self.end]
+
+    def is_ready(self, index: int, next_index: int) -> bool:
+        """Whether the names node `index` reads are final once `next_index` is reached.
+
+        They are if no statement from `next_index` up to the node rebinds them.
+        Values can still be modified in place, so work started early has to be
+        checked against what the statement finally does.
+        """
+        uses = self.nodes[index].uses
+        return all(
+            not (node.targets & uses) for node in self.nodes[next_index:index]
+        )
+
+    def can_run_early(
+        self, index: int, next_index: int, effect_free_functions: FrozenSet[str]
+    ) -> bool:
+        """Whether node `index` can run before the nodes from `next_index`.
+
+        It can if none of them binds a name it reads, and all of them only
+        call `effect_free_functions`, which modify nothing in place.
+        Values are shared between variables (an object is also a child of its
+        image), so any in-place modification could reach the node's inputs.
+        Binding the node's own target late keeps later reads of the old value
+        intact.
+        """
+        return self.is_ready(index, next_index) and all(
+            node.calls and node.calls <= effect_free_functions
+            for node in self.nodes[next_index:index]
+        )
+
+
+def build_edit_graph(codes: List[str]) -> EditGraph:
+    return EditGraph([_create_node(index, code) for index, code in enumerate(codes)])
+
+
+def evaluate_call_arguments(
+    call: ast.Call, namespace: Dict[str, Any]
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """Evaluate the arguments of a call made of names and literals only.
+
+    Raises:
+        UnsupportedExpressionError: If an argument could have side effects
+            or reads an unknown name
+    """
+    if any(keyword.arg is None for keyword in call.keywords):
+        raise UnsupportedExpressionError("Unpacked keyword arguments")
+
+    args = [_evaluate(arg, namespace) for arg in call.args]
+    kwargs = {
+        keyword.arg: _evaluate(keyword.value, namespace) for keyword in call.keywords
+    }
+    return args, kwargs
+
+
+def _create_node(index: int, code: str) -> EditNode:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return EditNode(index, code, frozenset(), frozenset(), frozenset())
+
+    targets, uses, calls = set(), set(), set()
+    has_other_calls = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            (uses if isinstance(node.ctx, ast.Load) else targets).add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            targets.add(node.name)
+        elif isinstance(node, ast.alias):
+            targets.add((node.asname or node.name).split(".")[0])
+        elif isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name):
+                calls.add(node.func.id)
+            else:
+                has_other_calls = True
+
+    call, target = _get_statement_call(tree)
+    return EditNode(
+        index=index,
+        code=code,
+        targets=frozenset(targets),
+        uses=frozenset(uses),
+        # Method calls are unknown functions
+        calls=frozenset(calls | ({"<method>"} if has_other_calls else set())),
+        function=call.func.id if call is not None else None,
+        call=call,
+        target=target,
+        responds=bool(calls & RESPONSE_FUNCTIONS),
+    )
+
+
+def _get_statement_call(tree: ast.Module) -> Tuple[Optional[ast.Call], Optional[str]]:
+    if len(tree.body) != 1:
+        return None, None
+
+    statement = tree.body[0]
+    target = None
+    if isinstance(statement, ast.Assign):
+        if len(statement.targets) != 1 or not isinstance(statement.targets[0], ast.Name):
+            return None, None
+        target = statement.targets[0].id
+        value = statement.value
+    elif isinstance(statement, ast.Expr):
+        value = statement.value
+    else:
+        return None, None
+
+    if isinstance(value, ast.Await):
+        value = value.value
+    if isinstance(value, ast.Call) and isinstance(value.func, ast.Name):
+        return value, target
+    return None, None
+
+
+def _evaluate(node: ast.expr, namespace: Dict[str, Any]) -> Any:
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id not in namespace:
+            raise UnsupportedExpressionError(f"Unknown name: {node.id}")
+        return namespace[node.id]
+    if isinstance(node, ast.List):
+        return [_evaluate(item, namespace) for item in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(_evaluate(item, namespace) for item in node.elts)
+    if isinstance(node, ast.Dict) and None not in node.keys:
+        return {
+            _evaluate(key, namespace): _evaluate(value, namespace)
+            for key, value in zip(node.keys, node.values)
+        }
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _evaluate(node.operand, namespace)
+        if isinstance(operand, (int, float)):
+            return -operand if isinstance(node.op, ast.USub) else operand
+    raise UnsupportedExpressionError(ast.dump(node))
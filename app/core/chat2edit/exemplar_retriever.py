@@ -0,0 +1,174 @@
+import ast
+import math
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+from chat2edit.models import Exemplar
+
+_WORD_PATTERN = re.compile(r"[a-z0-9_]+")
+_CAMEL_CASE_PATTERN = re.compile(r"([a-z])([A-Z])")
+# Common words, and words every editing request shares
+_STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+        "have", "i", "image", "in", "is", "it", "its", "make", "me", "my", "of",
+        "on", "or", "photo", "picture", "please", "the", "this", "to", "with",
+        "you",
+    }
+)
+_SUFFIXES = ("ness", "ing", "est", "er", "ed", "ly", "es", "s")
+
+
+class ExemplarRetriever:
+    """Selects the exemplars most relevant to a request with BM25.
+
+    Each exemplar is indexed by its request texts, its thinking, and the
+    functions and string arguments of its commands, so a request for
+    "remove the dog" ranks exemplars calling `remove_entities` and
+    mentioning removal first.
+    """
+
+    def __init__(
+        self, exemplars: List[Exemplar], k1: float = 1.5, b: float = 0.75
+    ) -> None:
+        self.exemplars = exemplars
+        self.token_counts = [
+            estimate_tokens(_get_exemplar_text(exemplar)) for exemplar in exemplars
+        ]
+
+        documents = [_tokenize(_get_exemplar_document(e)) for e in exemplars]
+        self._vocabulary: Dict[str, int] = {}
+        for document in documents:
+            for term in document:
+                self._vocabulary.setdefault(term, len(self._vocabulary))
+
+        frequencies = np.zeros((len(documents), len(self._vocabulary)))
+        for row, document in enumerate(documents):
+            for term in document:
+                frequencies[row, self._vocabulary[term]] += 1
+
+        lengths = frequencies.sum(axis=1, keepdims=True)
+        average_length = max(float(lengths.mean()), 1.0) if len(documents) else 1.0
+        document_frequencies = (frequencies > 0).sum(axis=0)
+        self._idf = np.log(
+            1 + (len(documents) - document_frequencies + 0.5)
+            / (document_frequencies + 0.5)
+        )
+        # Term weights per document, so scoring a query is a single sum
+        self._weights = (
+            frequencies
+            * (k1 + 1)
+            / (frequencies + k1 * (1 - b + b * lengths / average_length))
+        )
+
+    def score(self, query: str) -> np.ndarray:
+        columns = [
+            self._vocabulary[term]
+            for term in _tokenize(query)
+            if term in self._vocabulary
+        ]
+        if not columns:
+            return np.zeros(len(self.exemplars))
+        return self._weights[:, columns] @ self._idf[columns]
+
+    def select(
+        self, query: str, top_k: int, token_budget: Optional[int] = None
+    ) -> List[Exemplar]:
+        """Get up to `top_k` relevant exemplars that fit in `token_budget`.
+
+        The best match is always included so the answer format is shown.
+        Exemplars keep their original order, so the same selection always
+        renders the same prompt.
+        """
+        if not self.exemplars:
+            return []
+
+        scores = self.score(query)
+        ranking = sorted(range(len(self.exemplars)), key=lambda i: (-scores[i], i))
+
+        selected = [ranking[0]]
+        tokens = self.token_counts[ranking[0]]
+        for index in ranking[1:]:
+            if len(selected) >= top_k or scores[index] <= 0:
+                break
+            if token_budget is not None and tokens + self.token_counts[index] > token_budget:
+                continue
+            selected.append(index)
+            tokens += self.token_counts[index]
+
+        return [self.exemplars[index] for index in sorted(selected)]
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text and code
+    return math.ceil(len(text) / 4)
+
+
+def _tokenize(text: str) -> List[str]:
+    terms = []
+    text = _CAMEL_CASE_PATTERN.sub(r"\1_\2", text)
+    for word in _WORD_PATTERN.findall(text.lower()):
+        # Function names also match their parts: segment_object -> segment, object
+        parts = [word, *word.split("_")] if "_" in word else [word]
+        for part in parts:
+            if not part or part in _STOPWORDS or part.isdigit():
+                continue
+            terms.append(_stem(part))
+    return terms
+
+
+def _stem(word: str) -> str:
+    # Crude suffix stripping, enough to match brighter with brightness
+    for suffix in _SUFFIXES:
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def _get_exemplar_document(exemplar: Exemplar) -> str:
+    texts = []
+    for chat_cycle in exemplar.cycles:
+        texts.append(chat_cycle.request.text)
+        for prompt_cycle in chat_cycle.cycles:
+            for exchange in prompt_cycle.exchanges:
+                if exchange.answer:
+                    texts.append(_get_thinking(exchange.answer.text))
+            for block in prompt_cycle.blocks:
+                texts.extend(_get_command_terms(block.generated_code))
+    return "\n".join(texts)
+
+
+def _get_exemplar_text(exemplar: Exemplar) -> str:
+    texts = []
+    for chat_cycle in exemplar.cycles:
+        texts.append(chat_cycle.request.text)
+        for prompt_cycle in chat_cycle.cycles:
+            for exchange in prompt_cycle.exchanges:
+                if exchange.answer:
+                    texts.append(exchange.answer.text)
+            for block in prompt_cycle.blocks:
+                if block.feedback:
+                    texts.append(block.feedback.model_dump_json())
+                if block.response:
+                    texts.append(block.response.text)
+    return "\n".join(texts)
+
+
+def _get_thinking(answer: str) -> str:
+    return answer.split("commands:")[0].replace("thinking:", "")
+
+
+def _get_command_terms(code: str) -> List[str]:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+
+    terms = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            terms.append(node.func.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            terms.append(node.value)
+    return terms
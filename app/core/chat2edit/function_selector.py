@@ -0,0 +1,147 @@
+import ast
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Set
+
+from chat2edit.models import ChatCycle, Exemplar
+
+# Shown in every prompt
+CORE_FUNCTIONS = frozenset({"respond_user"})
+
+# Word prefixes in a request that call for each function
+FUNCTION_KEYWORDS: Dict[str, tuple] = {
+    "apply_filter": (
+        "bright", "dark", "dim", "light", "contrast", "saturat", "vivid", "dull",
+        "blur", "sharp", "black", "white", "gray", "grey", "monochrom",
+        "invert", "negative", "filter", "colo",
+    ),
+    "remove_entities": ("remov", "delet", "eras", "rid", "eliminat", "clear"),
+    "replace_entities": ("replac", "swap", "substitut", "exchang"),
+    "inpaint_objects": ("replac", "chang", "transform", "turn", "fill", "inpaint"),
+    "rotate_entities": (
+        "rotat", "turn", "spin", "tilt", "degree", "clockwise", "counterclockwise",
+    ),
+    "flip_entities": ("flip", "mirror", "upside", "horizontal", "vertical"),
+    "shift_entities": (
+        "mov", "shift", "nudg", "drag", "left", "right", "up", "down", "higher",
+        "lower",
+    ),
+    "scale_entities": (
+        "scal", "resiz", "big", "small", "larg", "enlarg", "shrink", "size",
+        "twice", "half", "doubl", "zoom",
+    ),
+    "paste_entities": ("past", "copy", "put", "place", "insert", "duplicat", "clon", "add"),
+    "generate_objects": ("add", "generat", "creat", "draw", "insert", "put", "place"),
+    "generate_object": ("add", "generat", "creat", "draw", "insert"),
+}
+
+# Functions that produce the inputs of each function
+FUNCTION_DEPENDENCIES: Dict[str, tuple] = {
+    "apply_filter": (),
+    "remove_entities": ("segment_objects", "segment_object"),
+    "replace_entities": ("segment_objects", "segment_object"),
+    "inpaint_objects": ("segment_objects", "segment_object"),
+    "rotate_entities": ("segment_objects", "segment_object"),
+    "flip_entities": ("segment_objects", "segment_object"),
+    "shift_entities": ("segment_objects", "segment_object"),
+    "scale_entities": ("segment_objects", "segment_object"),
+    "paste_entities": ("segment_objects", "segment_object", "get_box"),
+    "generate_objects": ("get_box",),
+    "generate_object": (),
+}
+
+# Functions that take each kind of attached reference
+REFERENCE_FUNCTIONS: Dict[str, tuple] = {
+    "box": ("segment_object",),
+    "point": ("segment_object",),
+    "scribble": ("segment_object", "generate_object"),
+}
+
+_WORD_PATTERN = re.compile(r"[a-z]+")
+_REFERENCE_PATTERN = re.compile(r"\b(box|point|scribble)_\d+\b")
+_NAME_ERROR_PATTERN = re.compile(r"name '(\w+)' is not defined")
+
+
+def select_prompt_functions(
+    cycles: List[ChatCycle], exemplars: List[Exemplar], context: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Get the functions of `context` the current request needs to see.
+
+    The request is matched against keywords per function, and the functions
+    producing their inputs and those the exemplars call are added, so the
+    prompt never shows code calling a function it does not describe.
+    The full context is returned when no function matches, and for the rest
+    of a turn once the model has called a function it was not shown.
+    Order follows `context`, so a selection always renders the same prompt.
+    """
+    if not cycles:
+        return context
+
+    chat_cycle = cycles[-1]
+    request = chat_cycle.request
+    text = " ".join([request.text, *request.attachments])
+
+    selected = _match_functions(text)
+    if not selected:
+        return context
+
+    for reference in _REFERENCE_PATTERN.findall(text):
+        selected.update(REFERENCE_FUNCTIONS[reference])
+    for function in list(selected):
+        selected.update(FUNCTION_DEPENDENCIES.get(function, ()))
+    for exemplar in exemplars:
+        selected.update(_get_exemplar_functions(exemplar))
+    selected.update(CORE_FUNCTIONS)
+
+    if _get_unselected_calls(chat_cycle, selected, context):
+        return context
+    return {name: value for name, value in context.items() if name in selected}
+
+
+def _match_functions(text: str) -> Set[str]:
+    words = _WORD_PATTERN.findall(text.lower())
+    return {
+        function
+        for function, keywords in FUNCTION_KEYWORDS.items()
+        if any(word.startswith(keywords) for word in words)
+    }
+
+
+def _get_unselected_calls(
+    chat_cycle: ChatCycle, selected: Set[str], context: Dict[str, Any]
+) -> Set[str]:
+    # Functions the model called in this turn that were hidden or do not exist
+    calls: Set[str] = set()
+    for prompt_cycle in chat_cycle.cycles:
+        for block in prompt_cycle.blocks:
+            calls.update(
+                name
+                for name in get_called_functions(block.generated_code)
+                if name in context and name not in selected
+            )
+            if block.error is not None:
+                calls.update(_NAME_ERROR_PATTERN.findall(block.error.message))
+    return calls
+
+
+def _get_exemplar_functions(exemplar: Exemplar) -> FrozenSet[str]:
+    return frozenset(
+        name
+        for chat_cycle in exemplar.cycles
+        for prompt_cycle in chat_cycle.cycles
+        for block in prompt_cycle.blocks
+        for name in get_called_functions(block.generated_code)
+    )
+
+
+@lru_cache(maxsize=1024)
+def get_called_functions(code: str) -> FrozenSet[str]:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return frozenset()
+    return frozenset(
+        node.func.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+    )
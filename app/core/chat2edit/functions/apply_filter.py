@@ -1,4 +1,4 @@
-from typing import List, Literal, Optional, Union
+from typing import Awaitable, List, Literal, Optional, Union
 
 from chat2edit.execution.decorators import (
     feedback_empty_list_parameters,
@@ -10,6 +10,7 @@ from chat2edit.execution.exceptions import FeedbackException
 from chat2edit.execution.signaling import set_feedback
 from chat2edit.models import Feedback
 from chat2edit.prompting.stubbing.decorators import exclude_coroutine
+from PIL.Image import Image as PILImage
 
 from app.clients.inference_client import inference_client
 from app.core.chat2edit.models import Image, Object
@@ -21,9 +22,7 @@ from app.core.chat2edit.models.fabric.filters import (
     InvertFilter,
     SaturationFilter,
 )
-from app.core.chat2edit.utils import get_own_objects
-
-from copy import deepcopy
+from app.core.chat2edit.utils import get_own_objects, materialize_pending_inpaints
 
 
 @feedback_ignored_return_value
@@ -40,7 +39,7 @@ async def apply_filter(
     entities: Optional[List[Union[Image, Object]]] = None,
 ) -> Image:
     original_image = image
-    image = deepcopy(original_image)
+    image = original_image.snapshot()
     filter_obj = None
 
     if filter_value is not None:
@@ -100,15 +99,14 @@ async def apply_filter(
 
     # Check aesthetic scores for feedback (only for filters with values)
     # Only check if feedback hasn't been given yet for this image to avoid infinite feedback
-    if (filter_value is not None 
-        and filter_name in ["brightness", "saturation", "contrast"]
-        and not image.aesthetic_feedback_given):
+    if needs_aesthetic_check(image, filter_name, filter_value):
         try:
             # Get image BEFORE applying the new filter (current state)
             # We need to temporarily remove the filter we're about to apply
             # But actually, we should check BEFORE applying, so get current image state
+            image = await materialize_pending_inpaints(image)
             pil_image = image.get_image(apply_filters=False)
-            scores = await inference_client.aesthetic_regressor_score(pil_image)
+            scores = await create_apply_filter_request(pil_image)
             
             # Map filter names to aesthetic score keys
             filter_to_score_key = {
@@ -167,3 +165,21 @@ async def apply_filter(
         image = image.apply_filter(filter_obj)
 
     return image
+
+
+def create_apply_filter_request(image: PILImage) -> Awaitable[dict]:
+    """Start the aesthetic scoring request of `apply_filter` on the image
+    rendered without its filters."""
+    return inference_client.aesthetic_regressor_score(image)
+
+
+def needs_aesthetic_check(
+    image: Image, filter_name: str, filter_value: Optional[float]
+) -> bool:
+    """Whether `apply_filter` scores the image to give feedback on the value."""
+    return (
+        filter_value is not None
+        and -1.0 <= filter_value <= 1.0
+        and filter_name in ["brightness", "saturation", "contrast"]
+        and not image.aesthetic_feedback_given
+    )
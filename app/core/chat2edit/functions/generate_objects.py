@@ -1,7 +1,6 @@
-from typing import List
+from typing import Awaitable, List
 
 from chat2edit.execution.decorators import (
-    deepcopy_parameter,
     feedback_empty_list_parameters,
     feedback_ignored_return_value,
     feedback_invalid_parameter_type,
@@ -9,9 +8,12 @@ from chat2edit.execution.decorators import (
     feedback_mismatch_list_parameters,
 )
 from chat2edit.prompting.stubbing.decorators import exclude_coroutine
+from PIL.Image import Image as PILImage
 
 from app.clients.inference_client import inference_client
 from app.core.chat2edit.models import Box, Image
+from app.core.chat2edit.utils.decorators import snapshot_parameter
+from app.core.chat2edit.utils.inpaint_utils import materialize_pending_inpaints
 
 
 @feedback_ignored_return_value
@@ -20,14 +22,39 @@ from app.core.chat2edit.models import Box, Image
 @feedback_empty_list_parameters(["phrases", "locations"])
 @feedback_mismatch_list_parameters(["phrases", "locations"])
 @exclude_coroutine
-@deepcopy_parameter("image")
+@snapshot_parameter("image")
 async def generate_objects(
     image: Image,
     prompt: str,
     phrases: List[str],
     locations: List[Box],
 ) -> Image:
+    image = await materialize_pending_inpaints(image)
     pil_image = image.get_image()
+    result_image = await create_generate_objects_request(
+        pil_image, prompt, phrases, locations
+    )
+
+    image.set_image(result_image)
+    return image
+
+
+def create_generate_objects_request(
+    image: PILImage, prompt: str, phrases: List[str], locations: List[Box]
+) -> Awaitable[PILImage]:
+    """Start the GLIGEN request of `generate_objects` on the rendered image."""
+    return inference_client.gligen_inpaint(
+        image=image,
+        prompt=prompt,
+        phrases=phrases,
+        locations=_normalize_locations(image, locations),
+        seed=42,
+    )
+
+
+def _normalize_locations(
+    pil_image: PILImage, locations: List[Box]
+) -> List[List[float]]:
     img_width = pil_image.width
     img_height = pil_image.height
 
@@ -50,13 +77,4 @@ async def generate_objects(
         ]
         normalized_locations.append(normalized_box)
 
-    result_image = await inference_client.gligen_inpaint(
-        image=pil_image,
-        prompt=prompt,
-        phrases=phrases,
-        locations=normalized_locations,
-        seed=42,
-    )
-
-    image.set_image(result_image)
-    return image
+    return normalized_locations
@@ -1,7 +1,6 @@
 from typing import List
 
 from chat2edit.execution.decorators import (
-    deepcopy_parameter,
     feedback_empty_list_parameters,
     feedback_ignored_return_value,
     feedback_invalid_parameter_type,
@@ -13,10 +12,11 @@ from app.core.chat2edit.models.image import Image
 from app.core.chat2edit.models.object import Object
 from app.core.chat2edit.utils.inpaint_utils import inpaint_objects_with_prompt
 from app.core.chat2edit.utils.image_utils import get_own_objects
+from app.core.chat2edit.utils.decorators import snapshot_parameter
 
 
 @feedback_ignored_return_value
-@deepcopy_parameter("image")
+@snapshot_parameter("image")
 @feedback_unexpected_error
 @feedback_invalid_parameter_type
 @feedback_empty_list_parameters(["objects"])
@@ -1,7 +1,6 @@
 from typing import List, Literal, Optional, Tuple, Union
 
 from chat2edit.execution.decorators import (
-    deepcopy_parameter,
     feedback_empty_list_parameters,
     feedback_ignored_return_value,
     feedback_invalid_parameter_type,
@@ -11,10 +10,11 @@ from chat2edit.execution.decorators import (
 from chat2edit.prompting.stubbing.decorators import exclude_coroutine
 
 from app.core.chat2edit.models import Box, Image, Object, Point, Text
+from app.core.chat2edit.utils.decorators import snapshot_parameter
 
 
 @feedback_ignored_return_value
-@deepcopy_parameter("image")
+@snapshot_parameter("image")
 @feedback_unexpected_error
 @feedback_invalid_parameter_type
 @feedback_empty_list_parameters(["entities"])
@@ -2,7 +2,6 @@ from math import degrees
 from typing import List, Literal, Union
 
 from chat2edit.execution.decorators import (
-    deepcopy_parameter,
     feedback_empty_list_parameters,
     feedback_ignored_return_value,
     feedback_invalid_parameter_type,
@@ -13,10 +12,11 @@ from chat2edit.prompting.stubbing.decorators import exclude_coroutine
 from app.core.chat2edit.models import Box, Image, Object, Point, Text
 from app.core.chat2edit.utils import inpaint_uninpainted_objects_in_entities
 from app.core.chat2edit.utils.image_utils import get_own_objects
+from app.core.chat2edit.utils.decorators import snapshot_parameter
 
 
 @feedback_ignored_return_value
-@deepcopy_parameter("image")
+@snapshot_parameter("image")
 @feedback_invalid_parameter_type
 @feedback_empty_list_parameters(["entities"])
 @feedback_mismatch_list_parameters(["entities", "angles", "units", "directions"])
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Awaitable, List, Optional, Tuple
 
 from chat2edit.execution.decorators import (
     feedback_ignored_return_value,
@@ -7,14 +7,19 @@ from chat2edit.execution.decorators import (
     feedback_unexpected_error,
 )
 from chat2edit.prompting.stubbing.decorators import exclude_coroutine
+from PIL.Image import Image as PILImage
 
 from app.clients.inference_client import inference_client
 from app.core.chat2edit.models import Box, Image, Object, Point, Scribble
+from app.core.chat2edit.utils.inpaint_utils import materialize_pending_inpaints
 from app.core.chat2edit.utils.object_utils import create_object_from_image_and_mask
-from app.core.chat2edit.utils.scribble_utils import convert_scribble_to_mask_image
+from app.core.chat2edit.utils.scribble_utils import convert_scribble_to_points
+from app.core.chat2edit.utils.segmentation_reuse import (
+    find_reusable_object,
+    report_reused_object,
+)
 from app.schemas.common_schemas import Box as InferenceBox
 from app.schemas.common_schemas import MaskLabeledPoint
-from app.utils.image_utils import convert_mask_image_to_points
 from app.core.chat2edit.utils import get_same_objects
 
 
@@ -39,10 +44,82 @@ async def segment_object(
     positive_scribble: Optional[Scribble] = None,
     negative_scribble: Optional[Scribble] = None,
 ) -> Object:
+    if positive_scribble is None and negative_scribble is None:
+        reused_object = find_reusable_object(
+            image, box, positive_points, negative_points
+        )
+        if reused_object is not None:
+            report_reused_object(reused_object)
+            return reused_object
+
+    image = await materialize_pending_inpaints(image)
     pil_image = image.get_image()
-    img_width = pil_image.width
-    img_height = pil_image.height
+    mask = await create_segment_object_request(
+        pil_image,
+        box,
+        positive_points,
+        negative_points,
+        positive_scribble,
+        negative_scribble,
+    )
+
+    obj = create_object_from_image_and_mask(pil_image, mask)
+    obj.image_id = image.id
+
+    image.remove_objects(get_same_objects(image, [obj]))
+    image.add_object(obj)
+    
+    return obj
+
+
+def create_segment_object_request(
+    image: PILImage,
+    box: Optional[Box] = None,
+    positive_points: Optional[List[Point]] = None,
+    negative_points: Optional[List[Point]] = None,
+    positive_scribble: Optional[Scribble] = None,
+    negative_scribble: Optional[Scribble] = None,
+) -> Awaitable[PILImage]:
+    """Start the SAM3 request of `segment_object` on the rendered image."""
+    inference_box, points = _create_prompts(
+        image.width,
+        image.height,
+        box,
+        positive_points,
+        negative_points,
+        positive_scribble,
+        negative_scribble,
+    )
+    return inference_client.sam3_generate_mask(
+        image,
+        points=points if points else None,
+        box=inference_box,
+    )
 
+
+def needs_segmentation(
+    image: Image,
+    box: Optional[Box] = None,
+    positive_points: Optional[List[Point]] = None,
+    negative_points: Optional[List[Point]] = None,
+    positive_scribble: Optional[Scribble] = None,
+    negative_scribble: Optional[Scribble] = None,
+) -> bool:
+    """Whether `segment_object` must segment, rather than reuse an object."""
+    if positive_scribble is not None or negative_scribble is not None:
+        return True
+    return find_reusable_object(image, box, positive_points, negative_points) is None
+
+
+def _create_prompts(
+    img_width: int,
+    img_height: int,
+    box: Optional[Box],
+    positive_points: Optional[List[Point]],
+    negative_points: Optional[List[Point]],
+    positive_scribble: Optional[Scribble],
+    negative_scribble: Optional[Scribble],
+) -> Tuple[Optional[InferenceBox], List[MaskLabeledPoint]]:
     inference_box = None
     points = []
 
@@ -72,27 +149,17 @@ async def segment_object(
             points.append(MaskLabeledPoint(x=x, y=y, label=0))
 
     if positive_scribble:
-        scribble_mask = convert_scribble_to_mask_image(positive_scribble, image)
-        scribble_points = convert_mask_image_to_points(scribble_mask)
+        scribble_points = convert_scribble_to_points(
+            positive_scribble, img_width, img_height
+        )
         for x, y in scribble_points:
             points.append(MaskLabeledPoint(x=x, y=y, label=1))
 
     if negative_scribble:
-        scribble_mask = convert_scribble_to_mask_image(negative_scribble, image)
-        scribble_points = convert_mask_image_to_points(scribble_mask)
+        scribble_points = convert_scribble_to_points(
+            negative_scribble, img_width, img_height
+        )
         for x, y in scribble_points:
             points.append(MaskLabeledPoint(x=x, y=y, label=0))
 
-    mask = await inference_client.sam3_generate_mask(
-        pil_image,
-        points=points if points else None,
-        box=inference_box,
-    )
-
-    obj = create_object_from_image_and_mask(pil_image, mask)
-    obj.image_id = image.id
-
-    image.remove_objects(get_same_objects(image, [obj]))
-    image.add_object(obj)
-    
-    return obj
+    return inference_box, points
@@ -1,5 +1,4 @@
-from copy import deepcopy
-from typing import List
+from typing import Awaitable, List
 from chat2edit.execution.signaling import set_feedback
 from chat2edit.models import Feedback
 from chat2edit.execution.decorators import (
@@ -8,11 +7,14 @@ from chat2edit.execution.decorators import (
     feedback_unexpected_error,
 )
 from chat2edit.prompting.stubbing.decorators import exclude_coroutine
+from PIL.Image import Image as PILImage
 
 from app.clients.inference_client import inference_client
+from app.schemas.common_schemas import GeneratedMask
 
 from app.core.chat2edit.models import Box, Image, Object, Text
-from app.core.chat2edit.utils.object_utils import create_object_from_image_and_mask
+from app.core.chat2edit.utils.inpaint_utils import materialize_pending_inpaints
+from app.core.chat2edit.utils.object_utils import create_objects_from_image_and_masks
 from app.core.chat2edit.utils import get_same_objects
 
 
@@ -23,14 +25,12 @@ from app.core.chat2edit.utils import get_same_objects
 async def segment_objects(
     image: Image, prompt: str, expected_quantity: int
 ) -> List[Object]:
+    image = await materialize_pending_inpaints(image)
     pil_image = image.get_image()
-    generated_masks = await inference_client.sam3_generate_masks_by_text(
-        pil_image, prompt
+    generated_masks = await create_segment_objects_request(pil_image, prompt)
+    objects = await create_objects_from_image_and_masks(
+        pil_image, [mask.image for mask in generated_masks]
     )
-    objects = [
-        create_object_from_image_and_mask(pil_image, mask.image)
-        for mask in generated_masks
-    ]
     for obj in objects:
         obj.image_id = image.id
 
@@ -38,7 +38,7 @@ async def segment_objects(
     image.add_objects(objects)
 
     if len(generated_masks) != expected_quantity:
-        annotated_image = deepcopy(image)
+        annotated_image = image.snapshot()
         for i, obj in enumerate(objects):
             index = Text(
                 text=f"{i + 1}",
@@ -77,3 +77,10 @@ async def segment_objects(
         )
 
     return objects
+
+
+def create_segment_objects_request(
+    image: PILImage, prompt: str
+) -> Awaitable[List[GeneratedMask]]:
+    """Start the SAM3 request of `segment_objects` on the rendered image."""
+    return inference_client.sam3_generate_masks_by_text(image, prompt)
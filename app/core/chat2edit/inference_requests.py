@@ -0,0 +1,123 @@
+import inspect
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.chat2edit.functions.apply_filter import (
+    apply_filter,
+    create_apply_filter_request,
+    needs_aesthetic_check,
+)
+from app.core.chat2edit.functions.flip_entities import flip_entities
+from app.core.chat2edit.functions.generate_object import (
+    create_generate_object_request,
+    generate_object,
+)
+from app.core.chat2edit.functions.generate_objects import (
+    create_generate_objects_request,
+    generate_objects,
+)
+from app.core.chat2edit.functions.inpaint_objects import inpaint_objects
+from app.core.chat2edit.functions.remove_entities import remove_entities
+from app.core.chat2edit.functions.replace_entities import replace_entities
+from app.core.chat2edit.functions.rotate_entities import rotate_entities
+from app.core.chat2edit.functions.scale_entities import scale_entities
+from app.core.chat2edit.functions.segment_object import (
+    create_segment_object_request,
+    needs_segmentation,
+    segment_object,
+)
+from app.core.chat2edit.functions.segment_objects import (
+    create_segment_objects_request,
+    segment_objects,
+)
+from app.core.chat2edit.functions.shift_entities import shift_entities
+from app.core.chat2edit.models import Image
+from app.core.chat2edit.utils.image_utils import get_own_objects
+from app.core.chat2edit.utils.inpaint_utils import (
+    prefetch_objects_with_prompt,
+    prefetch_pending_inpaints,
+    prefetch_uninpainted_objects_in_entities,
+)
+
+
+@dataclass(frozen=True)
+class InferenceRequest:
+    """The inference request an edit function makes, described once.
+
+    Most functions first inpaint the image's pending holes, then send the
+    rendered image and some of their arguments: `create` takes the rendered
+    image as `image` and those arguments by name, and is what the function
+    itself calls. `condition`, given the call's arguments, tells whether the
+    function makes the request at all. Functions that inpaint the
+    uninpainted objects of an argument name it `inpainted_entities` instead,
+    and `inpaint_objects` names its objects `prompted_objects`.
+    """
+
+    function: Callable
+    create: Optional[Callable[..., Awaitable]] = None
+    apply_filters: bool = True
+    condition: Optional[Callable[..., bool]] = None
+    inpainted_entities: Optional[str] = None
+    prompted_objects: Optional[str] = None
+
+
+INFERENCE_REQUESTS: Dict[str, InferenceRequest] = {
+    request.function.__name__: request
+    for request in [
+        InferenceRequest(
+            apply_filter,
+            create=create_apply_filter_request,
+            apply_filters=False,
+            condition=needs_aesthetic_check,
+        ),
+        InferenceRequest(flip_entities, inpainted_entities="entities"),
+        InferenceRequest(generate_object, create=create_generate_object_request),
+        InferenceRequest(generate_objects, create=create_generate_objects_request),
+        InferenceRequest(inpaint_objects, prompted_objects="objects"),
+        InferenceRequest(remove_entities, inpainted_entities="entities"),
+        InferenceRequest(replace_entities, inpainted_entities="targets"),
+        InferenceRequest(rotate_entities, inpainted_entities="entities"),
+        InferenceRequest(scale_entities, inpainted_entities="entities"),
+        InferenceRequest(shift_entities, inpainted_entities="entities"),
+        InferenceRequest(
+            segment_object,
+            create=create_segment_object_request,
+            condition=needs_segmentation,
+        ),
+        InferenceRequest(segment_objects, create=create_segment_objects_request),
+    ]
+}
+
+
+def start_inference_request(
+    request: InferenceRequest, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> Optional[Awaitable]:
+    """Start the first request a call of the function would make.
+
+    Returns None when the call would make none. Raises TypeError when the
+    arguments do not fit the function.
+    """
+    bound = inspect.signature(request.function).bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = bound.arguments
+    image: Image = arguments["image"]
+
+    if request.inpainted_entities is not None:
+        return prefetch_uninpainted_objects_in_entities(
+            image, arguments[request.inpainted_entities]
+        )
+    if request.prompted_objects is not None:
+        objects = get_own_objects(image, arguments[request.prompted_objects])
+        return prefetch_objects_with_prompt(image, objects, arguments["prompt"])
+
+    if request.condition is not None and not _call(request.condition, arguments):
+        return None
+    if image.has_pending_inpaints():
+        return prefetch_pending_inpaints(image)
+    rendered_image = image.get_image(apply_filters=request.apply_filters)
+    return _call(request.create, {**arguments, "image": rendered_image})
+
+
+def _call(function: Callable, arguments: Dict[str, Any]) -> Any:
+    parameters = inspect.signature(function).parameters
+    return function(**{name: arguments[name] for name in parameters if name in arguments})
@@ -0,0 +1,50 @@
+from app.core.chat2edit.llms.hedged_llm import HedgedLlm, LlmHedger, LlmHedgingStats
+from app.core.chat2edit.llms.llm_answer_cache import (
+    CachedLlm,
+    LlmAnswerCache,
+    LlmAnswerCacheStats,
+    get_credential_scope,
+    use_cache_hit_listener,
+)
+from app.core.chat2edit.llms.llm_pool import LlmPool, LlmPoolStats
+from app.core.chat2edit.llms.llm_router import (
+    LlmRoute,
+    LlmRouter,
+    LlmTierStats,
+    TieredLlm,
+)
+from app.core.chat2edit.llms.llm_usage import (
+    LlmUsage,
+    report_usage,
+    use_usage_listener,
+)
+from app.core.chat2edit.llms.stream_listener import (
+    get_stream_listener,
+    use_stream_listener,
+)
+from app.core.chat2edit.llms.streaming_google_llm import StreamingGoogleLlm
+from app.core.chat2edit.llms.streaming_openai_llm import StreamingOpenAILlm
+
+__all__ = [
+    "CachedLlm",
+    "HedgedLlm",
+    "LlmAnswerCache",
+    "LlmAnswerCacheStats",
+    "LlmHedger",
+    "LlmHedgingStats",
+    "LlmPool",
+    "LlmPoolStats",
+    "LlmRoute",
+    "LlmRouter",
+    "LlmTierStats",
+    "LlmUsage",
+    "StreamingGoogleLlm",
+    "StreamingOpenAILlm",
+    "TieredLlm",
+    "get_credential_scope",
+    "get_stream_listener",
+    "report_usage",
+    "use_cache_hit_listener",
+    "use_stream_listener",
+    "use_usage_listener",
+]
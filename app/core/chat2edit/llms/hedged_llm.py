@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Hashable, List, Tuple
+
+import numpy as np
+from chat2edit.models import Message
+from chat2edit.prompting.llms import Llm
+
+from app.core.chat2edit.llms.stream_listener import use_stream_listener
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LlmHedgingStats:
+    calls: int = 0
+    # Calls that started the alternate request, because the primary one was
+    # slow or failed, and those the alternate answered
+    hedged: int = 0
+    failovers: int = 0
+    alternate_wins: int = 0
+
+
+class LlmHedger:
+    """Hedging policy and latency history shared between requests.
+
+    A call is hedged once the primary request has taken longer than the
+    `percentile` of the primary model's recent latencies, or
+    `default_delay` seconds until `min_samples` latencies are known.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        default_delay: float = 10.0,
+        min_samples: int = 20,
+        window: int = 1000,
+    ) -> None:
+        self._percentile = percentile
+        self._default_delay = default_delay
+        self._min_samples = min_samples
+        self._window = window
+        self._latencies: Dict[Hashable, Deque[float]] = {}
+        self.stats = LlmHedgingStats()
+
+    def wrap(self, key: Hashable, primary: Llm, alternate: Llm) -> "HedgedLlm":
+        return HedgedLlm(self, key, primary, alternate)
+
+    def get_delay(self, key: Hashable) -> float:
+        latencies = self._latencies.get(key)
+        if latencies is None or len(latencies) < self._min_samples:
+            return self._default_delay
+        return float(np.percentile(latencies, self._percentile))
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        latencies = self._latencies.setdefault(key, deque(maxlen=self._window))
+        latencies.append(seconds)
+
+
+class HedgedLlm(Llm):
+    """LLM that backs a slow or failing request with an alternate LLM.
+
+    The alternate request starts when the primary one fails, or takes
+    longer than the hedger's delay. The first answer is used and the other
+    request is cancelled. Only the primary request streams its answer,
+    so the stream listener never sees two answers interleaved.
+    """
+
+    def __init__(
+        self, hedger: LlmHedger, key: Hashable, primary: Llm, alternate: Llm
+    ) -> None:
+        self._hedger = hedger
+        self._key = key
+        self._primary = primary
+        self._alternate = alternate
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        stats = self._hedger.stats
+        stats.calls += 1
+        start = time.perf_counter()
+        primary = asyncio.create_task(self._primary.generate(prompt, history))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(
+                tasks, timeout=self._hedger.get_delay(self._key)
+            )
+            if primary in done and primary.exception() is None:
+                self._hedger.record(self._key, time.perf_counter() - start)
+                return primary.result()
+
+            if primary in done:
+                stats.failovers += 1
+                tasks.clear()
+                logger.warning(f"LLM request failed, failing over: {primary.exception()}")
+            else:
+                stats.hedged += 1
+                logger.info(
+                    f"LLM request slower than {time.perf_counter() - start:.1f}s, "
+                    "hedging"
+                )
+            alternate = asyncio.create_task(self._generate_alternate(prompt, history))
+            tasks.add(alternate)
+
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    if task is alternate:
+                        stats.alternate_wins += 1
+                    else:
+                        self._hedger.record(self._key, time.perf_counter() - start)
+                    return task.result()
+
+            # Both failed; the primary error is the one the caller expects
+            return primary.result()
+        finally:
+            if not primary.done():
+                # A lower bound of its latency, so slow requests still count
+                self._hedger.record(self._key, time.perf_counter() - start)
+            for task in tasks:
+                task.cancel()
+
+    def get_info(self) -> Dict[str, Any]:
+        return self._primary.get_info()
+
+    async def _generate_alternate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        with use_stream_listener(None):
+            return await self._alternate.generate(prompt, history)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from chat2edit.models import Message
+from chat2edit.prompting.llms import Llm
+
+logger = logging.getLogger(__name__)
+
+CacheHitListener = Callable[[Message], None]
+
+_cache_hit_listener: ContextVar[Optional[CacheHitListener]] = ContextVar(
+    "llm_cache_hit_listener", default=None
+)
+
+
+@contextmanager
+def use_cache_hit_listener(listener: Optional[CacheHitListener]) -> Iterator[None]:
+    """Have cached LLMs report each answer served from the cache to `listener`."""
+    token = _cache_hit_listener.set(listener)
+    try:
+        yield
+    finally:
+        _cache_hit_listener.reset(token)
+
+
+@dataclass
+class LlmAnswerCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+@dataclass
+class _CachedAnswer:
+    text: str
+    expires_at: float
+
+
+class LlmAnswerCache:
+    """Answers of deterministic LLM calls shared between requests.
+
+    Answers are keyed by a hash of the credential scope (see
+    `get_credential_scope`), the info (model and generation params) of the
+    LLM that answered and the texts of the prompt and its history, so only an
+    identical call made with the same credential gets a cached answer. The
+    cache is shared by every user, so the scope keeps a key's answers from
+    being served to other keys. Answers expire after
+    `ttl_seconds`, and the least recently used ones beyond `max_size` are
+    evicted. Only LLMs sampling greedily (temperature 0 or top_k 1) are
+    cached, as other configurations are expected to vary their answers.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 3600.0) -> None:
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _CachedAnswer]" = OrderedDict()
+        self.stats = LlmAnswerCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def wrap(
+        self, scope: str, llm: Llm, lookup: bool = True, store: bool = True
+    ) -> Llm:
+        """Have `llm` answer repeated calls from the cache, if it is deterministic.
+
+        A hedged LLM is wrapped for lookups only, and each of its two LLMs
+        for stores only, so answers are kept under the LLM that gave them.
+        """
+        if not is_deterministic(llm.get_info()):
+            return llm
+        return CachedLlm(self, scope, llm, lookup=lookup, store=store)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.text
+
+    def put(self, key: str, text: str) -> None:
+        self._entries[key] = _CachedAnswer(text, time.monotonic() + self._ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+
+class CachedLlm(Llm):
+    """LLM that answers repeated calls from an `LlmAnswerCache`.
+
+    Hits are answered at once, without streaming, and reported to the
+    active cache hit listener. `lookup` and `store` turn off either half,
+    for LLMs whose answers come from elsewhere or are stored elsewhere.
+    """
+
+    def __init__(
+        self,
+        cache: LlmAnswerCache,
+        scope: str,
+        llm: Llm,
+        lookup: bool = True,
+        store: bool = True,
+    ) -> None:
+        self._cache = cache
+        self._scope = scope
+        self._llm = llm
+        self._lookup = lookup
+        self._store = store
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        key = _make_key(self._scope, self._llm.get_info(), prompt, history)
+        text = self._cache.get(key) if self._lookup else None
+        if text is not None:
+            answer = Message(text=text)
+            logger.info("Answered the prompt from the LLM answer cache")
+            listener = _cache_hit_listener.get()
+            if listener is not None:
+                listener(answer)
+            return answer
+
+        answer = await self._llm.generate(prompt, history)
+        if self._store:
+            self._cache.put(key, answer.text)
+        return answer
+
+    def get_info(self) -> Dict[str, Any]:
+        return self._llm.get_info()
+
+
+def is_deterministic(info: Dict[str, Any]) -> bool:
+    return info.get("temperature") == 0 or info.get("top_k") == 1
+
+
+def get_credential_scope(provider: str, api_key: Optional[str]) -> str:
+    """Get the cache scope of the provider and the API key the LLM uses."""
+    api_key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    return f"{provider}:{api_key_hash}"
+
+
+def _make_key(
+    scope: str,
+    info: Dict[str, Any],
+    prompt: Message,
+    history: List[Tuple[Message, Message]],
+) -> str:
+    messages = [message.text for exchange in history for message in exchange]
+    payload = json.dumps(
+        [scope, info, messages, prompt.text], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Hashable, List, Optional
+
+from chat2edit.prompting.llms import Llm
+
+from app.schemas.chat2edit_schemas import LlmConfig
+
+
+@dataclass
+class _PooledLlm:
+    llm: Llm
+    leases: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class LlmPoolStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class LlmPool:
+    """Bounded pool of LLM clients shared between requests.
+
+    Clients are keyed by provider, model, a hash of the API key and params,
+    so requests with the same configuration reuse one client and its
+    connections. LLM clients keep no per-request state, so a leased client
+    can serve concurrent requests. Clients idle for `max_idle_seconds`,
+    and the least recently used ones beyond `max_size`, are closed once
+    no request holds them.
+    """
+
+    def __init__(
+        self,
+        create_llm: Callable[[LlmConfig], Llm],
+        max_size: int = 8,
+        max_idle_seconds: float = 600.0,
+    ) -> None:
+        self._create_llm = create_llm
+        self._max_size = max_size
+        self._max_idle_seconds = max_idle_seconds
+        self._entries: "OrderedDict[Hashable, _PooledLlm]" = OrderedDict()
+        self.stats = LlmPoolStats()
+
+    @asynccontextmanager
+    async def lease(self, config: LlmConfig) -> AsyncIterator[Llm]:
+        """Get the client for `config` for the duration of the block."""
+        entry = self._acquire(config)
+        try:
+            yield entry.llm
+        finally:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            await self._evict()
+
+    async def close(self) -> None:
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            await _close_llm(entry.llm)
+
+    def _acquire(self, config: LlmConfig) -> _PooledLlm:
+        key = _make_key(config)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _PooledLlm(self._create_llm(config))
+            self._entries[key] = entry
+            self.stats.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+
+        entry.leases += 1
+        return entry
+
+    async def _evict(self) -> None:
+        now = time.monotonic()
+        evicted: List[_PooledLlm] = []
+        # Least recently used first
+        for key, entry in list(self._entries.items()):
+            if entry.leases:
+                continue
+            over_size = len(self._entries) > self._max_size
+            if over_size or now - entry.last_used > self._max_idle_seconds:
+                evicted.append(self._entries.pop(key))
+
+        self.stats.evictions += len(evicted)
+        for entry in evicted:
+            await _close_llm(entry.llm)
+
+
+def _make_key(config: LlmConfig) -> Hashable:
+    api_key_hash = (
+        hashlib.sha256(config.api_key.encode()).hexdigest()
+        if config.api_key
+        else None
+    )
+    params = json.dumps(config.params, sort_keys=True, default=str)
+    return (config.provider, config.model, api_key_hash, params)
+
+
+async def _close_llm(llm: Any) -> None:
+    aclose: Optional[Callable] = getattr(llm, "aclose", None)
+    if aclose is not None:
+        await aclose()
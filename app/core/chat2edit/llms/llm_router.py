@@ -0,0 +1,162 @@
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from chat2edit.models import Message
+from chat2edit.prompting.llms import Llm
+
+from app.schemas.chat2edit_schemas import LlmConfig
+
+logger = logging.getLogger(__name__)
+
+LlmTier = Literal["fast", "strong"]
+
+# LLM call latencies kept per tier for the percentiles
+LATENCY_WINDOW = 1000
+
+# References written by the frontend, e.g. #red[cat](<id>)
+_REFERENCE_PATTERN = re.compile(r"#[a-zA-Z0-9_]+\[[^\]]+\]\([^)]+\)")
+_WORD_PATTERN = re.compile(r"[a-z]+")
+_CLAUSE_PATTERN = re.compile(r"\b(?:and|then)\b|[,;.]")
+# Word prefixes of editing verbs and adjectives, and of verbs generating content
+EDIT_WORDS = (
+    "remov", "delet", "eras", "replac", "swap", "rotat", "flip", "mirror",
+    "mov", "shift", "scal", "resiz", "enlarg", "shrink", "past", "copy", "add",
+    "put", "place", "insert", "generat", "creat", "draw", "fill", "blur",
+    "bright", "dark", "big", "small", "larg", "increas", "decreas", "reduc",
+    "invert", "chang",
+)
+GENERATIVE_VERBS = (
+    "add", "put", "place", "insert", "generat", "creat", "draw", "fill",
+    "replac", "swap",
+)
+
+
+@dataclass
+class LlmTierStats:
+    # Turns routed to the tier, and LLM calls it served
+    turns: int = 0
+    calls: int = 0
+    total_seconds: float = 0.0
+    latencies: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_WINDOW)
+    )
+
+    def get_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return float(np.percentile(self.latencies, percentile))
+
+
+@dataclass(frozen=True)
+class LlmRoute:
+    tier: LlmTier
+    config: LlmConfig
+    # Config to switch to once a turn gets error feedback, if stronger
+    escalation_config: Optional[LlmConfig] = None
+
+
+class LlmRouter:
+    """Routes each turn to a fast or a strong model by request complexity.
+
+    The model in the request's config is the strong tier. Single-step
+    requests go to the fast model configured for the provider; requests
+    with several images, references or editing verbs, or generating new
+    content, stay on the strong model. A turn routed to the fast model is
+    escalated to the strong one once execution reports an error.
+    """
+
+    def __init__(self, fast_models: Dict[str, Optional[str]]) -> None:
+        self._fast_models = fast_models
+        self.stats: Dict[LlmTier, LlmTierStats] = {
+            "fast": LlmTierStats(),
+            "strong": LlmTierStats(),
+        }
+        self.escalations = 0
+
+    def route(self, message: Message, config: LlmConfig) -> LlmRoute:
+        fast_model = self._fast_models.get(config.provider)
+        if fast_model is None or classify_request(message) == "strong":
+            route = LlmRoute("strong", config)
+        elif fast_model == config.model:
+            route = LlmRoute("fast", config)
+        else:
+            fast_config = config.model_copy(update={"model": fast_model})
+            route = LlmRoute("fast", fast_config, escalation_config=config)
+
+        logger.info(f"Routed request to the {route.tier} tier ({route.config.model})")
+        return route
+
+    def create_llm(
+        self, route: LlmRoute, llm: Llm, escalation_llm: Optional[Llm] = None
+    ) -> "TieredLlm":
+        self.stats[route.tier].turns += 1
+        tiers: List[Tuple[LlmTier, Llm]] = [(route.tier, llm)]
+        if escalation_llm is not None:
+            tiers.append(("strong", escalation_llm))
+        return TieredLlm(self, tiers)
+
+    def record_call(self, tier: LlmTier, seconds: float) -> None:
+        stats = self.stats[tier]
+        stats.calls += 1
+        stats.total_seconds += seconds
+        stats.latencies.append(seconds)
+
+
+class TieredLlm(Llm):
+    """LLM of a routed turn, which can switch to a stronger tier mid-turn."""
+
+    def __init__(self, router: LlmRouter, tiers: List[Tuple[LlmTier, Llm]]) -> None:
+        self._router = router
+        self._tiers = tiers
+        self._index = 0
+
+    @property
+    def tier(self) -> LlmTier:
+        return self._tiers[self._index][0]
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        tier, llm = self._tiers[self._index]
+        start = time.perf_counter()
+        try:
+            return await llm.generate(prompt, history)
+        finally:
+            self._router.record_call(tier, time.perf_counter() - start)
+
+    def get_info(self) -> Dict[str, Any]:
+        return self._tiers[self._index][1].get_info()
+
+    def escalate(self) -> bool:
+        """Switch to the next tier, if any."""
+        if self._index + 1 >= len(self._tiers):
+            return False
+        self._index += 1
+        self._router.escalations += 1
+        logger.info(f"Escalated the turn to the {self.tier} tier")
+        return True
+
+
+def classify_request(message: Message) -> LlmTier:
+    """Classify a request from the frontend as a fast or a strong tier one.
+
+    A request is single-step if it has one image, at most one reference,
+    one clause with an edit in it, and generates nothing.
+    """
+    text = _REFERENCE_PATTERN.sub(" ", message.text.lower())
+    clauses = [_WORD_PATTERN.findall(clause) for clause in _CLAUSE_PATTERN.split(text)]
+    steps = sum(
+        any(word.startswith(EDIT_WORDS) for word in words) for words in clauses
+    )
+    generative = any(
+        word.startswith(GENERATIVE_VERBS) for words in clauses for word in words
+    )
+    references = len(_REFERENCE_PATTERN.findall(message.text))
+    if len(message.attachments) > 1 or references > 1 or steps > 1 or generative:
+        return "strong"
+    return "fast"
@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+
+@dataclass
+class LlmUsage:
+    prompt_tokens: int = 0
+    # Prompt tokens served from the provider's prompt cache
+    cached_prompt_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_prompt_tokens / self.prompt_tokens
+
+
+UsageListener = Callable[[LlmUsage], None]
+
+_usage_listener: ContextVar[Optional[UsageListener]] = ContextVar(
+    "llm_usage_listener", default=None
+)
+
+
+@contextmanager
+def use_usage_listener(listener: Optional[UsageListener]) -> Iterator[None]:
+    """Have LLMs report the token usage of each answer to `listener`."""
+    token = _usage_listener.set(listener)
+    try:
+        yield
+    finally:
+        _usage_listener.reset(token)
+
+
+def report_usage(usage: LlmUsage) -> None:
+    listener = _usage_listener.get()
+    if listener is not None:
+        listener(usage)
@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+StreamListener = Callable[[str], None]
+
+_stream_listener: ContextVar[Optional[StreamListener]] = ContextVar(
+    "llm_stream_listener", default=None
+)
+
+
+@contextmanager
+def use_stream_listener(listener: Optional[StreamListener]) -> Iterator[None]:
+    """Have streaming LLMs report the answer text received so far to `listener`.
+
+    The listener is scoped to the current task, so LLM clients shared
+    between requests stream each answer to its own request.
+    """
+    token = _stream_listener.set(listener)
+    try:
+        yield
+    finally:
+        _stream_listener.reset(token)
+
+
+def get_stream_listener() -> Optional[StreamListener]:
+    return _stream_listener.get()
@@ -0,0 +1,56 @@
+from typing import Any, List, Tuple
+
+from chat2edit.models import Message
+from chat2edit.prompting.llms import GoogleLlm
+from google.generativeai import client
+
+from app.core.chat2edit.llms.llm_usage import LlmUsage, report_usage
+from app.core.chat2edit.llms.stream_listener import get_stream_listener
+
+
+class StreamingGoogleLlm(GoogleLlm):
+    """`GoogleLlm` that streams its answers to the active stream listener.
+
+    Without a listener it answers in one piece, like `GoogleLlm`. Each
+    instance keeps the client of the API key it was given, so instances
+    with different keys can be used concurrently. Gemini caches repeated
+    prompt prefixes implicitly; the cached share of each prompt is
+    reported to the active usage listener.
+    """
+
+    def set_api_key(self, api_key: str) -> None:
+        super().set_api_key(api_key)
+        # Configuring another key replaces the default client, so bind it now
+        self._model._async_client = client.get_default_generative_async_client()
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        input_history = self._create_input_history(history)
+        chat_session = self._model.start_chat(history=input_history)
+
+        on_stream = get_stream_listener()
+        if on_stream is None:
+            response = await chat_session.send_message_async(prompt.text)
+            text = response.text
+        else:
+            response = await chat_session.send_message_async(prompt.text, stream=True)
+            text = ""
+            async for chunk in response:
+                text += "".join(part.text for part in chunk.parts)
+                on_stream(text)
+
+        _report_usage(response.usage_metadata)
+        return Message(text=text)
+
+
+def _report_usage(usage_metadata: Any) -> None:
+    if usage_metadata is None:
+        return
+    report_usage(
+        LlmUsage(
+            prompt_tokens=usage_metadata.prompt_token_count,
+            cached_prompt_tokens=usage_metadata.cached_content_token_count,
+            output_tokens=usage_metadata.candidates_token_count,
+        )
+    )
@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+import openai
+from chat2edit.models import Message
+from chat2edit.prompting.llms import OpenAILlm
+
+from app.core.chat2edit.llms.llm_usage import LlmUsage, report_usage
+from app.core.chat2edit.llms.stream_listener import get_stream_listener
+
+
+class StreamingOpenAILlm(OpenAILlm):
+    """`OpenAILlm` that streams its answers to the active stream listener.
+
+    Without a listener it answers in one piece, like `OpenAILlm`. Each
+    instance sends its own API key and keeps one HTTP session, so its
+    connections are reused across calls; call `aclose` when done with it.
+
+    OpenAI caches repeated prompt prefixes automatically; `prompt_cache_key`
+    and `prompt_cache_retention` are passed on to route and keep the cache.
+    The cached share of each prompt is reported to the active usage listener.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        *,
+        prompt_cache_key: Optional[str] = None,
+        prompt_cache_retention: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        self._api_key: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._prompt_cache_key = prompt_cache_key
+        self._prompt_cache_retention = prompt_cache_retention
+        super().__init__(model, **kwargs)
+
+    def set_api_key(self, api_key: str) -> None:
+        self._api_key = api_key
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        on_stream = get_stream_listener()
+        token = openai.aiosession.set(self._get_session())
+        try:
+            response = await self._create_completion(
+                prompt, history, stream=on_stream is not None
+            )
+            if on_stream is None:
+                _report_usage(response.get("usage"))
+                return Message(text=response.choices[0].message.content)
+
+            text = ""
+            async for chunk in response:
+                # The last chunk only carries the usage
+                _report_usage(chunk.get("usage"))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.get("content")
+                if not delta:
+                    continue
+                text += delta
+                on_stream(text)
+        finally:
+            openai.aiosession.reset(token)
+
+        return Message(text=text)
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            **super().get_info(),
+            "prompt_cache_key": self._prompt_cache_key,
+            "prompt_cache_retention": self._prompt_cache_retention,
+        }
+
+    async def _create_completion(
+        self, prompt: Message, history: List[Tuple[Message, Message]], stream: bool
+    ) -> Any:
+        options: Dict[str, Any] = {}
+        if stream:
+            options["stream_options"] = {"include_usage": True}
+        if self._prompt_cache_key is not None:
+            options["prompt_cache_key"] = self._prompt_cache_key
+        if self._prompt_cache_retention is not None:
+            options["prompt_cache_retention"] = self._prompt_cache_retention
+
+        return await openai.ChatCompletion.acreate(
+            messages=self._create_messages(prompt, history),
+            model=self._model,
+            max_tokens=self._max_tokens,
+            temperature=self._temperature,
+            stop=self._stop,
+            top_p=self._top_p,
+            api_key=self._api_key,
+            stream=stream,
+            **options,
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+
+def _report_usage(usage: Optional[Dict[str, Any]]) -> None:
+    if not usage:
+        return
+    prompt_tokens_details = usage.get("prompt_tokens_details") or {}
+    report_usage(
+        LlmUsage(
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            cached_prompt_tokens=prompt_tokens_details.get("cached_tokens", 0),
+            output_tokens=usage.get("completion_tokens", 0),
+        )
+    )
@@ -0,0 +1,81 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from chat2edit import Chat2Edit
+from chat2edit.models import ChatCycle, Message, PromptExchange
+
+from app.core.chat2edit.command_parser import ParsedCommand, parse_command
+
+logger = logging.getLogger(__name__)
+
+
+class Mic2eChat2Edit(Chat2Edit):
+    """Chat2Edit that answers simple edit requests without the LLM.
+
+    With the fast path enabled, the first prompt of a turn whose request
+    `parse_command` understands is answered with the parsed program. The
+    exchange keeps the prompt and an answer in the format the LLM uses, so
+    the cycle looks the same as an LLM-answered one, and any feedback from
+    executing the program goes to the LLM in the next prompt as usual.
+
+    Once a prompt cycle of the turn gets error feedback, an LLM that can
+    `escalate` (a routed one) switches to its stronger model.
+    """
+
+    def __init__(self, *, fast_path: bool = False, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._fast_path = fast_path
+        self._names: List[str] = []
+
+    async def generate(
+        self,
+        request: Message,
+        cycles: Optional[List[ChatCycle]] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Optional[Message], ChatCycle, Dict[str, Any]]:
+        self._names = list(context or {})
+        return await super().generate(request, cycles, context)
+
+    async def _prompt(self, cycles: List[ChatCycle]) -> List[PromptExchange]:
+        chat_cycle = cycles[-1]
+        if self._fast_path and len(chat_cycle.cycles) == 1:
+            command = parse_command(
+                chat_cycle.request, self._names, follow_up=len(cycles) > 1
+            )
+            if command is not None:
+                return [self._answer_directly(cycles, command)]
+
+        escalate = getattr(self._llm, "escalate", None)
+        if escalate is not None and _has_error_feedback(chat_cycle):
+            escalate()
+        return await super()._prompt(cycles)
+
+    def _answer_directly(
+        self, cycles: List[ChatCycle], command: ParsedCommand
+    ) -> PromptExchange:
+        prompt = self._prompting_strategy.create_prompt(
+            cycles, self._exemplars, self._context_provider.get_context()
+        )
+        exchange = PromptExchange(prompt=prompt)
+        if self._callbacks.on_prompt:
+            self._callbacks.on_prompt(prompt)
+
+        exchange.answer = Message(text=command.to_answer())
+        if self._callbacks.on_answer:
+            self._callbacks.on_answer(exchange.answer)
+
+        exchange.code = self._prompting_strategy.extract_code(exchange.answer.text)
+        if self._callbacks.on_extract:
+            self._callbacks.on_extract(exchange.code)
+
+        logger.info("Answered the request with the command fast path")
+        return exchange
+
+
+def _has_error_feedback(chat_cycle: ChatCycle) -> bool:
+    return any(
+        block.error is not None
+        or (block.feedback is not None and block.feedback.severity == "error")
+        for prompt_cycle in chat_cycle.cycles
+        for block in prompt_cycle.blocks
+    )
@@ -1,4 +1,5 @@
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
 from chat2edit.context.providers import ContextProvider
 from chat2edit.models import Exemplar
@@ -18,13 +19,17 @@ from app.core.chat2edit.functions.rotate_entities import rotate_entities
 from app.core.chat2edit.functions.scale_entities import scale_entities
 from app.core.chat2edit.functions.segment_object import segment_object
 from app.core.chat2edit.functions.shift_entities import shift_entities
+from app.core.chat2edit.exemplar_retriever import ExemplarRetriever
 from app.core.chat2edit.mic2e_exemplars import create_mic2e_exemplars
+from app.env import EXEMPLAR_RETRIEVAL, EXEMPLAR_TOKEN_BUDGET, EXEMPLAR_TOP_K
 
 
 class Mic2eContextProvider(ContextProvider):
-    def __init__(self, interactive: bool = True):
+    def __init__(self, interactive: bool = True, query: Optional[str] = None):
         super().__init__()
         self.interactive = interactive
+        # Request text to select exemplars for, when retrieval is enabled
+        self.query = query
 
     def get_context(self) -> Dict[str, Any]:
         context = {
@@ -53,5 +58,24 @@ class Mic2eContextProvider(ContextProvider):
         return context
 
     def get_exemplars(self) -> List[Exemplar]:
-        """Get exemplars based on interactive mode."""
-        return create_mic2e_exemplars(interactive=self.interactive)
+        """Get exemplars based on interactive mode.
+
+        The same exemplar objects are returned on every call. Chat2Edit
+        contextualizes exemplars in place, once, and prompts are cached per
+        exemplar selection.
+        """
+        if not EXEMPLAR_RETRIEVAL or self.query is None:
+            return _get_exemplars(self.interactive)
+        return _get_exemplar_retriever(self.interactive).select(
+            self.query, EXEMPLAR_TOP_K, EXEMPLAR_TOKEN_BUDGET
+        )
+
+
+@lru_cache(maxsize=None)
+def _get_exemplars(interactive: bool) -> List[Exemplar]:
+    return create_mic2e_exemplars(interactive=interactive)
+
+
+@lru_cache(maxsize=None)
+def _get_exemplar_retriever(interactive: bool) -> ExemplarRetriever:
+    return ExemplarRetriever(_get_exemplars(interactive))
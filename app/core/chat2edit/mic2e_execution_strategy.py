@@ -0,0 +1,336 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from chat2edit.execution.strategies import DefaultExecutionStrategy
+from chat2edit.models import ExecutionError, Feedback, Message
+
+from app.clients.inference_cache import InferenceRequestCache, use_inference_cache
+from app.core.chat2edit.command_stream import extract_streamed_statements
+from app.core.chat2edit.edit_graph import (
+    EditGraph,
+    EditNode,
+    UnsupportedExpressionError,
+    build_edit_graph,
+    evaluate_call_arguments,
+)
+from app.core.chat2edit.inference_requests import (
+    INFERENCE_REQUESTS,
+    InferenceRequest,
+    start_inference_request,
+)
+
+logger = logging.getLogger(__name__)
+
+# Awaitable functions that modify none of their arguments and report problems
+# only by raising, so a whole statement calling one can run before its turn
+EFFECT_FREE_FUNCTIONS = frozenset(
+    {"generate_object", "generate_objects", "inpaint_objects"}
+)
+
+
+@dataclass
+class ExecutionStats:
+    statements: int = 0
+    speculated_statements: int = 0
+    # Statements whose requests started while the answer was streaming, and
+    # those of them the final code did not keep
+    streamed_statements: int = 0
+    discarded_statements: int = 0
+    prefetched_requests: int = 0
+    shared_requests: int = 0
+    wall_seconds: float = 0.0
+    # Work that overlapped with other statements instead of being waited for
+    saved_seconds: float = 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Sequential time over actual time, for the statements executed."""
+        if self.wall_seconds <= 0:
+            return 1.0
+        return (self.wall_seconds + self.saved_seconds) / self.wall_seconds
+
+
+class _Speculation:
+    def __init__(self, function: Callable, task: asyncio.Task) -> None:
+        self.function = function
+        self.task = task
+        self.duration: Optional[float] = None
+        start = time.perf_counter()
+
+        def record(_: asyncio.Task) -> None:
+            self.duration = time.perf_counter() - start
+
+        task.add_done_callback(record)
+
+
+class Mic2eExecutionStrategy(DefaultExecutionStrategy):
+    """Executes generated programs, prefetching their inference requests.
+
+    Statements still run one by one, in order, exactly as the default
+    strategy runs them; they own every side effect, feedback and response.
+    Before each statement, the program's edit graph is used to start the
+    inference requests of all later statements whose inputs are already
+    final, concurrently. Statements past the response are never started.
+    When a statement then makes a request, it gets the prefetched result
+    instead of a new call, and identical deterministic requests within the
+    turn (such as the aesthetic check of chained filters) run only once.
+    Generative requests are prefetched too, but each result goes to a single
+    call, so repeating a generation still samples anew.
+
+    Statements that assign the result of an `EFFECT_FREE_FUNCTIONS` call go
+    further: once every statement before them is such a call and none rebinds
+    their inputs, the whole call starts in the background. At its turn the
+    statement still runs, but gets the speculative result, or error, in
+    place of calling the function again, and binds its target only then.
+
+    Requests can start even before the answer is complete: fed the partial
+    answer with `feed_answer`, the strategy prefetches each statement of
+    the commands block as soon as it is complete and its inputs are in the
+    context set with `set_context`. Once the final code is parsed, the
+    requests of streamed statements it does not begin with are cancelled.
+
+    One instance serves a single chat turn; call `close` when it is done.
+    """
+
+    def __init__(
+        self,
+        inference_requests: Optional[Dict[str, InferenceRequest]] = None,
+        effect_free_functions: Optional[FrozenSet[str]] = None,
+    ) -> None:
+        super().__init__()
+        self._inference_requests = (
+            INFERENCE_REQUESTS if inference_requests is None else inference_requests
+        )
+        self._effect_free_functions = (
+            EFFECT_FREE_FUNCTIONS
+            if effect_free_functions is None
+            else effect_free_functions
+        )
+        self._cache = InferenceRequestCache()
+        self._processed_codes: List[str] = []
+        self._graph: Optional[EditGraph] = None
+        self._next_index = 0
+        self._prefetched: Set[int] = set()
+        self._speculations: Dict[int, _Speculation] = {}
+        self._context: Optional[Dict[str, Any]] = None
+        self._streamed_text = ""
+        self._streamed_codes: List[str] = []
+        self._streamed_prefetches: Dict[int, List[asyncio.Task]] = {}
+        self._stats = ExecutionStats()
+
+    @property
+    def stats(self) -> ExecutionStats:
+        return ExecutionStats(
+            statements=self._stats.statements,
+            speculated_statements=self._stats.speculated_statements,
+            streamed_statements=self._stats.streamed_statements,
+            discarded_statements=self._stats.discarded_statements,
+            prefetched_requests=self._cache.stats.prefetched,
+            shared_requests=self._cache.stats.hits,
+            wall_seconds=self._stats.wall_seconds,
+            saved_seconds=self._stats.saved_seconds + self._cache.stats.saved_seconds,
+        )
+
+    def set_context(self, context: Dict[str, Any]) -> None:
+        """Set the context streamed answers are prefetched against.
+
+        Execution replaces it with the live context of the turn.
+        """
+        self._context = context
+
+    def feed_answer(self, text: str) -> None:
+        """Prefetch the statements completed so far in a streaming answer.
+
+        `text` is the answer received so far; text that does not continue
+        the previous one starts a new answer.
+        """
+        if not text.startswith(self._streamed_text):
+            self._discard_streamed(0)
+            self._streamed_codes = []
+        self._streamed_text = text
+        if self._context is None:
+            return
+
+        codes = extract_streamed_statements(text)
+        kept = _get_common_prefix_length(codes, self._streamed_codes)
+        self._discard_streamed(kept)
+        self._streamed_codes = codes
+
+        graph = build_edit_graph(codes)
+        for node in graph.get_live_nodes():
+            if node.index in self._streamed_prefetches:
+                continue
+            tasks = self._start_prefetch(graph, node, 0, self._context)
+            if tasks is not None:
+                self._streamed_prefetches[node.index] = tasks
+                self._stats.streamed_statements += 1
+
+    def parse(self, code: str) -> List[str]:
+        self._cancel_speculations()
+        codes = super().parse(code)
+        # The final code reuses the requests of the streamed statements it
+        # begins with; their readiness only depended on the ones before
+        self._discard_streamed(_get_common_prefix_length(codes, self._streamed_codes))
+        self._prefetched = set(self._streamed_prefetches)
+        self._streamed_text = ""
+        self._streamed_codes = []
+        self._streamed_prefetches = {}
+
+        self._processed_codes = []
+        self._graph = None
+        self._next_index = 0
+        return codes
+
+    def process(self, code: str, context: Dict[str, Any]) -> str:
+        self._context = context
+        processed_code = super().process(code, context)
+        self._processed_codes.append(processed_code)
+        return processed_code
+
+    async def execute(
+        self,
+        code: str,
+        context: Dict[str, Any],
+        on_log: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[
+        Optional[ExecutionError],
+        Optional[Feedback],
+        Optional[Message],
+        List[str],
+    ]:
+        start = time.perf_counter()
+        self._context = context
+        index = self._next_index
+        self._next_index += 1
+        speculation = None
+        if index < len(self._processed_codes) and self._processed_codes[index] == code:
+            if self._graph is None:
+                self._graph = build_edit_graph(self._processed_codes)
+            speculation = self._speculations.pop(index, None)
+            self._speculate(index, context)
+            self._prefetch(index, context)
+
+        function_name = self._graph.nodes[index].function if speculation else None
+        if speculation is not None and context.get(function_name) is not speculation.function:
+            speculation.task.cancel()
+            speculation = None
+        if speculation is not None:
+            context[function_name] = self._create_replay(speculation)
+
+        try:
+            with use_inference_cache(self._cache):
+                return await super().execute(code, context, on_log)
+        finally:
+            if speculation is not None:
+                context[function_name] = speculation.function
+            self._stats.statements += 1
+            self._stats.wall_seconds += time.perf_counter() - start
+
+    def close(self) -> None:
+        """Cancel the requests no statement is waiting for."""
+        self._cancel_speculations()
+        self._discard_streamed(0)
+        self._cache.cancel_pending()
+
+    def _speculate(self, index: int, context: Dict[str, Any]) -> None:
+        # Nothing has run past the statement about to run, so it is the first
+        # statement a speculated call has to be independent of
+        for node in self._graph.get_live_nodes(index + 1):
+            if node.index in self._speculations or not self._can_speculate(node):
+                continue
+            if not self._graph.can_run_early(
+                node.index, index, self._effect_free_functions
+            ):
+                continue
+
+            function = context.get(node.function)
+            if function is None:
+                continue
+            try:
+                args, kwargs = evaluate_call_arguments(node.call, context)
+            except UnsupportedExpressionError:
+                continue
+
+            async def run(function=function, args=args, kwargs=kwargs) -> Any:
+                # The assignment keeps the return value check satisfied
+                result = await function(*args, **kwargs)
+                return result
+
+            task = self._cache.run_in_background(run())
+            self._speculations[node.index] = _Speculation(function, task)
+            self._stats.speculated_statements += 1
+
+    def _can_speculate(self, node: EditNode) -> bool:
+        return node.function in self._effect_free_functions and node.target is not None
+
+    def _create_replay(self, speculation: _Speculation) -> Callable:
+        async def replay(*args, **kwargs) -> Any:
+            start = time.perf_counter()
+            try:
+                return await asyncio.shield(speculation.task)
+            finally:
+                waited = time.perf_counter() - start
+                if speculation.duration is not None:
+                    self._stats.saved_seconds += max(
+                        0.0, speculation.duration - waited
+                    )
+
+        return replay
+
+    def _cancel_speculations(self) -> None:
+        for speculation in self._speculations.values():
+            speculation.task.cancel()
+        self._speculations = {}
+
+    def _discard_streamed(self, start: int) -> None:
+        for index in [index for index in self._streamed_prefetches if index >= start]:
+            for task in self._streamed_prefetches.pop(index):
+                task.cancel()
+            self._stats.discarded_statements += 1
+
+    def _prefetch(self, index: int, context: Dict[str, Any]) -> None:
+        # The statement about to run makes its own requests, and speculated
+        # statements make theirs in the background
+        for node in self._graph.get_live_nodes(index + 1):
+            if node.index in self._prefetched or node.index in self._speculations:
+                continue
+            if self._start_prefetch(self._graph, node, index, context) is not None:
+                self._prefetched.add(node.index)
+
+    def _start_prefetch(
+        self,
+        graph: EditGraph,
+        node: EditNode,
+        next_index: int,
+        context: Dict[str, Any],
+    ) -> Optional[List[asyncio.Task]]:
+        """Start the requests of a node, or return None if they cannot start yet."""
+        inference_request = self._inference_requests.get(node.function)
+        if inference_request is None or not graph.is_ready(node.index, next_index):
+            return None
+
+        try:
+            args, kwargs = evaluate_call_arguments(node.call, context)
+            request = start_inference_request(inference_request, args, kwargs)
+        except UnsupportedExpressionError:
+            return None
+        except Exception as e:
+            # The statement itself reports the problem when it runs
+            logger.debug(f"Skipped prefetching {node.code!r}: {e}")
+            return None
+
+        if request is None:
+            return []
+        return [self._cache.prefetch(request)]
+
+
+def _get_common_prefix_length(codes: List[str], other_codes: List[str]) -> int:
+    length = 0
+    for code, other_code in zip(codes, other_codes):
+        if code != other_code:
+            break
+        length += 1
+    return length
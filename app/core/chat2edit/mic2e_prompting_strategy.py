@@ -1,6 +1,19 @@
-from chat2edit.models import Feedback
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List
+
+from chat2edit.models import ChatCycle, Exemplar, Feedback, Message
 from chat2edit.prompting.strategies import OtcPromptingStrategy
 
+from app.core.chat2edit.function_selector import select_prompt_functions
+from app.env import FUNCTION_PRUNING
+
+logger = logging.getLogger(__name__)
+
+# Prompt prefixes kept, one per function set and exemplar selection
+MAX_PROMPT_PREFIXES = 64
+
 PROMPT_BASED_OBJECT_DETECTION_QUANTITY_MISMATCH_FEEDBACK_TEXT = "Expected to extract {expected_quantity} object(s) with prompt '{prompt}', but found {detected_quantity} object(s)."
 MISSING_FILTER_VALUE_FEEDBACK_TEXT = (
     "Filter value is required for filter '{filter_name}'."
@@ -13,8 +26,69 @@ FILTER_VALUE_OFFSET_FROM_OPTIMAL_FEEDBACK_TEXT = (
 
 
 class Mic2ePromptingStrategy(OtcPromptingStrategy):
+    """OTC prompting with the stable part of the prompt rendered once.
+
+    Everything before the current sequences (context code and exemplars)
+    only depends on the functions in the context and the exemplars, which
+    are fixed per interactive mode or exemplar selection. It is rendered
+    once per function set and exemplar selection and reused, so each prompt
+    only renders its cycles.
+
+    With function pruning, the prompt only describes the functions the
+    request needs. Execution still gets the full context, so a call to a
+    hidden function runs, and shows every function for the rest of the turn.
+    """
+
     def __init__(self) -> None:
         super().__init__()
+        self._prompt_prefixes: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def create_prompt(
+        self,
+        cycles: List[ChatCycle],
+        exemplars: List[Exemplar],
+        context: Dict[str, Any],
+    ) -> Message:
+        start = time.perf_counter()
+        if FUNCTION_PRUNING:
+            prompt_context = select_prompt_functions(cycles, exemplars, context)
+            logger.debug(
+                f"Showing {len(prompt_context)} of {len(context)} functions"
+            )
+            context = prompt_context
+        prefix = self.get_prompt_prefix(exemplars, context)
+        current_otc_sequences = "\n".join(map(self.create_otc_sequence, cycles))
+        prompt = Message(text=prefix + current_otc_sequences)
+        logger.debug(
+            f"Created prompt in {(time.perf_counter() - start) * 1000:.2f}ms"
+        )
+        return prompt
+
+    def get_prompt_prefix(
+        self, exemplars: List[Exemplar], context: Dict[str, Any]
+    ) -> str:
+        """Get the prompt up to the current sequences, rendering it on first use.
+
+        Exemplars are identified by object, so they must not change after
+        being contextualized; the context provider hands out the same objects.
+        """
+        key = (tuple(context), tuple(id(exemplar) for exemplar in exemplars))
+        prefix = self._prompt_prefixes.get(key)
+        if prefix is not None:
+            self._prompt_prefixes.move_to_end(key)
+        else:
+            start = time.perf_counter()
+            # The template ends with the current sequences
+            prefix = super().create_prompt([], exemplars, context).text
+            self._prompt_prefixes[key] = prefix
+            if len(self._prompt_prefixes) > MAX_PROMPT_PREFIXES:
+                self._prompt_prefixes.popitem(last=False)
+            logger.info(
+                f"Built prompt prefix for {len(context)} functions and "
+                f"{len(exemplars)} exemplars in "
+                f"{(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+        return prefix
 
     def create_feedback_text(self, feedback: Feedback) -> str:
         feedback_type = feedback.type
@@ -1,8 +1,9 @@
-from typing import Annotated, ClassVar, List, Optional, Union
+from copy import deepcopy
+from typing import Annotated, Any, ClassVar, List, Optional, Union
 
 from PIL import ImageEnhance, ImageFilter, ImageOps
 from PIL.Image import Image as PILImage
-from pydantic import Field
+from pydantic import Field, PrivateAttr, field_serializer, field_validator
 
 from app.core.chat2edit.models.box import Box
 from app.core.chat2edit.models.fabric.filters import FabricFilter
@@ -18,6 +19,7 @@ from app.core.chat2edit.models.fabric.objects import (
     FabricObject,
 )
 from app.core.chat2edit.models.object import Object
+from app.core.chat2edit.models.object_collection import ObjectCollection
 from app.core.chat2edit.models.point import Point
 from app.core.chat2edit.models.referent import Referent
 from app.core.chat2edit.models.scribble import Scribble
@@ -71,7 +73,7 @@ class Image(FabricGroup, Referent):
     )
 
     objects: List[Entity] = Field(
-        default_factory=list, description="Child objects in the image"
+        default_factory=ObjectCollection, description="Child objects in the image"
     )
     
     aesthetic_feedback_given: bool = Field(
@@ -79,6 +81,40 @@ class Image(FabricGroup, Referent):
         description="Track if aesthetic feedback has been given for this image"
     )
 
+    # ObjectSpatialIndex over the objects, built on first query
+    _spatial_index: Any = PrivateAttr(default=None)
+    # Copies of the objects whose holes still have to be inpainted, frozen at
+    # the position they had when the inpaint was deferred. The objects are
+    # already marked inpainted, so an image with pending inpaints is never
+    # serialized
+    _pending_inpaints: List[Object] = PrivateAttr(default_factory=list)
+
+    @field_validator("objects", mode="after")
+    @classmethod
+    def _index_objects(cls, objects: List[Entity]) -> ObjectCollection:
+        return ObjectCollection(objects)
+
+    @field_serializer("objects", mode="wrap")
+    def _serialize_objects(self, objects: ObjectCollection, handler):
+        self.check_no_pending_inpaints()
+        return handler(list(objects))
+
+    def snapshot(self) -> "Image":
+        """Copy the image in O(1).
+
+        Child objects are shared with this image and copied the first time
+        either image hands them out (see `ObjectCollection.snapshot`).
+        """
+        fields = {
+            name: deepcopy(value)
+            for name, value in self.__dict__.items()
+            if name != "objects"
+        }
+        fields["objects"] = self.objects.snapshot()
+        image = self.model_construct(_fields_set=set(self.model_fields_set), **fields)
+        image._pending_inpaints = list(self._pending_inpaints)
+        return image
+
     def from_image(image: PILImage) -> "Image":
         base_image = FabricImage(
             src=convert_image_to_data_url(image), width=image.width, height=image.height
@@ -111,6 +147,32 @@ class Image(FabricGroup, Referent):
         
         return pil_image
 
+    def has_pending_inpaints(self) -> bool:
+        return len(self._pending_inpaints) > 0
+
+    def defer_inpaint(self, objects: List[Object]) -> "Image":
+        """Record the objects' current areas as holes to inpaint later."""
+        # Rebind rather than extend: `model_copy` shares the list with copies
+        self._pending_inpaints = [
+            *self._pending_inpaints,
+            *(obj.model_copy() for obj in objects),
+        ]
+        return self
+
+    def get_pending_inpaints(self) -> List[Object]:
+        return list(self._pending_inpaints)
+
+    def clear_pending_inpaints(self) -> "Image":
+        self._pending_inpaints = []
+        return self
+
+    def check_no_pending_inpaints(self) -> None:
+        if self.has_pending_inpaints():
+            raise ValueError(
+                f"Image {self.id} has pending inpaints; "
+                "materialize them before serializing it"
+            )
+
     def get_objects(self) -> List[FabricObject]:
         return self.objects[1:] if len(self.objects) > 1 else []
 
@@ -123,12 +185,12 @@ class Image(FabricGroup, Referent):
         return self
 
     def remove_object(self, object: FabricObject) -> "Image":
-        self.objects = [obj for obj in self.objects if obj.id != object.id]
+        self.objects.discard(object.id)
         return self
 
     def remove_objects(self, objects: List[FabricObject]) -> "Image":
-        object_ids = set([obj.id for obj in objects])
-        self.objects = [obj for obj in self.objects if obj.id not in object_ids]
+        for obj in objects:
+            self.objects.discard(obj.id)
         return self
 
     def apply_filter(self, filter: FabricFilter) -> "Image":
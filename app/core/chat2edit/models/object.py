@@ -4,6 +4,7 @@ from pydantic import Field
 
 from app.core.chat2edit.models.fabric.objects import FabricImage
 from app.core.chat2edit.models.referent import Referent
+from app.core.chat2edit.models.rle_mask import RleMask
 
 
 class Object(FabricImage, Referent):
@@ -19,3 +20,6 @@ class Object(FabricImage, Referent):
     evented: bool = Field(
         default=True, description="Whether the object receives events"
     )
+    rle_mask: Optional[RleMask] = Field(
+        default=None, description="Run-length encoded alpha mask of the object"
+    )
@@ -0,0 +1,184 @@
+from collections.abc import MutableSequence
+from copy import deepcopy
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Union, overload
+
+from app.core.chat2edit.models.fabric.objects import FabricObject
+
+
+class ObjectCollection(MutableSequence):
+    """Ordered collection of Fabric.js objects indexed by id.
+
+    Lookup, membership and removal by id are O(1). Positional access goes
+    through a list snapshot that is rebuilt lazily after the collection
+    changes, so it behaves like the plain list it replaces. Ids are unique:
+    appending an object whose id is already present replaces it in place.
+    `version` increases on every change to the collection.
+
+    `snapshot()` copies the collection in O(1). Both collections then share
+    their objects and copy each one the first time it is handed out, so only
+    the objects that are actually accessed are ever copied. Use `peek()` for
+    read-only access that should not trigger copies.
+    """
+
+    def __init__(self, objects: Iterable[FabricObject] = ()) -> None:
+        self._objects: Dict[str, FabricObject] = {}
+        self._snapshot: Optional[List[FabricObject]] = None
+        self.version = 0
+        # Ids of the objects this collection may hand out without copying,
+        # None when it owns all of them
+        self._owned_ids: Optional[Set[str]] = None
+        self._shares_objects_dict = False
+        self.extend(objects)
+
+    def snapshot(self) -> "ObjectCollection":
+        """Copy the collection in O(1), sharing objects until they are accessed."""
+        clone = ObjectCollection.__new__(ObjectCollection)
+        clone._objects = self._objects
+        clone._snapshot = self._snapshot
+        clone.version = 0
+        clone._owned_ids = set()
+        clone._shares_objects_dict = True
+
+        self._owned_ids = set()
+        self._shares_objects_dict = True
+        return clone
+
+    def peek(self) -> List[FabricObject]:
+        """Get the objects without taking ownership; the result must not be mutated."""
+        return self._get_snapshot()
+
+    def get(self, object_id: str) -> Optional[FabricObject]:
+        obj = self._objects.get(object_id)
+        if obj is None:
+            return None
+        return self._own([obj])[0]
+
+    def has(self, object_id: str) -> bool:
+        return object_id in self._objects
+
+    def discard(self, object_id: str) -> bool:
+        """Remove the object with the given id if present."""
+        if object_id not in self._objects:
+            return False
+        self._get_objects_dict().pop(object_id)
+        self._invalidate()
+        return True
+
+    def append(self, obj: FabricObject) -> None:
+        self._get_objects_dict()[obj.id] = obj
+        if self._owned_ids is not None:
+            self._owned_ids.add(obj.id)
+        self._invalidate()
+
+    def remove(self, obj: FabricObject) -> None:
+        if not self.discard(obj.id):
+            raise ValueError(f"Object {obj.id} not in collection")
+
+    def insert(self, index: int, obj: FabricObject) -> None:
+        objects = [item for item in self._get_snapshot() if item.id != obj.id]
+        objects.insert(index, obj)
+        self._reset(objects)
+        if self._owned_ids is not None:
+            self._owned_ids.add(obj.id)
+
+    def clear(self) -> None:
+        self._objects = {}
+        self._shares_objects_dict = False
+        self._invalidate()
+
+    @overload
+    def __getitem__(self, index: int) -> FabricObject: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[FabricObject]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[FabricObject, List[FabricObject]]:
+        if isinstance(index, slice):
+            return self._own(self._get_snapshot()[index])
+        return self._own([self._get_snapshot()[index]])[0]
+
+    def __setitem__(self, index, value) -> None:
+        objects = list(self._get_snapshot())
+        objects[index] = value
+        self._reset(objects)
+        if self._owned_ids is not None:
+            values = value if isinstance(index, slice) else [value]
+            self._owned_ids.update(obj.id for obj in values)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        removed = self._get_snapshot()[index]
+        objects = self._get_objects_dict()
+        for obj in removed if isinstance(index, slice) else [removed]:
+            del objects[obj.id]
+        self._invalidate()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self) -> Iterator[FabricObject]:
+        # Iterate a snapshot so the collection can be modified while looping
+        return iter(self._own(self._get_snapshot()))
+
+    def __contains__(self, obj: object) -> bool:
+        return isinstance(obj, FabricObject) and obj.id in self._objects
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ObjectCollection):
+            return self._get_snapshot() == other._get_snapshot()
+        if isinstance(other, list):
+            return self._get_snapshot() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._get_snapshot())
+
+    def __deepcopy__(self, memo: dict) -> "ObjectCollection":
+        return ObjectCollection(deepcopy(self._get_snapshot(), memo))
+
+    def _own(self, objects: List[FabricObject]) -> List[FabricObject]:
+        """Copy the shared objects among `objects` into this collection."""
+        if self._owned_ids is None:
+            return objects
+
+        owned_objects = []
+        copied = False
+        for obj in objects:
+            if obj.id not in self._owned_ids:
+                obj = _copy_object(obj)
+                self._get_objects_dict()[obj.id] = obj
+                self._owned_ids.add(obj.id)
+                copied = True
+            owned_objects.append(obj)
+
+        if copied:
+            self._invalidate()
+        return owned_objects
+
+    def _get_objects_dict(self) -> Dict[str, FabricObject]:
+        if self._shares_objects_dict:
+            self._objects = dict(self._objects)
+            self._shares_objects_dict = False
+        return self._objects
+
+    def _get_snapshot(self) -> List[FabricObject]:
+        if self._snapshot is None:
+            self._snapshot = list(self._objects.values())
+        return self._snapshot
+
+    def _reset(self, objects: List[FabricObject]) -> None:
+        self._objects = {obj.id: obj for obj in objects}
+        self._shares_objects_dict = False
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._snapshot = None
+        self.version += 1
+
+
+def _copy_object(obj: FabricObject) -> FabricObject:
+    snapshot = getattr(obj, "snapshot", None)
+    if callable(snapshot):
+        return snapshot()
+    return deepcopy(obj)
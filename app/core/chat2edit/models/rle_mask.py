@@ -0,0 +1,43 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from app.utils.rle_utils import (
+    compress_rle_counts,
+    decode_rle_counts_to_mask,
+    decompress_rle_counts,
+    encode_mask_to_rle_counts,
+    get_rle_counts_area,
+    get_rle_counts_bbox,
+    paste_rle_counts,
+)
+
+
+class RleMask(BaseModel):
+    """Binary mask in COCO compressed run-length encoding."""
+
+    size: Tuple[int, int] = Field(description="Mask size as (height, width)")
+    counts: str = Field(description="Compressed column-major run lengths")
+
+    @staticmethod
+    def from_mask(mask: np.ndarray) -> "RleMask":
+        return RleMask(
+            size=mask.shape[:2],
+            counts=compress_rle_counts(encode_mask_to_rle_counts(mask)),
+        )
+
+    def get_counts(self) -> List[int]:
+        return decompress_rle_counts(self.counts)
+
+    def to_mask(self) -> np.ndarray:
+        return decode_rle_counts_to_mask(self.get_counts(), self.size)
+
+    def get_bbox(self) -> Optional[Tuple[int, int, int, int]]:
+        return get_rle_counts_bbox(self.get_counts(), self.size)
+
+    def get_area(self) -> int:
+        return get_rle_counts_area(self.get_counts())
+
+    def paste_into(self, canvas: np.ndarray, x: int, y: int) -> np.ndarray:
+        return paste_rle_counts(canvas, self.get_counts(), self.size, x, y)
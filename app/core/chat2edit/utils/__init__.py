@@ -1,9 +1,19 @@
 from app.core.chat2edit.utils.image_utils import get_own_objects, get_same_objects
 from app.core.chat2edit.utils.inpaint_utils import (
     create_composite_mask,
+    create_expanded_composite_mask,
+    get_composite_mask_bbox,
     inpaint_objects,
     inpaint_objects_with_prompt,
     inpaint_uninpainted_objects_in_entities,
+    materialize_pending_inpaints,
+    materialize_pending_inpaints_in_values,
+)
+from app.core.chat2edit.utils.spatial_index import (
+    get_mask_iou,
+    get_objects_at_point,
+    get_objects_in_box,
+    get_spatial_index,
 )
 
 __all__ = [
@@ -12,5 +22,13 @@ __all__ = [
     "inpaint_objects",
     "inpaint_objects_with_prompt",
     "inpaint_uninpainted_objects_in_entities",
+    "materialize_pending_inpaints",
+    "materialize_pending_inpaints_in_values",
     "create_composite_mask",
+    "create_expanded_composite_mask",
+    "get_composite_mask_bbox",
+    "get_mask_iou",
+    "get_objects_at_point",
+    "get_objects_in_box",
+    "get_spatial_index",
 ]
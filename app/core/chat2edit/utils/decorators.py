@@ -0,0 +1,51 @@
+import inspect
+from copy import deepcopy
+from functools import wraps
+from typing import Callable
+
+from chat2edit.prompting.stubbing.decorators import exclude_this_decorator_factory
+
+
+@exclude_this_decorator_factory
+def snapshot_parameter(param: str) -> Callable:
+    """Like chat2edit's `deepcopy_parameter`, but copies values that support it
+    with their O(1) copy-on-write `snapshot()` instead of a deep copy."""
+
+    def decorator(func: Callable) -> Callable:
+        # Resolve through wrapping decorators, whose own code only takes *args
+        params = list(inspect.signature(func).parameters)
+
+        def check_and_transform_args_kwargs(args, kwargs):
+            if param in params:
+                index = params.index(param)
+                if index < len(args):
+                    args = tuple(
+                        _snapshot(arg) if i == index else arg
+                        for i, arg in enumerate(args)
+                    )
+
+            if param in kwargs:
+                kwargs[param] = _snapshot(kwargs[param])
+
+            return args, kwargs
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            args, kwargs = check_and_transform_args_kwargs(args, kwargs)
+            return func(*args, **kwargs)
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            args, kwargs = check_and_transform_args_kwargs(args, kwargs)
+            return await func(*args, **kwargs)
+
+        return async_wrapper if inspect.iscoroutinefunction(func) else wrapper
+
+    return decorator
+
+
+def _snapshot(value):
+    snapshot = getattr(value, "snapshot", None)
+    if callable(snapshot):
+        return snapshot()
+    return deepcopy(value)
@@ -1,22 +1,34 @@
 from typing import List
-from app.core.chat2edit.models import Image
+from app.core.chat2edit.models import Image, Object
 from app.core.chat2edit.models.fabric.objects import FabricObject
+from app.core.chat2edit.utils.spatial_index import get_mask_iou, get_overlapping_objects
 
+# Mask IoU above which a new segmentation replaces an existing object
+SAME_OBJECT_IOU_THRESHOLD = 0.9
 
-def get_own_objects(image: Image, objects: List[FabricObject]) -> List[FabricObject]:
-    object_ids = set(obj.id for obj in objects)
-    return [obj for obj in image.get_objects() if obj.id in object_ids]
 
+def get_own_objects(image: Image, objects: List[FabricObject]) -> List[FabricObject]:
+    base_id = image.objects[0].id if len(image.objects) > 0 else None
+    own_objects = {}
+    for obj in objects:
+        own_object = image.objects.get(obj.id)
+        if own_object is not None and obj.id != base_id:
+            own_objects[obj.id] = own_object
+    return list(own_objects.values())
 
-def get_same_objects(image: Image, objects: List[FabricObject]) -> List[FabricObject]:
-    coord_label_set = set(map(_get_coord_label, objects))
-    same_objects = [
-        obj for obj in image.get_objects()
-        if _get_coord_label(obj) in coord_label_set
-    ]
 
-    return same_objects
+def get_same_objects(image: Image, objects: List[Object]) -> List[Object]:
+    """Get the image's objects whose mask is the same as one of `objects`'.
 
+    Masks are the same when their IoU is at least SAME_OBJECT_IOU_THRESHOLD,
+    so a re-segmentation with slightly different edges replaces the object.
+    """
+    same_objects = {}
+    for obj in objects:
+        for other in get_overlapping_objects(image, obj):
+            if other.id in same_objects:
+                continue
+            if get_mask_iou(image, obj, other) >= SAME_OBJECT_IOU_THRESHOLD:
+                same_objects[other.id] = other
 
-def _get_coord_label(obj: FabricObject) -> str:
-    return f"{obj.left}-{obj.top}-{obj.width}-{obj.height}"
\ No newline at end of file
+    return list(same_objects.values())
@@ -1,5 +1,7 @@
-from typing import List, Union
+import asyncio
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple, Union
 
+import numpy as np
 from PIL import Image as PILImage
 
 from app.clients.inference_client import inference_client
@@ -8,18 +10,20 @@ from app.core.chat2edit.models.image import Image
 from app.core.chat2edit.models.object import Object
 from app.core.chat2edit.models.point import Point
 from app.core.chat2edit.models.text import Text
-from app.utils.image_utils import convert_data_url_to_image, expand_mask_image
+from app.core.chat2edit.utils.object_utils import get_object_rle_mask
+from app.env import DEFERRED_INPAINTING
+from app.utils.mask_utils import dilate_mask, get_dilation_radius
 
+OBJECT_CLEAR_PROMPT = "remove the instance of the object"
 
-async def inpaint_objects(image: Image, objects: List[Object]) -> Image:
-    composite_mask = create_composite_mask(image, objects)
-    expanded_mask = expand_mask_image(composite_mask)
-    pil_image = image.get_image()
 
+async def inpaint_objects(image: Image, objects: List[Object]) -> Image:
+    pil_image, expanded_mask = _create_object_clear_request(image, objects)
     inpainted_image = await inference_client.object_clear_inpaint(
-        pil_image, expanded_mask, "remove the instance of the object"
+        pil_image, expanded_mask, OBJECT_CLEAR_PROMPT
     )
     image.set_image(inpainted_image)
+    image.clear_pending_inpaints()
 
     for object in objects:
         object.inpainted = True
@@ -40,8 +44,8 @@ async def inpaint_objects_with_prompt(
     Returns:
         Image with the objects inpainted according to the prompt
     """
-    composite_mask = create_composite_mask(image, objects)
-    expanded_mask = expand_mask_image(composite_mask)
+    image = await materialize_pending_inpaints(image)
+    expanded_mask = create_expanded_composite_mask(image, objects)
     pil_image = image.get_image()
 
     inpainted_image = await inference_client.sd_inpaint(
@@ -61,31 +65,191 @@ async def inpaint_objects_with_prompt(
 async def inpaint_uninpainted_objects_in_entities(
     image: Image, entities: List[Union[Image, Object, Text, Box, Point]]
 ) -> Image:
-    objects_to_inpaint = [
-        entity
-        for entity in entities
-        if isinstance(entity, Object)
-        and not entity.inpainted
-        and entity.image_id == image.id
-    ]
+    objects_to_inpaint = _get_uninpainted_objects(image, entities)
+    if len(objects_to_inpaint) == 0:
+        return image
+
+    if DEFERRED_INPAINTING:
+        image.defer_inpaint(objects_to_inpaint)
+        for object in objects_to_inpaint:
+            object.inpainted = True
+        return image
+
+    return await inpaint_objects(image, objects_to_inpaint)
+
+
+def prefetch_objects_with_prompt(
+    image: Image, objects: List[Object], prompt: str
+) -> Optional[Awaitable[PILImage.Image]]:
+    """Start the first request `inpaint_objects_with_prompt` would make."""
+    if image.has_pending_inpaints():
+        return prefetch_pending_inpaints(image)
+    return inference_client.sd_inpaint(
+        image=image.get_image(),
+        mask=create_expanded_composite_mask(image, objects),
+        prompt=prompt,
+    )
+
+
+def prefetch_uninpainted_objects_in_entities(
+    image: Image, entities: List[Union[Image, Object, Text, Box, Point]]
+) -> Optional[Awaitable[PILImage.Image]]:
+    """Start the request `inpaint_uninpainted_objects_in_entities` would make.
 
-    if len(objects_to_inpaint) > 0:
-        image = await inpaint_objects(image, objects_to_inpaint)
+    Returns None when it would make none.
+    """
+    objects_to_inpaint = _get_uninpainted_objects(image, entities)
+    if len(objects_to_inpaint) == 0 or DEFERRED_INPAINTING:
+        return None
+    return inference_client.object_clear_inpaint(
+        *_create_object_clear_request(image, objects_to_inpaint), OBJECT_CLEAR_PROMPT
+    )
 
+
+def prefetch_pending_inpaints(image: Image) -> Optional[Awaitable[PILImage.Image]]:
+    """Start the request `materialize_pending_inpaints` would make, if any."""
+    if not image.has_pending_inpaints():
+        return None
+    return inference_client.object_clear_inpaint(
+        *_create_object_clear_request(image, []), OBJECT_CLEAR_PROMPT
+    )
+
+
+async def materialize_pending_inpaints(image: Image) -> Image:
+    """Inpaint the image's pending holes with one call over their union mask.
+
+    Must be awaited before reading the pixels of an image that may have
+    deferred inpaints (see `DEFERRED_INPAINTING`).
+    """
+    if image.has_pending_inpaints():
+        image = await inpaint_objects(image, [])
     return image
 
 
+async def materialize_pending_inpaints_in_values(values: Iterable[Any]) -> None:
+    """Materialize the pending inpaints of every image in `values`, in place.
+
+    Lists and dicts are searched recursively. Snapshots of the same image
+    with the same pending holes share a single inpaint call.
+    """
+    groups: Dict[Tuple, List[Image]] = {}
+    for image in _iter_images(values):
+        if image.has_pending_inpaints():
+            groups.setdefault(_get_pending_inpaint_key(image), []).append(image)
+
+    async def materialize(images: List[Image]) -> None:
+        source = await materialize_pending_inpaints(images[0])
+        for image in images[1:]:
+            image.clear_pending_inpaints()
+            image.set_image(source.get_image(apply_filters=False))
+
+    await asyncio.gather(*(materialize(images) for images in groups.values()))
+
+
 def create_composite_mask(image: Image, objects: List[Object]) -> PILImage.Image:
     if not objects:
         raise ValueError("Cannot create mask from empty object list")
 
-    mask = PILImage.new("L", (int(image.width), int(image.height)), 0)
+    mask = np.zeros((int(image.height), int(image.width)), dtype=bool)
     for object in objects:
-        object_image = convert_data_url_to_image(object.src)
-        object_mask = object_image.convert("RGBA").getchannel("A")
-        mask.paste(
-            object_mask,
-            (int(object.left - object.width / 2 + image.width / 2), int(object.top - object.height / 2 + image.height / 2)),
-        )
-
-    return mask
+        x, y = _get_object_mask_offset(image, object)
+        get_object_rle_mask(object).paste_into(mask, x, y)
+
+    return PILImage.fromarray(mask.astype(np.uint8) * 255)
+
+
+def create_expanded_composite_mask(
+    image: Image, objects: List[Object], iterations: Optional[int] = None
+) -> PILImage.Image:
+    """Create the composite mask dilated by `iterations` pixels.
+
+    The radius scales with the image resolution unless given. The dilation
+    only runs inside the union bbox, which is read from the objects' RLEs.
+    """
+    composite_mask = np.asarray(create_composite_mask(image, objects)) > 127
+    if iterations is None:
+        iterations = get_dilation_radius(int(image.width), int(image.height))
+
+    expanded_mask = dilate_mask(
+        composite_mask, iterations, bbox=get_composite_mask_bbox(image, objects)
+    )
+    return PILImage.fromarray(expanded_mask.astype(np.uint8) * 255)
+
+
+def get_composite_mask_bbox(
+    image: Image, objects: List[Object]
+) -> Optional[Tuple[int, int, int, int]]:
+    """Get the (x1, y1, x2, y2) bbox of the objects' union mask from their RLEs."""
+    bboxes = []
+    for object in objects:
+        bbox = get_object_rle_mask(object).get_bbox()
+        if bbox is None:
+            continue
+        x, y = _get_object_mask_offset(image, object)
+        bboxes.append((bbox[0] + x, bbox[1] + y, bbox[2] + x, bbox[3] + y))
+
+    if not bboxes:
+        return None
+
+    x1, y1, x2, y2 = zip(*bboxes)
+    return (
+        max(0, min(x1)),
+        max(0, min(y1)),
+        min(int(image.width), max(x2)),
+        min(int(image.height), max(y2)),
+    )
+
+
+def _get_uninpainted_objects(
+    image: Image, entities: List[Union[Image, Object, Text, Box, Point]]
+) -> List[Object]:
+    return [
+        entity
+        for entity in entities
+        if isinstance(entity, Object)
+        and not entity.inpainted
+        and entity.image_id == image.id
+    ]
+
+
+def _create_object_clear_request(
+    image: Image, objects: List[Object]
+) -> Tuple[PILImage.Image, PILImage.Image]:
+    # Pending holes are cleared by the same request
+    holes = image.get_pending_inpaints() + list(objects)
+    expanded_mask = create_expanded_composite_mask(image, holes)
+    return image.get_image(), expanded_mask
+
+
+def _iter_images(values: Iterable[Any]) -> Iterable[Image]:
+    seen = set()
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Image):
+            if id(value) not in seen:
+                seen.add(id(value))
+                yield value
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+
+
+def _get_pending_inpaint_key(image: Image) -> Tuple:
+    base_image = image.objects.peek()[0] if len(image.objects) > 0 else None
+    return (
+        image.id,
+        getattr(base_image, "src", None),
+        tuple(
+            (hole.id, hole.left, hole.top, hole.width, hole.height)
+            for hole in image.get_pending_inpaints()
+        ),
+    )
+
+
+def _get_object_mask_offset(image: Image, object: Object) -> Tuple[int, int]:
+    return (
+        int(object.left - object.width / 2 + image.width / 2),
+        int(object.top - object.height / 2 + image.height / 2),
+    )
@@ -1,7 +1,16 @@
+import asyncio
+from typing import List, Tuple
+
+import numpy as np
 from PIL import Image
 
 from app.core.chat2edit.models import Object
-from app.utils.image_utils import convert_image_to_data_url
+from app.core.chat2edit.models.rle_mask import RleMask
+from app.utils.image_utils import convert_data_url_to_image, convert_image_to_data_url
+from app.utils.process_pool import SharedArray, attach_ndarray, get_process_pool, share_ndarray
+
+# Below this many masks the pool round-trip costs more than it saves
+MIN_MASKS_FOR_PROCESS_POOL = 4
 
 
 def create_object_from_image_and_mask(
@@ -16,6 +25,7 @@ def create_object_from_image_and_mask(
 
     obj = Object()
     obj.src = convert_image_to_data_url(obj_image)
+    obj.rle_mask = _create_rle_mask_from_sprite(obj_image)
     obj.width = obj_width
     obj.height = obj_height
     obj.left = bbox[0] + obj_width / 2 - image.width / 2
@@ -24,3 +34,88 @@ def create_object_from_image_and_mask(
     obj.evented = True
 
     return obj
+
+
+async def create_objects_from_image_and_masks(
+    image: Image.Image,
+    masks: List[Image.Image],
+) -> List[Object]:
+    """Materialize one object per mask, encoding the sprites in the process pool.
+
+    The source pixels are placed in shared memory once; each task only carries
+    its cropped mask. Produces the same objects as calling
+    `create_object_from_image_and_mask` for every mask.
+    """
+    if len(masks) < MIN_MASKS_FOR_PROCESS_POOL:
+        return [create_object_from_image_and_mask(image, mask) for mask in masks]
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    bboxes = [mask.getbbox() for mask in masks]
+    if any(bbox is None for bbox in bboxes):
+        raise ValueError("Cannot create object from empty mask")
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+
+    with share_ndarray(np.asarray(image)) as shared_image:
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool,
+                    _create_object_sprite,
+                    shared_image,
+                    image.mode,
+                    np.asarray(mask.convert("L").crop(bbox)),
+                    bbox,
+                )
+                for mask, bbox in zip(masks, bboxes)
+            )
+        )
+
+    objects = []
+    for (data_url, rle_mask), bbox in zip(results, bboxes):
+        obj_width = bbox[2] - bbox[0]
+        obj_height = bbox[3] - bbox[1]
+
+        obj = Object()
+        obj.src = data_url
+        obj.rle_mask = rle_mask
+        obj.width = obj_width
+        obj.height = obj_height
+        obj.left = bbox[0] + obj_width / 2 - image.width / 2
+        obj.top = bbox[1] + obj_height / 2 - image.height / 2
+        obj.selectable = True
+        obj.evented = True
+        objects.append(obj)
+
+    return objects
+
+
+def _create_object_sprite(
+    shared_image: SharedArray,
+    mode: str,
+    mask_crop: np.ndarray,
+    bbox: Tuple[int, int, int, int],
+) -> Tuple[str, RleMask]:
+    """Process pool worker: crop the shared source image, encode the sprite and its mask."""
+    x1, y1, x2, y2 = bbox
+    with attach_ndarray(shared_image) as image_array:
+        image_crop = Image.fromarray(image_array[y1:y2, x1:x2].copy(), mode)
+
+    obj_image = Image.new("RGBA", (x2 - x1, y2 - y1), (0, 0, 0, 0))
+    obj_image.paste(image_crop, (0, 0), Image.fromarray(mask_crop, "L"))
+    return convert_image_to_data_url(obj_image), _create_rle_mask_from_sprite(obj_image)
+
+
+def get_object_rle_mask(obj: Object) -> RleMask:
+    """Get the object's RLE mask, deriving it from `src` for older objects."""
+    if obj.rle_mask is None:
+        obj.rle_mask = _create_rle_mask_from_sprite(convert_data_url_to_image(obj.src))
+    return obj.rle_mask
+
+
+def _create_rle_mask_from_sprite(sprite: Image.Image) -> RleMask:
+    alpha = np.asarray(sprite.convert("RGBA").getchannel("A"))
+    return RleMask.from_mask(alpha > 127)
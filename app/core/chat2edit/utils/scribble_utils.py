@@ -1,10 +1,18 @@
-from typing import List, Tuple
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
+import numpy as np
 import svgpathtools
-from PIL import Image as PILImage, ImageDraw
+from PIL import Image as PILImage
 
-from app.core.chat2edit.models.image import Image
 from app.core.chat2edit.models.scribble import Scribble
+from app.utils.path_utils import ParsedPath, parse_path
+from app.utils.pixel_kernels import rasterize_thick_polyline
+
+# Parsed paths keyed by scribble id, so a scribble used as both a prompt and
+# a location (or across prompt cycles) is only parsed once
+MAX_CACHED_SCRIBBLE_PATHS = 256
+_scribble_path_cache: "OrderedDict[str, Tuple[int, Optional[ParsedPath]]]" = OrderedDict()
 
 
 def _convert_path_commands_to_svg_string(path_commands: List) -> str:
@@ -55,79 +63,106 @@ def _sample_path_points(
         return []
 
 
-def convert_scribble_to_mask_image(scribble: Scribble, image: Image) -> PILImage.Image:
-    """Convert a scribble path to a binary mask image using svgpathtools.
+def sample_scribble_points(
+    scribble: Scribble, num_samples: Optional[int] = None
+) -> np.ndarray:
+    """Sample points evenly along a scribble path.
 
     Args:
-        scribble: Scribble object containing path data and stroke properties
-        image: Image object to get dimensions from
+        scribble: Scribble object containing path data
+        num_samples: Number of points, adaptive to the path length if omitted
 
     Returns:
-        PIL Image in 'L' mode (grayscale) where white (255) represents the scribble
+        (n, 2) array of (x, y) image coordinates, empty if the path is empty
     """
-    image_pil = image.get_image()
-    img_width, img_height = image_pil.size
-    mask = PILImage.new("L", (img_width, img_height), 0)
-
     path_data = scribble.path
-    if not path_data:
-        return mask
-    if isinstance(path_data, str) and not path_data.strip():
-        return mask
-    if isinstance(path_data, list) and len(path_data) == 0:
-        return mask
+    if not path_data or (isinstance(path_data, str) and not path_data.strip()):
+        return np.empty((0, 2))
+
+    parsed_path = _get_parsed_scribble_path(scribble)
+    if parsed_path is not None:
+        return parsed_path.sample(num_samples)
 
-    # Convert path data to SVG string if needed
+    # Commands the vectorized parser does not handle (arcs, smooth curves)
     if isinstance(path_data, list):
         path_string = _convert_path_commands_to_svg_string(path_data)
     else:
         path_string = path_data
+    points = _sample_path_points(path_string, num_samples=num_samples or 500)
+    return np.array(points, dtype=np.float64).reshape(-1, 2)
 
-    if not path_string.strip():
-        return mask
 
-    # Sample points from the SVG path using svgpathtools
-    sampled_points = _sample_path_points(path_string, num_samples=500)
+def _get_parsed_scribble_path(scribble: Scribble) -> Optional[ParsedPath]:
+    signature = hash(str(scribble.path))
+    cached = _scribble_path_cache.get(scribble.id)
+    if cached is not None and cached[0] == signature:
+        _scribble_path_cache.move_to_end(scribble.id)
+        return cached[1]
+
+    parsed_path = parse_path(scribble.path)
+    _scribble_path_cache[scribble.id] = (signature, parsed_path)
+    if len(_scribble_path_cache) > MAX_CACHED_SCRIBBLE_PATHS:
+        _scribble_path_cache.popitem(last=False)
+    return parsed_path
+
+
+def convert_scribble_to_points(
+    scribble: Scribble, width: int, height: int, num_points: int = 10
+) -> List[Tuple[int, int]]:
+    """Pick prompt points along a scribble, evenly spaced by arc length.
+
+    Points come straight from the path geometry, so no mask is rasterized.
+
+    Args:
+        scribble: Scribble object containing path data
+        width: Width of the image the scribble was drawn on
+        height: Height of the image the scribble was drawn on
+        num_points: Number of points to pick
+
+    Returns:
+        List of (x, y) pixel coordinates clamped to the image
+    """
+    sampled_points = sample_scribble_points(scribble, num_points)
+    if len(sampled_points) == 0:
+        return []
+
+    points = sampled_points.astype(np.int64)
+    points[:, 0] = np.clip(points[:, 0], 0, width - 1)
+    points[:, 1] = np.clip(points[:, 1], 0, height - 1)
+    return [(int(x), int(y)) for x, y in points]
+
 
+def convert_scribble_to_mask_image(
+    scribble: Scribble, width: int, height: int
+) -> PILImage.Image:
+    """Convert a scribble path to a binary mask image.
+
+    Args:
+        scribble: Scribble object containing path data and stroke properties
+        width: Width of the image the scribble was drawn on
+        height: Height of the image the scribble was drawn on
+
+    Returns:
+        PIL Image in 'L' mode (grayscale) where white (255) represents the scribble
+    """
+    mask = PILImage.new("L", (width, height), 0)
+
+    sampled_points = sample_scribble_points(scribble)
     if len(sampled_points) < 2:
         return mask
 
     # Path coordinates from Fabric.js are already in image pixel coordinates
     # where (0,0) is at top-left of the image, no transformation needed
     # Just clamp to image bounds
-    transformed_points = []
-    for x, y in sampled_points:
-        img_x = int(x)
-        img_y = int(y)
-        # Clamp to image bounds
-        img_x = max(0, min(img_x, img_width - 1))
-        img_y = max(0, min(img_y, img_height - 1))
-        transformed_points.append((img_x, img_y))
-
-    if len(transformed_points) < 2:
-        return mask
+    points = sampled_points.astype(np.int64)
+    points[:, 0] = np.clip(points[:, 0], 0, width - 1)
+    points[:, 1] = np.clip(points[:, 1], 0, height - 1)
 
-    # Draw the path on the mask
-    draw = ImageDraw.Draw(mask)
+    # Round-capped stroke as one distance-to-polyline pass. The radius matches
+    # the previous PIL rendering (lines of `stroke_width` plus dots of radius
+    # max(2, stroke_width // 2) at every sample), covering pixel centers.
     stroke_width = max(3, int(scribble.strokeWidth or 10))
+    stroke_radius = max(2, stroke_width // 2) + 0.5
+    stroke = rasterize_thick_polyline(points, width, height, stroke_radius)
 
-    # Draw lines between consecutive points
-    for i in range(len(transformed_points) - 1):
-        draw.line(
-            [transformed_points[i], transformed_points[i + 1]],
-            fill=255,
-            width=stroke_width,
-        )
-
-    # Draw circles at each point for smooth appearance
-    point_radius = max(2, stroke_width // 2)
-    for x, y in transformed_points:
-        bbox = [
-            x - point_radius,
-            y - point_radius,
-            x + point_radius,
-            y + point_radius,
-        ]
-        draw.ellipse(bbox, fill=255)
-
-    return mask
+    return PILImage.fromarray(stroke.astype(np.uint8) * 255)
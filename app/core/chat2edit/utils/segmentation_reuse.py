@@ -0,0 +1,118 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+from app.core.chat2edit.models import Box, Image, Object, Point
+from app.core.chat2edit.utils.spatial_index import (
+    BBox,
+    get_box_bbox,
+    get_objects_at_point,
+    get_objects_in_box,
+    get_spatial_index,
+)
+from app.env import SEGMENTATION_REUSE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+ReuseListener = Callable[[Object], None]
+
+_reuse_listener: ContextVar[Optional[ReuseListener]] = ContextVar(
+    "segmentation_reuse_listener", default=None
+)
+
+
+@contextmanager
+def use_reuse_listener(listener: Optional[ReuseListener]) -> Iterator[None]:
+    """Have `segment_object` report each object it reuses to `listener`."""
+    token = _reuse_listener.set(listener)
+    try:
+        yield
+    finally:
+        _reuse_listener.reset(token)
+
+
+def report_reused_object(obj: Object) -> None:
+    listener = _reuse_listener.get()
+    if listener is not None:
+        listener(obj)
+
+
+def find_reusable_object(
+    image: Image,
+    box: Optional[Box] = None,
+    positive_points: Optional[List[Point]] = None,
+    negative_points: Optional[List[Point]] = None,
+    threshold: float = SEGMENTATION_REUSE_THRESHOLD,
+) -> Optional[Object]:
+    """Find an already segmented object that the prompts select with high confidence.
+
+    A box must fit the object's bbox with an IoU of at least `threshold`, and
+    at least `threshold` of the positive points must lie on its mask. No
+    negative point may lie on the mask. Scribble prompts are not reused.
+
+    Returns:
+        The matching object, or None if the image should be segmented again
+    """
+    if box is None and not positive_points:
+        return None
+
+    if positive_points:
+        candidates = get_objects_at_point(image, positive_points[0])
+    else:
+        candidates = get_objects_in_box(image, box)
+
+    for candidate in candidates:
+        confidence = _get_selection_confidence(
+            image, candidate, box, positive_points, negative_points
+        )
+        if confidence >= threshold:
+            logger.debug(
+                "Reusing segmented object %s (confidence %.2f)", candidate.id, confidence
+            )
+            return candidate
+
+    return None
+
+
+def _get_selection_confidence(
+    image: Image,
+    obj: Object,
+    box: Optional[Box],
+    positive_points: Optional[List[Point]],
+    negative_points: Optional[List[Point]],
+) -> float:
+    entry = get_spatial_index(image).get_entry(obj)
+
+    def is_on_mask(point: Point) -> bool:
+        return entry.contains(point.left + image.width / 2, point.top + image.height / 2)
+
+    if any(is_on_mask(point) for point in negative_points or []):
+        return 0.0
+
+    confidence = 1.0
+    if box is not None:
+        confidence = min(confidence, _get_bbox_iou(entry.bbox, get_box_bbox(image, box)))
+    if positive_points:
+        hits = sum(is_on_mask(point) for point in positive_points)
+        confidence = min(confidence, hits / len(positive_points))
+    return confidence
+
+
+def _get_bbox_iou(object_bbox: BBox, box_bbox: BBox) -> float:
+    intersection_width = min(object_bbox[2], box_bbox[2]) - max(
+        object_bbox[0], box_bbox[0]
+    )
+    intersection_height = min(object_bbox[3], box_bbox[3]) - max(
+        object_bbox[1], box_bbox[1]
+    )
+    if intersection_width <= 0 or intersection_height <= 0:
+        return 0.0
+
+    intersection = intersection_width * intersection_height
+    union = (
+        (object_bbox[2] - object_bbox[0]) * (object_bbox[3] - object_bbox[1])
+        + (box_bbox[2] - box_bbox[0]) * (box_bbox[3] - box_bbox[1])
+        - intersection
+    )
+    return intersection / union if union > 0 else 0.0
@@ -0,0 +1,344 @@
+import math
+from collections import defaultdict
+from operator import attrgetter
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.chat2edit.models import Box, Image, Object, Point
+from app.core.chat2edit.utils.object_utils import get_object_rle_mask
+
+# Side of a uniform grid cell in image pixels
+GRID_CELL_SIZE = 64
+
+BBox = Tuple[float, float, float, float]
+
+# Attributes that move an object's mask on the image. `rle_mask` and `src`
+# compare by identity first, so unchanged masks are cheap to check.
+_get_object_signature = attrgetter(
+    "left",
+    "top",
+    "width",
+    "height",
+    "scaleX",
+    "scaleY",
+    "angle",
+    "flipX",
+    "flipY",
+    "rle_mask",
+    "src",
+)
+
+
+class _IndexedObject:
+    """An object's placement on the image and its lazily loaded mask runs."""
+
+    def __init__(self, image: Image, obj: Object) -> None:
+        self.obj = obj
+        self.signature = _get_object_signature(obj)
+
+        self.center_x = obj.left + image.width / 2
+        self.center_y = obj.top + image.height / 2
+        self.scale_x = (obj.scaleX or 1) * (-1 if obj.flipX else 1)
+        self.scale_y = (obj.scaleY or 1) * (-1 if obj.flipY else 1)
+        radians = math.radians(obj.angle or 0)
+        self.cos = math.cos(radians)
+        self.sin = math.sin(radians)
+        self.bbox = self._get_bbox()
+
+        self._run_ends: Optional[np.ndarray] = None
+        self._mask_size: Optional[Tuple[int, int]] = None
+
+    def contains(self, x: float, y: float) -> bool:
+        """Check whether the image pixel center (x, y) is on the object's mask."""
+        if not (self.bbox[0] <= x < self.bbox[2] and self.bbox[1] <= y < self.bbox[3]):
+            return False
+
+        run_ends = self._get_run_ends()
+        mask_height, mask_width = self._mask_size
+        u, v = self._to_mask_coords(np.array([x]), np.array([y]))
+        col, row = int(np.floor(u[0])), int(np.floor(v[0]))
+        if not (0 <= col < mask_width and 0 <= row < mask_height):
+            return False
+
+        # Runs alternate background/foreground in column-major order
+        run = np.searchsorted(run_ends, col * mask_height + row, side="right")
+        return bool(run % 2 == 1)
+
+    def rasterize(self, window: Tuple[int, int, int, int]) -> np.ndarray:
+        """Sample the object's mask at the pixel centers of an image window."""
+        x1, y1, x2, y2 = window
+        mask = get_object_rle_mask(self.obj).to_mask()
+        mask_height, mask_width = mask.shape
+
+        xs, ys = np.meshgrid(
+            np.arange(x1, x2) + 0.5, np.arange(y1, y2) + 0.5, sparse=False
+        )
+        u, v = self._to_mask_coords(xs, ys)
+        cols = np.floor(u).astype(np.int64)
+        rows = np.floor(v).astype(np.int64)
+        valid = (cols >= 0) & (cols < mask_width) & (rows >= 0) & (rows < mask_height)
+
+        window_mask = np.zeros(xs.shape, dtype=bool)
+        window_mask[valid] = mask[rows[valid], cols[valid]]
+        return window_mask
+
+    def _to_mask_coords(
+        self, xs: np.ndarray, ys: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        dx = xs - self.center_x
+        dy = ys - self.center_y
+        local_x = (dx * self.cos + dy * self.sin) / self.scale_x
+        local_y = (-dx * self.sin + dy * self.cos) / self.scale_y
+
+        if not self.obj.width or not self.obj.height:
+            return np.full_like(dx, -1.0), np.full_like(dy, -1.0)
+
+        mask_height, mask_width = self._get_mask_size()
+        u = (local_x / self.obj.width + 0.5) * mask_width
+        v = (local_y / self.obj.height + 0.5) * mask_height
+        return u, v
+
+    def _get_bbox(self) -> BBox:
+        half_width = abs(self.obj.width * self.scale_x) / 2
+        half_height = abs(self.obj.height * self.scale_y) / 2
+        extent_x = half_width * abs(self.cos) + half_height * abs(self.sin)
+        extent_y = half_width * abs(self.sin) + half_height * abs(self.cos)
+        return (
+            self.center_x - extent_x,
+            self.center_y - extent_y,
+            self.center_x + extent_x,
+            self.center_y + extent_y,
+        )
+
+    def _get_mask_size(self) -> Tuple[int, int]:
+        if self._mask_size is None:
+            self._mask_size = tuple(get_object_rle_mask(self.obj).size)
+        return self._mask_size
+
+    def _get_run_ends(self) -> np.ndarray:
+        if self._run_ends is None:
+            rle_mask = get_object_rle_mask(self.obj)
+            self._mask_size = tuple(rle_mask.size)
+            self._run_ends = np.cumsum(rle_mask.get_counts())
+        return self._run_ends
+
+
+class ObjectSpatialIndex:
+    """Uniform grid over the bboxes of an image's objects, refined by their masks.
+
+    The index is synced against the image before every query; only objects
+    that were added, removed, moved or transformed are re-indexed.
+    """
+
+    def __init__(self, cell_size: int = GRID_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self._entries: Dict[str, _IndexedObject] = {}
+        self._cells: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+        self._order: Dict[str, int] = {}
+        self._objects: List[Object] = []
+        self._objects_version: Optional[Tuple[int, int]] = None
+
+    def __deepcopy__(self, memo: dict) -> "ObjectSpatialIndex":
+        # Entries point at the original objects; the copy re-indexes lazily
+        return ObjectSpatialIndex(self.cell_size)
+
+    def sync(self, image: Image) -> None:
+        objects_version = (id(image.objects), image.objects.version)
+        if objects_version != self._objects_version:
+            # Read without taking ownership so snapshots are not copied
+            self._objects = [
+                obj for obj in image.objects.peek()[1:] if isinstance(obj, Object)
+            ]
+            self._order = {obj.id: i for i, obj in enumerate(self._objects)}
+            self._objects_version = objects_version
+
+            for object_id in [key for key in self._entries if key not in self._order]:
+                self._remove(object_id)
+
+        # Objects are edited in place, so their placement is always rechecked
+        for obj in self._objects:
+            entry = self._entries.get(obj.id)
+            if entry is not None and entry.signature == _get_object_signature(obj):
+                continue
+            if entry is not None:
+                self._remove(obj.id)
+            self._insert(_IndexedObject(image, obj))
+
+    def query_point(self, x: float, y: float) -> List[Object]:
+        """Get the objects whose mask covers (x, y), topmost first."""
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        hits = [
+            self._entries[object_id]
+            for object_id in self._cells.get(cell, ())
+            if self._entries[object_id].contains(x, y)
+        ]
+        return self._sort_topmost_first(hits)
+
+    def query_bbox(self, bbox: BBox) -> List[Object]:
+        """Get the objects whose bbox overlaps `bbox`, topmost first."""
+        candidates = {
+            object_id
+            for cell in self._get_cells(bbox)
+            for object_id in self._cells.get(cell, ())
+        }
+        hits = [
+            self._entries[object_id]
+            for object_id in candidates
+            if _get_bbox_intersection(self._entries[object_id].bbox, bbox) is not None
+        ]
+        return self._sort_topmost_first(hits)
+
+    def get_entry(self, obj: Object) -> Optional[_IndexedObject]:
+        """Get the entry indexed for `obj`, if it is placed the same way."""
+        entry = self._entries.get(obj.id)
+        if entry is None or entry.signature != _get_object_signature(obj):
+            return None
+        return entry
+
+    def _insert(self, entry: _IndexedObject) -> None:
+        self._entries[entry.obj.id] = entry
+        for cell in self._get_cells(entry.bbox):
+            self._cells[cell].add(entry.obj.id)
+
+    def _remove(self, object_id: str) -> None:
+        entry = self._entries.pop(object_id)
+        for cell in self._get_cells(entry.bbox):
+            cell_ids = self._cells.get(cell)
+            if cell_ids is not None:
+                cell_ids.discard(object_id)
+                if not cell_ids:
+                    del self._cells[cell]
+
+    def _get_cells(self, bbox: BBox) -> List[Tuple[int, int]]:
+        x1 = int(bbox[0] // self.cell_size)
+        y1 = int(bbox[1] // self.cell_size)
+        x2 = int(bbox[2] // self.cell_size)
+        y2 = int(bbox[3] // self.cell_size)
+        return [(x, y) for x in range(x1, x2 + 1) for y in range(y1, y2 + 1)]
+
+    def _sort_topmost_first(self, entries: List[_IndexedObject]) -> List[Object]:
+        entries.sort(key=lambda entry: self._order[entry.obj.id], reverse=True)
+        return [entry.obj for entry in entries]
+
+
+def get_spatial_index(image: Image) -> ObjectSpatialIndex:
+    """Get the image's spatial index, synced with its current objects."""
+    if image._spatial_index is None:
+        image._spatial_index = ObjectSpatialIndex()
+    image._spatial_index.sync(image)
+    return image._spatial_index
+
+
+def get_objects_at_point(image: Image, point: Point) -> List[Object]:
+    """Get the objects whose mask covers the point, topmost first."""
+    x = point.left + image.width / 2
+    y = point.top + image.height / 2
+    return _get_own_objects(image, get_spatial_index(image).query_point(x, y))
+
+
+def get_objects_in_box(image: Image, box: Box) -> List[Object]:
+    """Get the objects whose mask overlaps the box, topmost first."""
+    bbox = get_box_bbox(image, box)
+    window = _get_pixel_window(image, bbox)
+    if window is None:
+        return []
+
+    index = get_spatial_index(image)
+    return _get_own_objects(
+        image,
+        [
+            obj
+            for obj in index.query_bbox(bbox)
+            if index.get_entry(obj).rasterize(window).any()
+        ],
+    )
+
+
+def get_mask_iou(image: Image, first: Object, second: Object) -> float:
+    """Get the IoU of two objects' masks as placed on the image."""
+    index = get_spatial_index(image)
+    first_entry = index.get_entry(first) or _IndexedObject(image, first)
+    second_entry = index.get_entry(second) or _IndexedObject(image, second)
+
+    if _get_bbox_intersection(first_entry.bbox, second_entry.bbox) is None:
+        return 0.0
+
+    window = _get_pixel_window(
+        image, _get_bbox_union(first_entry.bbox, second_entry.bbox)
+    )
+    if window is None:
+        return 0.0
+
+    first_mask = first_entry.rasterize(window)
+    second_mask = second_entry.rasterize(window)
+    union = np.count_nonzero(first_mask | second_mask)
+    if union == 0:
+        return 0.0
+    return np.count_nonzero(first_mask & second_mask) / union
+
+
+def get_overlapping_objects(image: Image, obj: Object) -> List[Object]:
+    """Get the image's objects, other than `obj`, whose bbox overlaps it."""
+    index = get_spatial_index(image)
+    entry = index.get_entry(obj) or _IndexedObject(image, obj)
+    return _get_own_objects(
+        image, [other for other in index.query_bbox(entry.bbox) if other.id != obj.id]
+    )
+
+
+def get_box_bbox(image: Image, box: Box) -> BBox:
+    """Get the box's (x1, y1, x2, y2) in image pixels, honoring its origin."""
+    half_width = abs(box.width * (box.scaleX or 1)) / 2
+    half_height = abs(box.height * (box.scaleY or 1)) / 2
+    center_x = box.left + image.width / 2 + _get_origin_offset(box.originX, half_width)
+    center_y = box.top + image.height / 2 + _get_origin_offset(box.originY, half_height)
+    return (
+        center_x - half_width,
+        center_y - half_height,
+        center_x + half_width,
+        center_y + half_height,
+    )
+
+
+def _get_own_objects(image: Image, objects: List[Object]) -> List[Object]:
+    # Index entries may hold objects shared with a snapshot; hand out the
+    # image's own copies
+    return [image.objects.get(obj.id) for obj in objects]
+
+
+def _get_origin_offset(origin: str, half_size: float) -> float:
+    if origin in ("left", "top"):
+        return half_size
+    if origin in ("right", "bottom"):
+        return -half_size
+    return 0.0
+
+
+def _get_pixel_window(image: Image, bbox: BBox) -> Optional[Tuple[int, int, int, int]]:
+    x1 = max(0, int(math.floor(bbox[0])))
+    y1 = max(0, int(math.floor(bbox[1])))
+    x2 = min(int(image.width), int(math.ceil(bbox[2])))
+    y2 = min(int(image.height), int(math.ceil(bbox[3])))
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2, y2
+
+
+def _get_bbox_intersection(first: BBox, second: BBox) -> Optional[BBox]:
+    x1 = max(first[0], second[0])
+    y1 = max(first[1], second[1])
+    x2 = min(first[2], second[2])
+    y2 = min(first[3], second[3])
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2, y2
+
+
+def _get_bbox_union(first: BBox, second: BBox) -> BBox:
+    return (
+        min(first[0], second[0]),
+        min(first[1], second[1]),
+        max(first[2], second[2]),
+        max(first[3], second[3]),
+    )
@@ -0,0 +1,15 @@
+from app.core.versioning.version_store import (
+    MAIN_BRANCH,
+    ImageVersion,
+    VersionNotFoundError,
+    VersionStore,
+    version_store,
+)
+
+__all__ = [
+    "MAIN_BRANCH",
+    "ImageVersion",
+    "VersionNotFoundError",
+    "VersionStore",
+    "version_store",
+]
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from app.core.chat2edit.models import Image
+from app.env import (
+    VERSION_STORE_MAX_IMAGES,
+    VERSION_STORE_MAX_IDLE_SECONDS,
+    VERSION_STORE_MAX_VERSIONS_PER_IMAGE,
+)
+from app.utils.factories import create_uuid4
+
+MAIN_BRANCH = "main"
+
+# Strings at least this long (data URLs) are stored once as shared blobs
+MIN_BLOB_LENGTH = 256
+
+_BLOB_KEY = "$blob"
+
+
+class VersionNotFoundError(FileNotFoundError):
+    pass
+
+
+@dataclass(frozen=True)
+class ImageVersion:
+    id: str
+    image_id: str
+    parent_id: Optional[str]
+    header_key: str
+    object_keys: Tuple[str, ...]
+    message: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class _Repository:
+    heads: Dict[str, Optional[str]] = field(default_factory=dict)
+    redo_stacks: Dict[str, List[str]] = field(default_factory=dict)
+    # Version ids, oldest first
+    version_ids: List[str] = field(default_factory=list)
+    last_used: float = field(default_factory=time.monotonic)
+
+    def get_protected_ids(self) -> FrozenSet[str]:
+        # Versions that branches point at, and can be redone
+        return frozenset(
+            [*filter(None, self.heads.values())]
+            + [version_id for stack in self.redo_stacks.values() for version_id in stack]
+        )
+
+
+@dataclass
+class _Node:
+    data: str  # JSON with blob refs
+    blob_keys: FrozenSet[str]
+
+
+class VersionStore:
+    """In-memory version history for images with structural sharing.
+
+    Versions form a tree per image id. A version only references its image
+    header and objects by content hash, and pixel payloads (data URLs) are
+    stored once as blobs, so a new version costs only what its edit changed.
+    Each branch has a head that can be moved back (undo) and forward (redo).
+
+    Memory is bounded: an image keeps its `max_versions_per_image` newest
+    versions plus those branches and redo stacks point at, and the history
+    of images unused for `max_idle_seconds`, or least recently used beyond
+    `max_images`, is dropped. Nodes and blobs are reference counted and
+    freed with the last version using them.
+    """
+
+    def __init__(
+        self,
+        max_images: int = 256,
+        max_versions_per_image: int = 50,
+        max_idle_seconds: float = 3600.0,
+    ) -> None:
+        self._max_images = max_images
+        self._max_versions_per_image = max_versions_per_image
+        self._max_idle_seconds = max_idle_seconds
+        self._versions: Dict[str, ImageVersion] = {}
+        self._nodes: Dict[str, _Node] = {}  # content key -> node
+        self._node_refs: Counter = Counter()  # content key -> referencing versions
+        self._blobs: Dict[str, str] = {}  # content key -> payload
+        self._blob_refs: Counter = Counter()  # content key -> referencing nodes
+        self._blob_keys: Dict[int, str] = {}  # id(payload) -> content key
+        self._repositories: "OrderedDict[str, _Repository]" = OrderedDict()
+
+    def commit(
+        self,
+        image: Image,
+        branch: str = MAIN_BRANCH,
+        message: Optional[str] = None,
+    ) -> ImageVersion:
+        """Record the image as the new head of `branch`.
+
+        Committing an image identical to the branch head returns the head.
+        """
+        image.check_no_pending_inpaints()
+        repository = self._repositories.setdefault(image.id, _Repository())
+        self._touch(image.id, repository)
+        self._evict_repositories()
+        parent_id = repository.heads.get(branch)
+
+        header_key = self._put_node(image.model_dump(exclude={"objects"}))
+        object_keys = tuple(
+            self._put_node(obj.model_dump()) for obj in image.objects.peek()
+        )
+
+        if parent_id is not None:
+            parent = self._versions[parent_id]
+            if parent.header_key == header_key and parent.object_keys == object_keys:
+                return parent
+
+        version = ImageVersion(
+            id=create_uuid4(),
+            image_id=image.id,
+            parent_id=parent_id,
+            header_key=header_key,
+            object_keys=object_keys,
+            message=message,
+        )
+        self._versions[version.id] = version
+        self._node_refs.update([header_key, *object_keys])
+        repository.version_ids.append(version.id)
+        repository.heads[branch] = version.id
+        repository.redo_stacks[branch] = []
+        self._prune_versions(repository)
+        return version
+
+    def get_version(self, version_id: str) -> ImageVersion:
+        version = self._versions.get(version_id)
+        if version is None:
+            raise VersionNotFoundError(f"Version not found: {version_id}")
+        self._get_repository(version.image_id)
+        return version
+
+    def get_image(self, version_id: str) -> Image:
+        """Rebuild the image recorded by a version."""
+        version = self.get_version(version_id)
+        data = self._get_node(version.header_key)
+        data["objects"] = [self._get_node(key) for key in version.object_keys]
+        return Image.model_validate(data)
+
+    def get_head(self, image_id: str, branch: str = MAIN_BRANCH) -> ImageVersion:
+        head_id = self._get_repository(image_id).heads.get(branch)
+        if head_id is None:
+            raise VersionNotFoundError(f"Branch not found: {branch}")
+        return self._versions[head_id]
+
+    def get_log(self, image_id: str, branch: str = MAIN_BRANCH) -> List[ImageVersion]:
+        """Get the versions on a branch, newest first."""
+        log = []
+        version: Optional[ImageVersion] = self.get_head(image_id, branch)
+        while version is not None:
+            log.append(version)
+            # Pruned versions end the log
+            version = (
+                self._versions.get(version.parent_id) if version.parent_id else None
+            )
+        return log
+
+    def get_branches(self, image_id: str) -> Dict[str, str]:
+        return dict(self._get_repository(image_id).heads)
+
+    def undo(self, image_id: str, branch: str = MAIN_BRANCH) -> ImageVersion:
+        head = self.get_head(image_id, branch)
+        if head.parent_id is None or head.parent_id not in self._versions:
+            raise ValueError(f"Nothing to undo on branch {branch}")
+
+        repository = self._get_repository(image_id)
+        repository.redo_stacks.setdefault(branch, []).append(head.id)
+        repository.heads[branch] = head.parent_id
+        return self._versions[head.parent_id]
+
+    def redo(self, image_id: str, branch: str = MAIN_BRANCH) -> ImageVersion:
+        self.get_head(image_id, branch)
+        repository = self._get_repository(image_id)
+        redo_stack = repository.redo_stacks.get(branch)
+        if not redo_stack:
+            raise ValueError(f"Nothing to redo on branch {branch}")
+
+        repository.heads[branch] = redo_stack.pop()
+        return self._versions[repository.heads[branch]]
+
+    def create_branch(
+        self,
+        image_id: str,
+        name: str,
+        version_id: Optional[str] = None,
+    ) -> ImageVersion:
+        """Create a branch at `version_id`, or at the main branch head."""
+        repository = self._get_repository(image_id)
+        if name in repository.heads:
+            raise ValueError(f"Branch already exists: {name}")
+
+        version = (
+            self.get_version(version_id)
+            if version_id is not None
+            else self.get_head(image_id)
+        )
+        if version.image_id != image_id:
+            raise ValueError(f"Version {version.id} does not belong to image {image_id}")
+
+        repository.heads[name] = version.id
+        repository.redo_stacks[name] = []
+        return version
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "images": len(self._repositories),
+            "versions": len(self._versions),
+            "nodes": len(self._nodes),
+            "node_bytes": sum(len(node.data) for node in self._nodes.values()),
+            "blobs": len(self._blobs),
+            "blob_bytes": sum(len(blob) for blob in self._blobs.values()),
+        }
+
+    def _get_repository(self, image_id: str) -> _Repository:
+        self._evict_repositories()
+        repository = self._repositories.get(image_id)
+        if repository is None:
+            raise VersionNotFoundError(f"No versions recorded for image {image_id}")
+        self._touch(image_id, repository)
+        return repository
+
+    def _touch(self, image_id: str, repository: _Repository) -> None:
+        repository.last_used = time.monotonic()
+        self._repositories.move_to_end(image_id)
+
+    def _evict_repositories(self) -> None:
+        now = time.monotonic()
+        # Least recently used first
+        for image_id, repository in list(self._repositories.items()):
+            over_size = len(self._repositories) > self._max_images
+            if not over_size and now - repository.last_used <= self._max_idle_seconds:
+                break
+            del self._repositories[image_id]
+            self._remove_versions(repository.version_ids)
+
+    def _prune_versions(self, repository: _Repository) -> None:
+        excess = len(repository.version_ids) - self._max_versions_per_image
+        if excess <= 0:
+            return
+
+        protected_ids = repository.get_protected_ids()
+        pruned_ids = []
+        for version_id in repository.version_ids:
+            if len(pruned_ids) == excess:
+                break
+            if version_id not in protected_ids:
+                pruned_ids.append(version_id)
+
+        pruned = set(pruned_ids)
+        repository.version_ids = [
+            version_id for version_id in repository.version_ids if version_id not in pruned
+        ]
+        self._remove_versions(pruned_ids)
+
+    def _remove_versions(self, version_ids: Iterable[str]) -> None:
+        for version_id in version_ids:
+            version = self._versions.pop(version_id)
+            for key in (version.header_key, *version.object_keys):
+                self._release_node(key)
+
+    def _put_node(self, data: Dict[str, Any]) -> str:
+        blob_keys = set()
+        node = json.dumps(self._intern_blobs(data, blob_keys), sort_keys=True)
+        key = hashlib.sha256(node.encode()).hexdigest()
+        if key not in self._nodes:
+            self._nodes[key] = _Node(node, frozenset(blob_keys))
+            self._blob_refs.update(blob_keys)
+        return key
+
+    def _get_node(self, key: str) -> Dict[str, Any]:
+        return self._resolve_blobs(json.loads(self._nodes[key].data))
+
+    def _release_node(self, key: str) -> None:
+        self._node_refs[key] -= 1
+        if self._node_refs[key] > 0:
+            return
+
+        del self._node_refs[key]
+        node = self._nodes.pop(key)
+        for blob_key in node.blob_keys:
+            self._blob_refs[blob_key] -= 1
+            if self._blob_refs[blob_key] > 0:
+                continue
+            del self._blob_refs[blob_key]
+            blob = self._blobs.pop(blob_key)
+            self._blob_keys.pop(id(blob), None)
+
+    def _intern_blobs(self, value: Any, blob_keys: set) -> Any:
+        if isinstance(value, str) and len(value) >= MIN_BLOB_LENGTH:
+            key = self._put_blob(value)
+            blob_keys.add(key)
+            return {_BLOB_KEY: key}
+        if isinstance(value, dict):
+            return {k: self._intern_blobs(v, blob_keys) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._intern_blobs(v, blob_keys) for v in value]
+        return value
+
+    def _resolve_blobs(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1 and _BLOB_KEY in value:
+                return self._blobs[value[_BLOB_KEY]]
+            return {k: self._resolve_blobs(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._resolve_blobs(v) for v in value]
+        return value
+
+    def _put_blob(self, payload: str) -> str:
+        # Snapshots share payload strings, so most lookups skip hashing
+        key = self._blob_keys.get(id(payload))
+        if key is not None and self._blobs.get(key) is payload:
+            return key
+
+        key = hashlib.sha256(payload.encode()).hexdigest()
+        stored = self._blobs.setdefault(key, payload)
+        self._blob_keys[id(stored)] = key
+        return key
+
+
+version_store = VersionStore(
+    max_images=VERSION_STORE_MAX_IMAGES,
+    max_versions_per_image=VERSION_STORE_MAX_VERSIONS_PER_IMAGE,
+    max_idle_seconds=VERSION_STORE_MAX_IDLE_SECONDS,
+)
@@ -1,7 +1,8 @@
+from fastapi import Request
+
 from app.services.chat2edit_service import Chat2EditService
-from app.services.impl.chat2edit_service_impl import Chat2EditServiceImpl
 
 
-def get_chat2edit_service() -> Chat2EditService:
-    """Get standalone chat2edit service (no storage backend needed)."""
-    return Chat2EditServiceImpl()
+def get_chat2edit_service(request: Request) -> Chat2EditService:
+    """Get the app-scoped chat2edit service created in the lifespan."""
+    return request.app.state.chat2edit_service
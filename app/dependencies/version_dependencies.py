@@ -0,0 +1,7 @@
+from app.services.impl.version_service_impl import VersionServiceImpl
+from app.services.version_service import VersionService
+
+
+def get_version_service() -> VersionService:
+    """Get the image version service (history lives in the process-wide store)."""
+    return VersionServiceImpl()
@@ -17,3 +17,80 @@ INFERENCE_API_URL = os.getenv("INFERENCE_API_URL")
 
 if not INFERENCE_API_URL:
     raise ValueError("INFERENCE_API_URL must be set (e.g., http://localhost:8001)")
+
+# Worker processes for CPU-bound image work (object materialization, etc.)
+PROCESS_POOL_MAX_WORKERS = int(os.getenv("PROCESS_POOL_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Minimum confidence for segment_object to return an existing object instead of
+# calling SAM3 again (box IoU / share of positive points on the mask); > 1 disables
+SEGMENTATION_REUSE_THRESHOLD = float(os.getenv("SEGMENTATION_REUSE_THRESHOLD", "0.9"))
+
+# Image version history kept in memory: the newest versions per image (plus
+# branch heads and redo stacks), for the most recently used images, dropping
+# images unused for longer than VERSION_STORE_MAX_IDLE_SECONDS
+VERSION_STORE_MAX_IMAGES = int(os.getenv("VERSION_STORE_MAX_IMAGES", "256"))
+VERSION_STORE_MAX_VERSIONS_PER_IMAGE = int(
+    os.getenv("VERSION_STORE_MAX_VERSIONS_PER_IMAGE", "50")
+)
+VERSION_STORE_MAX_IDLE_SECONDS = float(
+    os.getenv("VERSION_STORE_MAX_IDLE_SECONDS", "3600")
+)
+
+# Record object-clear inpaints as pending holes and run them as one merged call
+# when the pixels are needed (pixel reads, response attachments, returned context)
+DEFERRED_INPAINTING = os.getenv("DEFERRED_INPAINTING", "false").lower() == "true"
+
+# Prefetch the inference requests of later statements in a generated program as
+# soon as their inputs are final, sharing identical deterministic requests within
+# a turn. Statements still run eagerly and in order; nothing is skipped or fused
+INFERENCE_PREFETCH = os.getenv("INFERENCE_PREFETCH", "false").lower() == "true"
+
+# With inference prefetching, stream LLM answers and start the inference requests of
+# each generated statement as soon as it is complete
+STREAMING_SPECULATION = (
+    os.getenv("STREAMING_SPECULATION", "false").lower() == "true"
+)
+
+# LLM clients kept for reuse across requests, and how long an unused one is kept
+LLM_POOL_MAX_SIZE = int(os.getenv("LLM_POOL_MAX_SIZE", "8"))
+LLM_POOL_MAX_IDLE_SECONDS = float(os.getenv("LLM_POOL_MAX_IDLE_SECONDS", "600"))
+
+# Route single-step requests to a faster model of the same provider, keeping
+# the requested model for multi-object or generative requests and for turns
+# that get error feedback
+LLM_ROUTING = os.getenv("LLM_ROUTING", "false").lower() == "true"
+GOOGLE_FAST_MODEL = os.getenv("GOOGLE_FAST_MODEL", "gemini-2.5-flash-lite")
+OPENAI_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini")
+
+# Back slow or failing LLM requests with the other provider, when its key is
+# set: the alternate request starts once the primary one takes longer than the
+# LLM_HEDGE_PERCENTILE of the model's recent latencies (LLM_HEDGE_DEFAULT_SECONDS
+# until enough are known), and the first answer wins
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_DEFAULT_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_SECONDS", "10"))
+GOOGLE_HEDGE_MODEL = os.getenv("GOOGLE_HEDGE_MODEL", "gemini-2.5-flash")
+OPENAI_HEDGE_MODEL = os.getenv("OPENAI_HEDGE_MODEL", "gpt-4o")
+
+# Answer repeated LLM calls of deterministic configurations (temperature 0 or
+# top_k 1) from a cache keyed by model, params and the rendered prompt messages,
+# keeping at most LLM_ANSWER_CACHE_MAX_SIZE answers for LLM_ANSWER_CACHE_TTL_SECONDS
+LLM_ANSWER_CACHE = os.getenv("LLM_ANSWER_CACHE", "false").lower() == "true"
+LLM_ANSWER_CACHE_MAX_SIZE = int(os.getenv("LLM_ANSWER_CACHE_MAX_SIZE", "256"))
+LLM_ANSWER_CACHE_TTL_SECONDS = float(os.getenv("LLM_ANSWER_CACHE_TTL_SECONDS", "3600"))
+
+# Send only the exemplars most relevant to the request (BM25 over exemplar
+# requests, thinking and functions), at most EXEMPLAR_TOP_K of them within an
+# estimated EXEMPLAR_TOKEN_BUDGET tokens
+EXEMPLAR_RETRIEVAL = os.getenv("EXEMPLAR_RETRIEVAL", "false").lower() == "true"
+EXEMPLAR_TOP_K = int(os.getenv("EXEMPLAR_TOP_K", "3"))
+EXEMPLAR_TOKEN_BUDGET = int(os.getenv("EXEMPLAR_TOKEN_BUDGET", "1200"))
+
+# Describe only the functions a request needs in the prompt (keyword intents
+# plus their dependencies); all functions stay callable, and the prompt shows
+# all of them again once the model calls one it was not shown
+FUNCTION_PRUNING = os.getenv("FUNCTION_PRUNING", "false").lower() == "true"
+
+# Answer requests that match a simple command pattern (e.g. "increase brightness
+# by 20%", "flip @object_0 horizontally") with the parsed program, skipping the LLM
+COMMAND_FAST_PATH = os.getenv("COMMAND_FAST_PATH", "false").lower() == "true"
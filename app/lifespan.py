@@ -3,11 +3,18 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.services.impl.chat2edit_service_impl import Chat2EditServiceImpl
+from app.utils.process_pool import shutdown_process_pool
+
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("MIC2E Demo application startup")
+    # Shared by all requests so LLM clients and their connections are reused
+    app.state.chat2edit_service = Chat2EditServiceImpl()
     yield
+    await app.state.chat2edit_service.close()
+    shutdown_process_pool()
     logger.info("MIC2E Demo application shutdown")
@@ -6,6 +6,7 @@ from app.env import ROOT_PATH
 from app.lifespan import lifespan
 from app.routes.chat2edit_routes import router as chat2edit_router
 from app.routes.health_routes import router as health_router
+from app.routes.version_routes import router as version_router
 
 app = FastAPI(
     title="MIC2E Demo",
@@ -26,6 +27,7 @@ app.add_middleware(
 # Include API routers first
 app.include_router(health_router)
 app.include_router(chat2edit_router)
+app.include_router(version_router)
 
 # Mount static files last (catch-all)
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
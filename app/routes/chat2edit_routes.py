@@ -11,6 +11,7 @@ from app.dependencies.chat2edit_dependencies import get_chat2edit_service
 from app.schemas.chat2edit_schemas import (
     Chat2EditGenerateRequestModel,
     Chat2EditGenerateResponseModel,
+    LlmMetricsModel,
 )
 from app.schemas.common_schemas import ResponseModel
 from app.services.chat2edit_service import Chat2EditService
@@ -27,6 +28,13 @@ async def generate(
     return ResponseModel(data=await service.generate(request))
 
 
+@router.get("/llm/metrics", response_model=ResponseModel[LlmMetricsModel])
+async def get_llm_metrics(
+    service: Chat2EditService = Depends(get_chat2edit_service),
+):
+    return ResponseModel(data=service.get_llm_metrics())
+
+
 @router.post("/generate/stream")
 async def generate_stream(
     request: Chat2EditGenerateRequestModel,
@@ -0,0 +1,92 @@
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends
+
+from app.core.versioning import MAIN_BRANCH
+from app.dependencies.version_dependencies import get_version_service
+from app.schemas.common_schemas import ResponseModel
+from app.schemas.version_schemas import (
+    CommitVersionRequestModel,
+    CreateBranchRequestModel,
+    VersionContentModel,
+    VersionModel,
+)
+from app.services.version_service import VersionService
+from app.utils.decorators import handle_exceptions
+
+router = APIRouter(prefix="/api", tags=["versions"])
+
+
+@router.post("/versions", response_model=ResponseModel[VersionModel])
+@handle_exceptions
+async def commit_version(
+    request: CommitVersionRequestModel,
+    service: VersionService = Depends(get_version_service),
+):
+    return ResponseModel(data=service.commit(request))
+
+
+@router.get("/versions/{version_id}", response_model=ResponseModel[VersionContentModel])
+@handle_exceptions
+async def get_version(
+    version_id: str,
+    service: VersionService = Depends(get_version_service),
+):
+    return ResponseModel(data=service.get_version(version_id))
+
+
+@router.get(
+    "/images/{image_id}/versions", response_model=ResponseModel[List[VersionModel]]
+)
+@handle_exceptions
+async def get_version_log(
+    image_id: str,
+    branch: str = MAIN_BRANCH,
+    service: VersionService = Depends(get_version_service),
+):
+    return ResponseModel(data=service.get_log(image_id, branch))
+
+
+@router.get(
+    "/images/{image_id}/branches", response_model=ResponseModel[Dict[str, str]]
+)
+@handle_exceptions
+async def get_branches(
+    image_id: str,
+    service: VersionService = Depends(get_version_service),
+):
+    return ResponseModel(data=service.get_branches(image_id))
+
+
+@router.post("/images/{image_id}/branches", response_model=ResponseModel[VersionModel])
+@handle_exceptions
+async def create_branch(
+    image_id: str,
+    request: CreateBranchRequestModel,
+    service: VersionService = Depends(get_version_service),
+):
+    return ResponseModel(data=service.create_branch(image_id, request))
+
+
+@router.post(
+    "/images/{image_id}/undo", response_model=ResponseModel[VersionContentModel]
+)
+@handle_exceptions
+async def undo(
+    image_id: str,
+    branch: str = MAIN_BRANCH,
+    service: VersionService = Depends(get_version_service),
+):
+    return ResponseModel(data=service.undo(image_id, branch))
+
+
+@router.post(
+    "/images/{image_id}/redo", response_model=ResponseModel[VersionContentModel]
+)
+@handle_exceptions
+async def redo(
+    image_id: str,
+    branch: str = MAIN_BRANCH,
+    service: VersionService = Depends(get_version_service),
+):
+    return ResponseModel(data=service.redo(image_id, branch))
@@ -11,6 +11,7 @@ class AttachmentModel(BaseModel):
     """Attachment with inline content (no file IDs, no storage needed)"""
     filename: str
     content: Dict[str, Any]  # Fig object as JSON
+    version_id: Optional[str] = Field(default=None)  # Set on images returned by the assistant
 
 
 class MessageModel(BaseModel):
@@ -45,15 +46,68 @@ class Chat2EditGenerateRequestModel(BaseModel):
     interactive: bool = Field(default=True)  # Enable interaction features (point, box, scribble)
 
 
+class ExecutionStatsModel(BaseModel):
+    statements: int
+    speculated_statements: int
+    streamed_statements: int
+    discarded_statements: int
+    prefetched_requests: int
+    shared_requests: int
+    wall_seconds: float
+    saved_seconds: float
+    speedup: float
+
+
+class LlmTierMetricsModel(BaseModel):
+    turns: int
+    calls: int
+    mean_seconds: Optional[float] = Field(default=None)
+    p50_seconds: Optional[float] = Field(default=None)
+    p95_seconds: Optional[float] = Field(default=None)
+
+
+class LlmHedgingMetricsModel(BaseModel):
+    calls: int
+    hedged: int
+    failovers: int
+    alternate_wins: int
+
+
+class LlmAnswerCacheMetricsModel(BaseModel):
+    enabled: bool
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+class LlmMetricsModel(BaseModel):
+    routing: bool
+    escalations: int
+    tiers: Dict[str, LlmTierMetricsModel]
+    hedging: LlmHedgingMetricsModel
+    answer_cache: LlmAnswerCacheMetricsModel
+
+
 class Chat2EditGenerateResponseModel(BaseModel):
     message: Optional[MessageModel] = Field(default=None)
     cycle: ChatCycle
     context: Dict[str, Any]  # Inline context returned to browser
+    execution_stats: Optional[ExecutionStatsModel] = Field(default=None)  # Set with inference prefetching
+    reused_object_ids: List[str] = Field(default_factory=list)  # Objects segment_object reused instead of segmenting
 
 
 class Chat2EditProgressEventModel(BaseModel):
     type: Literal[
-        "request", "prompt", "answer", "extract", "execute", "complete", "error"
+        "request",
+        "prompt",
+        "answer",
+        "usage",
+        "extract",
+        "execute",
+        "complete",
+        "error",
     ]
     message: Optional[str] = Field(default=None)
     # Use Any here because some callbacks currently publish strings or other
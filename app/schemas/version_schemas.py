@@ -0,0 +1,28 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.versioning import MAIN_BRANCH
+
+
+class VersionModel(BaseModel):
+    id: str
+    image_id: str
+    parent_id: Optional[str] = Field(default=None)
+    message: Optional[str] = Field(default=None)
+    created_at: float
+
+
+class VersionContentModel(VersionModel):
+    content: Dict[str, Any]  # Fig object as JSON
+
+
+class CommitVersionRequestModel(BaseModel):
+    content: Dict[str, Any]  # Fig object as JSON
+    branch: str = Field(default=MAIN_BRANCH)
+    message: Optional[str] = Field(default=None)
+
+
+class CreateBranchRequestModel(BaseModel):
+    name: str
+    version_id: Optional[str] = Field(default=None)  # Main branch head if omitted
@@ -4,6 +4,7 @@ from typing import AsyncGenerator, Dict, Any
 from app.schemas.chat2edit_schemas import (
     Chat2EditGenerateRequestModel,
     Chat2EditGenerateResponseModel,
+    LlmMetricsModel,
 )
 
 
@@ -19,4 +20,14 @@ class Chat2EditService(ABC):
         self, request: Chat2EditGenerateRequestModel
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """Generate response with progress events streamed via async generator."""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_llm_metrics(self) -> LlmMetricsModel:
+        """Get LLM call counts and latencies per model tier."""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release the resources kept across requests."""
+        pass
@@ -1,26 +1,74 @@
 import asyncio
-from typing import Any, AsyncGenerator, Dict, Optional
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
 
 from chat2edit import Chat2Edit, Chat2EditCallbacks
+from chat2edit.execution.strategies import DefaultExecutionStrategy, ExecutionStrategy
 from chat2edit.models import ExecutionBlock, Message
-from chat2edit.prompting.llms import GoogleLlm, Llm, OpenAILlm
+from chat2edit.prompting.llms import Llm
 from pydantic import TypeAdapter
 
+from app.core.chat2edit.llms import (
+    LlmAnswerCache,
+    LlmHedger,
+    LlmPool,
+    LlmRoute,
+    LlmRouter,
+    LlmUsage,
+    StreamingGoogleLlm,
+    StreamingOpenAILlm,
+    get_credential_scope,
+    use_cache_hit_listener,
+    use_stream_listener,
+    use_usage_listener,
+)
+from app.core.chat2edit.mic2e_chat2edit import Mic2eChat2Edit
 from app.core.chat2edit.mic2e_context_provider import Mic2eContextProvider
 from app.core.chat2edit.mic2e_context_strategy import CONTEXT_TYPE, Mic2eContextStrategy
+from app.core.chat2edit.mic2e_execution_strategy import Mic2eExecutionStrategy
 from app.core.chat2edit.mic2e_prompting_strategy import Mic2ePromptingStrategy
 from app.core.chat2edit.models import Image
-from app.env import GOOGLE_API_KEY, OPENAI_API_KEY
+from app.core.chat2edit.utils import materialize_pending_inpaints_in_values
+from app.core.chat2edit.utils.segmentation_reuse import use_reuse_listener
+from app.core.versioning import version_store
+from app.env import (
+    COMMAND_FAST_PATH,
+    GOOGLE_API_KEY,
+    GOOGLE_FAST_MODEL,
+    GOOGLE_HEDGE_MODEL,
+    INFERENCE_PREFETCH,
+    LLM_ANSWER_CACHE,
+    LLM_ANSWER_CACHE_MAX_SIZE,
+    LLM_ANSWER_CACHE_TTL_SECONDS,
+    LLM_HEDGE_DEFAULT_SECONDS,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGING,
+    LLM_POOL_MAX_IDLE_SECONDS,
+    LLM_POOL_MAX_SIZE,
+    LLM_ROUTING,
+    OPENAI_API_KEY,
+    OPENAI_FAST_MODEL,
+    OPENAI_HEDGE_MODEL,
+    STREAMING_SPECULATION,
+)
 from app.schemas.chat2edit_schemas import (
     AttachmentModel,
     Chat2EditGenerateRequestModel,
     Chat2EditGenerateResponseModel,
+    ExecutionStatsModel,
+    LlmAnswerCacheMetricsModel,
     LlmConfig,
+    LlmHedgingMetricsModel,
+    LlmMetricsModel,
+    LlmTierMetricsModel,
     MessageModel,
 )
 from app.services.chat2edit_service import Chat2EditService
 from app.utils.factories import create_uuid4
 
+logger = logging.getLogger(__name__)
+
 
 class Chat2EditServiceImpl(Chat2EditService):
     """Standalone service implementation - no storage backend needed."""
@@ -28,6 +76,57 @@ class Chat2EditServiceImpl(Chat2EditService):
     def __init__(self):
         self._context_strategy = Mic2eContextStrategy()
         self._prompting_strategy = Mic2ePromptingStrategy()
+        self._llm_pool = LlmPool(
+            self._create_llm,
+            max_size=LLM_POOL_MAX_SIZE,
+            max_idle_seconds=LLM_POOL_MAX_IDLE_SECONDS,
+        )
+        self._llm_router = LlmRouter(
+            {"google": GOOGLE_FAST_MODEL, "openai": OPENAI_FAST_MODEL}
+        )
+        self._llm_hedger = LlmHedger(
+            percentile=LLM_HEDGE_PERCENTILE, default_delay=LLM_HEDGE_DEFAULT_SECONDS
+        )
+        self._llm_answer_cache = LlmAnswerCache(
+            max_size=LLM_ANSWER_CACHE_MAX_SIZE, ttl_seconds=LLM_ANSWER_CACHE_TTL_SECONDS
+        )
+        for interactive in (True, False):
+            self._build_prompt_prefix(interactive)
+
+    async def close(self) -> None:
+        await self._llm_pool.close()
+
+    def get_llm_metrics(self) -> LlmMetricsModel:
+        return LlmMetricsModel(
+            routing=LLM_ROUTING,
+            escalations=self._llm_router.escalations,
+            tiers={
+                tier: LlmTierMetricsModel(
+                    turns=stats.turns,
+                    calls=stats.calls,
+                    mean_seconds=(
+                        stats.total_seconds / stats.calls if stats.calls else None
+                    ),
+                    p50_seconds=stats.get_percentile(50),
+                    p95_seconds=stats.get_percentile(95),
+                )
+                for tier, stats in self._llm_router.stats.items()
+            },
+            hedging=LlmHedgingMetricsModel(
+                calls=self._llm_hedger.stats.calls,
+                hedged=self._llm_hedger.stats.hedged,
+                failovers=self._llm_hedger.stats.failovers,
+                alternate_wins=self._llm_hedger.stats.alternate_wins,
+            ),
+            answer_cache=LlmAnswerCacheMetricsModel(
+                enabled=LLM_ANSWER_CACHE,
+                size=len(self._llm_answer_cache),
+                hits=self._llm_answer_cache.stats.hits,
+                misses=self._llm_answer_cache.stats.misses,
+                evictions=self._llm_answer_cache.stats.evictions,
+                expirations=self._llm_answer_cache.stats.expirations,
+            ),
+        )
 
     async def generate(
         self, request: Chat2EditGenerateRequestModel
@@ -35,24 +134,38 @@ class Chat2EditServiceImpl(Chat2EditService):
         """Generate a Chat2Edit response without progress tracking."""
         
         # Create context provider with interactive setting
-        context_provider = Mic2eContextProvider(interactive=request.interactive)
-
-        chat2edit = Chat2Edit(
-            llm=self._create_llm(request.llm_config),
-            context_provider=context_provider,
-            context_strategy=self._context_strategy,
-            prompting_strategy=self._prompting_strategy,
-            config=request.chat2edit_config,
+        context_provider = Mic2eContextProvider(
+            interactive=request.interactive, query=request.message.text
         )
+        execution_strategy = self._create_execution_strategy()
 
         message = self._create_request_message(request.message)
         context = request.context or {}
         # Validate and convert context dicts to Image/Entity objects before using
         context = self._context_strategy.filter_context(context)
+        self._set_speculation_context(execution_strategy, context)
+        reused_object_ids: List[str] = []
 
-        response, cycle, updated_context = await chat2edit.generate(
-            message, request.history, context
-        )
+        try:
+            async with self._lease_llm(request.llm_config, message) as llm:
+                chat2edit = Mic2eChat2Edit(
+                    llm=llm,
+                    context_provider=context_provider,
+                    context_strategy=self._context_strategy,
+                    prompting_strategy=self._prompting_strategy,
+                    execution_strategy=execution_strategy,
+                    config=request.chat2edit_config,
+                    fast_path=COMMAND_FAST_PATH,
+                )
+                with use_stream_listener(
+                    self._get_stream_listener(execution_strategy)
+                ), use_reuse_listener(lambda obj: reused_object_ids.append(obj.id)):
+                    response, cycle, updated_context = await chat2edit.generate(
+                        message, request.history, context
+                    )
+            await self._materialize_pending_inpaints(response, updated_context)
+        finally:
+            self._close_execution_strategy(execution_strategy)
 
         return Chat2EditGenerateResponseModel(
             cycle=cycle,
@@ -60,6 +173,8 @@ class Chat2EditServiceImpl(Chat2EditService):
                 self._create_response_message(response) if response else None
             ),
             context=updated_context,
+            execution_stats=self._get_execution_stats(execution_strategy),
+            reused_object_ids=reused_object_ids,
         )
     
     async def generate_with_progress(
@@ -72,31 +187,52 @@ class Chat2EditServiceImpl(Chat2EditService):
         generation_task = None
         
         try:
-            # Create callbacks that enqueue progress events
-            callbacks = self._create_streaming_callbacks(progress_queue)
+            # Create callbacks that enqueue progress events, marking the
+            # answers served from the LLM answer cache
+            cached_answers: List[Message] = []
+            callbacks = self._create_streaming_callbacks(progress_queue, cached_answers)
             
             # Create context provider with interactive setting
-            context_provider = Mic2eContextProvider(interactive=request.interactive)
-            
-            chat2edit = Chat2Edit(
-                llm=self._create_llm(request.llm_config),
-                context_provider=context_provider,
-                context_strategy=self._context_strategy,
-                prompting_strategy=self._prompting_strategy,
-                config=request.chat2edit_config,
-                callbacks=callbacks,
+            context_provider = Mic2eContextProvider(
+                interactive=request.interactive, query=request.message.text
             )
+            execution_strategy = self._create_execution_strategy()
 
             message = self._create_request_message(request.message)
             context = request.context or {}
             # Validate and convert context dicts to Image/Entity objects before using
             context = self._context_strategy.filter_context(context)
+            self._set_speculation_context(execution_strategy, context)
+            reused_object_ids: List[str] = []
             
             # Start generation in background
             async def run_generation():
                 try:
-                    response, cycle, updated_context = await chat2edit.generate(
-                        message, request.history, context
+                    async with self._lease_llm(request.llm_config, message) as llm:
+                        chat2edit = Mic2eChat2Edit(
+                            llm=llm,
+                            context_provider=context_provider,
+                            context_strategy=self._context_strategy,
+                            prompting_strategy=self._prompting_strategy,
+                            execution_strategy=execution_strategy,
+                            config=request.chat2edit_config,
+                            callbacks=callbacks,
+                            fast_path=COMMAND_FAST_PATH,
+                        )
+                        with use_stream_listener(
+                            self._get_stream_listener(execution_strategy)
+                        ), use_usage_listener(
+                            self._create_usage_listener(progress_queue)
+                        ), use_cache_hit_listener(
+                            cached_answers.append
+                        ), use_reuse_listener(
+                            lambda obj: reused_object_ids.append(obj.id)
+                        ):
+                            response, cycle, updated_context = await chat2edit.generate(
+                                message, request.history, context
+                            )
+                    await self._materialize_pending_inpaints(
+                        response, updated_context
                     )
                     
                     result = Chat2EditGenerateResponseModel(
@@ -105,6 +241,10 @@ class Chat2EditServiceImpl(Chat2EditService):
                             self._create_response_message(response) if response else None
                         ),
                         context=updated_context,
+                        execution_stats=self._get_execution_stats(
+                            execution_strategy
+                        ),
+                        reused_object_ids=reused_object_ids,
                     )
                     
                     # Enqueue completion event
@@ -120,6 +260,7 @@ class Chat2EditServiceImpl(Chat2EditService):
                         "message": str(e),
                     })
                 finally:
+                    self._close_execution_strategy(execution_strategy)
                     # Signal end of stream
                     await progress_queue.put(None)
             
@@ -141,18 +282,173 @@ class Chat2EditServiceImpl(Chat2EditService):
             if generation_task and not generation_task.done():
                 generation_task.cancel()
 
+    def _build_prompt_prefix(self, interactive: bool) -> None:
+        context_provider = Mic2eContextProvider(interactive=interactive)
+        # Chat2Edit contextualizes the shared exemplars when constructed
+        Chat2Edit(
+            context_provider=context_provider,
+            context_strategy=self._context_strategy,
+            prompting_strategy=self._prompting_strategy,
+        )
+        self._prompting_strategy.get_prompt_prefix(
+            context_provider.get_exemplars(), context_provider.get_context()
+        )
+
+    @asynccontextmanager
+    async def _lease_llm(
+        self, config: LlmConfig, message: Message
+    ) -> AsyncIterator[Llm]:
+        # Without routing every turn uses the requested model, the strong tier
+        route = (
+            self._llm_router.route(message, config)
+            if LLM_ROUTING
+            else LlmRoute("strong", config)
+        )
+        async with AsyncExitStack() as stack:
+            llm = await self._enter_llm(stack, route.config)
+            escalation_llm = None
+            if route.escalation_config is not None:
+                escalation_llm = await self._enter_llm(stack, route.escalation_config)
+            yield self._llm_router.create_llm(route, llm, escalation_llm)
+
+    async def _enter_llm(self, stack: AsyncExitStack, config: LlmConfig) -> Llm:
+        llm = await stack.enter_async_context(self._llm_pool.lease(config))
+        alternate_config = self._get_alternate_config(config) if LLM_HEDGING else None
+        if alternate_config is None:
+            if LLM_ANSWER_CACHE:
+                llm = self._llm_answer_cache.wrap(self._get_cache_scope(config), llm)
+            return llm
+
+        alternate_llm = await stack.enter_async_context(
+            self._llm_pool.lease(alternate_config)
+        )
+        # Each request stores its answer under its own model and key, while
+        # lookups happen outside the hedge so hits are not counted as
+        # hedged model latencies
+        if LLM_ANSWER_CACHE:
+            llm = self._llm_answer_cache.wrap(
+                self._get_cache_scope(config), llm, lookup=False
+            )
+            alternate_llm = self._llm_answer_cache.wrap(
+                self._get_cache_scope(alternate_config), alternate_llm, lookup=False
+            )
+        llm = self._llm_hedger.wrap((config.provider, config.model), llm, alternate_llm)
+        if LLM_ANSWER_CACHE:
+            llm = self._llm_answer_cache.wrap(
+                self._get_cache_scope(config), llm, store=False
+            )
+        return llm
+
+    def _get_cache_scope(self, config: LlmConfig) -> str:
+        return get_credential_scope(config.provider, self._get_api_key(config))
+
+    def _get_alternate_config(self, config: LlmConfig) -> Optional[LlmConfig]:
+        # The other provider, with the server's key
+        if config.provider == "google" and OPENAI_API_KEY:
+            return LlmConfig(provider="openai", model=OPENAI_HEDGE_MODEL)
+        if config.provider == "openai" and GOOGLE_API_KEY:
+            return LlmConfig(provider="google", model=GOOGLE_HEDGE_MODEL)
+        return None
+
     def _create_llm(self, config: LlmConfig) -> Llm:
         if config.provider == "openai":
-            llm = OpenAILlm(config.model, **config.params)
-            llm.set_api_key(config.api_key or OPENAI_API_KEY)
+            llm = StreamingOpenAILlm(config.model, **config.params)
+            llm.set_api_key(self._get_api_key(config))
             return llm
         elif config.provider == "google":
-            llm = GoogleLlm(config.model, **config.params)
-            llm.set_api_key(config.api_key or GOOGLE_API_KEY)
+            llm = StreamingGoogleLlm(config.model, **config.params)
+            llm.set_api_key(self._get_api_key(config))
             return llm
         else:
             raise ValueError(f"Invalid LLM provider: {config.provider}")
 
+    def _get_api_key(self, config: LlmConfig) -> Optional[str]:
+        if config.api_key:
+            return config.api_key
+        if config.provider == "openai":
+            return OPENAI_API_KEY
+        if config.provider == "google":
+            return GOOGLE_API_KEY
+        return None
+
+    async def _materialize_pending_inpaints(
+        self, response: Optional[Message], context: Dict[str, Any]
+    ) -> None:
+        """Fill deferred inpaint holes before images leave the service."""
+        attachments = response.attachments if response else []
+        await materialize_pending_inpaints_in_values([attachments, context])
+
+    def _create_execution_strategy(self) -> ExecutionStrategy:
+        if INFERENCE_PREFETCH:
+            return Mic2eExecutionStrategy()
+        return DefaultExecutionStrategy()
+
+    def _create_usage_listener(
+        self, progress_queue: asyncio.Queue
+    ) -> Callable[[LlmUsage], None]:
+        def on_usage(usage: LlmUsage) -> None:
+            try:
+                progress_queue.put_nowait({
+                    "type": "usage",
+                    "message": (
+                        f"{usage.cached_prompt_tokens} of {usage.prompt_tokens} "
+                        "prompt tokens served from the provider cache"
+                    ),
+                    "data": {
+                        "prompt_tokens": usage.prompt_tokens,
+                        "cached_prompt_tokens": usage.cached_prompt_tokens,
+                        "output_tokens": usage.output_tokens,
+                        "cache_hit_ratio": usage.cache_hit_ratio,
+                    },
+                })
+            except asyncio.QueueFull:
+                print("Warning: Progress queue full, dropping usage event")
+
+        return on_usage
+
+    def _get_stream_listener(
+        self, strategy: ExecutionStrategy
+    ) -> Optional[Callable[[str], None]]:
+        # Stream answers into the execution strategy to start requests early
+        if STREAMING_SPECULATION and isinstance(strategy, Mic2eExecutionStrategy):
+            return strategy.feed_answer
+        return None
+
+    def _set_speculation_context(
+        self, strategy: ExecutionStrategy, context: Dict[str, Any]
+    ) -> None:
+        if isinstance(strategy, Mic2eExecutionStrategy):
+            strategy.set_context(context)
+
+    def _close_execution_strategy(self, strategy: ExecutionStrategy) -> None:
+        if isinstance(strategy, Mic2eExecutionStrategy):
+            strategy.close()
+
+    def _get_execution_stats(
+        self, strategy: ExecutionStrategy
+    ) -> Optional[ExecutionStatsModel]:
+        if not isinstance(strategy, Mic2eExecutionStrategy):
+            return None
+
+        stats = strategy.stats
+        logger.info(
+            f"Executed {stats.statements} statements "
+            f"({stats.speculated_statements} speculated, "
+            f"{stats.streamed_statements} prefetched while streaming) in "
+            f"{stats.wall_seconds:.2f}s, speedup {stats.speedup:.2f}x"
+        )
+        return ExecutionStatsModel(
+            statements=stats.statements,
+            speculated_statements=stats.speculated_statements,
+            streamed_statements=stats.streamed_statements,
+            discarded_statements=stats.discarded_statements,
+            prefetched_requests=stats.prefetched_requests,
+            shared_requests=stats.shared_requests,
+            wall_seconds=stats.wall_seconds,
+            saved_seconds=stats.saved_seconds,
+            speedup=stats.speedup,
+        )
+
     def _create_request_message(self, message: MessageModel) -> Message:
         """Convert MessageModel with inline content to Chat2Edit Message."""
         attachments = [
@@ -166,14 +462,21 @@ class Chat2EditServiceImpl(Chat2EditService):
         attachments = [
             AttachmentModel(
                 filename=f"{create_uuid4()}.fig.json",
-                content=image.model_dump()
+                content=image.model_dump(),
+                version_id=version_store.commit(image, message=message.text).id,
             )
             for image in message.attachments
         ]
         return MessageModel(text=message.text, attachments=attachments)
 
-    def _create_streaming_callbacks(self, progress_queue: asyncio.Queue) -> Chat2EditCallbacks:
-        """Create callbacks that enqueue progress events for SSE streaming."""
+    def _create_streaming_callbacks(
+        self, progress_queue: asyncio.Queue, cached_answers: List[Message]
+    ) -> Chat2EditCallbacks:
+        """Create callbacks that enqueue progress events for SSE streaming.
+
+        Answers in `cached_answers` are reported as served from the LLM
+        answer cache.
+        """
         
         # Track last event to prevent duplicates
         last_event_hash = [None]  # Use list to allow mutation in closure
@@ -208,7 +511,12 @@ class Chat2EditServiceImpl(Chat2EditService):
             _enqueue_progress("prompt", message="Prompt created", data=message.model_dump())
 
         def on_answer(message: Message) -> None:
-            _enqueue_progress("answer", message="Answer received", data=message.model_dump())
+            cached = any(answer is message for answer in cached_answers)
+            _enqueue_progress(
+                "answer",
+                message="Answer served from the cache" if cached else "Answer received",
+                data={**message.model_dump(), "cached": cached},
+            )
 
         def on_extract(code: str) -> None:
             _enqueue_progress("extract", message="Code extracted", data=code)
@@ -0,0 +1,66 @@
+from typing import Dict, List
+
+from pydantic import TypeAdapter
+
+from app.core.chat2edit.models import Image
+from app.core.versioning import ImageVersion, VersionStore, version_store
+from app.schemas.version_schemas import (
+    CommitVersionRequestModel,
+    CreateBranchRequestModel,
+    VersionContentModel,
+    VersionModel,
+)
+from app.services.version_service import VersionService
+
+
+class VersionServiceImpl(VersionService):
+    """Image version history backed by the process-wide version store."""
+
+    def __init__(self, store: VersionStore = version_store):
+        self._store = store
+
+    def commit(self, request: CommitVersionRequestModel) -> VersionModel:
+        image = TypeAdapter(Image).validate_python(request.content)
+        version = self._store.commit(image, request.branch, request.message)
+        return self._create_version_model(version)
+
+    def get_version(self, version_id: str) -> VersionContentModel:
+        return self._create_version_content_model(self._store.get_version(version_id))
+
+    def get_log(self, image_id: str, branch: str) -> List[VersionModel]:
+        return [
+            self._create_version_model(version)
+            for version in self._store.get_log(image_id, branch)
+        ]
+
+    def get_branches(self, image_id: str) -> Dict[str, str]:
+        return self._store.get_branches(image_id)
+
+    def create_branch(
+        self, image_id: str, request: CreateBranchRequestModel
+    ) -> VersionModel:
+        version = self._store.create_branch(image_id, request.name, request.version_id)
+        return self._create_version_model(version)
+
+    def undo(self, image_id: str, branch: str) -> VersionContentModel:
+        return self._create_version_content_model(self._store.undo(image_id, branch))
+
+    def redo(self, image_id: str, branch: str) -> VersionContentModel:
+        return self._create_version_content_model(self._store.redo(image_id, branch))
+
+    def _create_version_model(self, version: ImageVersion) -> VersionModel:
+        return VersionModel(
+            id=version.id,
+            image_id=version.image_id,
+            parent_id=version.parent_id,
+            message=version.message,
+            created_at=version.created_at,
+        )
+
+    def _create_version_content_model(
+        self, version: ImageVersion
+    ) -> VersionContentModel:
+        return VersionContentModel(
+            **self._create_version_model(version).model_dump(),
+            content=self._store.get_image(version.id).model_dump(),
+        )
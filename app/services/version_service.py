@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from app.schemas.version_schemas import (
+    CommitVersionRequestModel,
+    CreateBranchRequestModel,
+    VersionContentModel,
+    VersionModel,
+)
+
+
+class VersionService(ABC):
+    @abstractmethod
+    def commit(self, request: CommitVersionRequestModel) -> VersionModel:
+        pass
+
+    @abstractmethod
+    def get_version(self, version_id: str) -> VersionContentModel:
+        pass
+
+    @abstractmethod
+    def get_log(self, image_id: str, branch: str) -> List[VersionModel]:
+        pass
+
+    @abstractmethod
+    def get_branches(self, image_id: str) -> Dict[str, str]:
+        pass
+
+    @abstractmethod
+    def create_branch(
+        self, image_id: str, request: CreateBranchRequestModel
+    ) -> VersionModel:
+        pass
+
+    @abstractmethod
+    def undo(self, image_id: str, branch: str) -> VersionContentModel:
+        pass
+
+    @abstractmethod
+    def redo(self, image_id: str, branch: str) -> VersionContentModel:
+        pass
@@ -1,11 +1,13 @@
 import base64
 import io
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import numpy as np
 from PIL import Image
-from scipy.ndimage import binary_dilation
+
+from app.utils.mask_utils import dilate_mask, get_dilation_radius
+from app.utils.pixel_kernels import apply_mask_to_alpha
 
 
 def convert_ndarray_to_mask_image(image: np.ndarray) -> Image.Image:
@@ -31,14 +33,6 @@ def convert_normalized_center_to_absolute_corners(
     return xmin, ymin, xmax, ymax
 
 
-def expand_mask_image(mask_image: Image.Image, iterations: int = 10) -> Image.Image:
-    mask_array = np.array(mask_image)
-    binary_mask = (mask_array > 127).astype(np.uint8)
-    expanded_mask = binary_dilation(binary_mask, iterations=iterations).astype(np.uint8)
-    expanded_mask = expanded_mask * 255
-    return Image.fromarray(expanded_mask)
-
-
 def convert_image_to_data_url(image: Image.Image) -> str:
     buffer = io.BytesIO()
     image.save(buffer, format="PNG")
@@ -56,12 +50,15 @@ def convert_data_url_to_image(data_url: str) -> Image.Image:
     return Image.open(io.BytesIO(image_data))
 
 
-def expand_mask_image(mask_image: Image.Image, iterations: int = 10) -> Image.Image:
-    mask_array = np.array(mask_image)
-    binary_mask = (mask_array > 127).astype(np.uint8)
-    expanded_mask = binary_dilation(binary_mask, iterations=iterations).astype(np.uint8)
-    expanded_mask = expanded_mask * 255
-    return Image.fromarray(expanded_mask)
+def expand_mask_image(
+    mask_image: Image.Image, iterations: Optional[int] = None
+) -> Image.Image:
+    """Dilate a mask image; the radius scales with resolution unless given."""
+    if iterations is None:
+        iterations = get_dilation_radius(mask_image.width, mask_image.height)
+    binary_mask = np.array(mask_image) > 127
+    expanded_mask = dilate_mask(binary_mask, iterations)
+    return Image.fromarray(expanded_mask.astype(np.uint8) * 255)
 
 
 def extract_masked_region(
@@ -79,35 +76,20 @@ def extract_masked_region(
     Returns:
         Cropped image with only the masked region visible
     """
-    # Ensure original image is RGB/RGBA
+    # Crop first so the mask is only applied inside the bounding box
+    x1, y1, x2, y2 = bbox
     if original_image.mode not in ("RGB", "RGBA"):
         original_image = original_image.convert("RGB")
-
-    # Convert mask to binary (0 or 255)
+    if original_image.mode == "RGB":
+        original_image = original_image.convert("RGBA")
     if mask.mode != "L":
         mask = mask.convert("L")
 
-    # Create a copy of the original image
-    masked_image = original_image.copy()
-
-    # Apply mask: set pixels outside mask to transparent/black
-    if masked_image.mode == "RGB":
-        masked_image = masked_image.convert("RGBA")
-
-    # Convert mask to numpy array for processing
-    mask_array = np.array(mask)
-    # Normalize mask to 0-1 range
-    mask_array = (mask_array > 127).astype(np.uint8)
-
-    # Apply mask to alpha channel
-    img_array = np.array(masked_image)
-    img_array[:, :, 3] = img_array[:, :, 3] * mask_array
-
-    masked_image = Image.fromarray(img_array)
-
-    # Crop to bounding box
-    x1, y1, x2, y2 = bbox
-    cropped_image = masked_image.crop((x1, y1, x2, y2))
+    cropped_array = apply_mask_to_alpha(
+        np.array(original_image.crop((x1, y1, x2, y2))),
+        np.array(mask.crop((x1, y1, x2, y2))),
+    )
+    cropped_image = Image.fromarray(cropped_array, "RGBA")
 
     # Convert back to RGB if needed (remove alpha if fully opaque)
     if cropped_image.mode == "RGBA":
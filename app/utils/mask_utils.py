@@ -0,0 +1,77 @@
+from typing import Literal, Optional, Tuple
+
+import numpy as np
+from scipy.ndimage import distance_transform_cdt, distance_transform_edt
+
+# Dilation radius used for a 1024px image; scaled linearly with resolution
+BASE_DILATION_RADIUS = 10
+BASE_DILATION_RESOLUTION = 1024
+
+
+def get_dilation_radius(
+    width: int,
+    height: int,
+    base_radius: int = BASE_DILATION_RADIUS,
+    base_resolution: int = BASE_DILATION_RESOLUTION,
+) -> int:
+    """Scale the dilation radius with the longer image side."""
+    return max(1, round(base_radius * max(width, height) / base_resolution))
+
+
+def get_mask_bbox(mask: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """Get the (x1, y1, x2, y2) bbox of a boolean mask, PIL `getbbox` style."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def dilate_mask(
+    mask: np.ndarray,
+    radius: int,
+    bbox: Optional[Tuple[int, int, int, int]] = None,
+    metric: Literal["taxicab", "euclidean"] = "taxicab",
+) -> np.ndarray:
+    """Dilate a boolean mask by `radius` pixels.
+
+    Only the bbox padded by `radius` is processed, and the dilation is a
+    threshold on a distance transform, so the cost does not grow with the
+    radius. The "taxicab" metric gives the same result as
+    `scipy.ndimage.binary_dilation(mask, iterations=radius)`.
+
+    Args:
+        mask: Boolean (height, width) mask
+        radius: Dilation radius in pixels
+        bbox: Known (x1, y1, x2, y2) bbox of the mask, computed if omitted
+        metric: Distance metric defining the shape of the dilation
+
+    Returns:
+        Dilated boolean mask of the same shape
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if bbox is None:
+        bbox = get_mask_bbox(mask)
+    if bbox is None or radius <= 0:
+        return mask.copy()
+
+    height, width = mask.shape
+    x1 = max(0, bbox[0] - radius)
+    y1 = max(0, bbox[1] - radius)
+    x2 = min(width, bbox[2] + radius)
+    y2 = min(height, bbox[3] + radius)
+
+    window = mask[y1:y2, x1:x2]
+    # A bbox clamped to the canvas can be empty or miss the mask; without a
+    # mask pixel the distance transform is -1 everywhere
+    if not window.any():
+        return mask.copy()
+
+    if metric == "taxicab":
+        distances = distance_transform_cdt(~window, metric="taxicab")
+    else:
+        distances = distance_transform_edt(~window)
+
+    dilated_mask = np.zeros_like(mask)
+    dilated_mask[y1:y2, x1:x2] = distances <= radius
+    return dilated_mask
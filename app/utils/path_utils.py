@@ -0,0 +1,188 @@
+import re
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+# Number of chords per segment in the arc-length lookup table
+ARC_LENGTH_LUT_RESOLUTION = 16
+
+# Adaptive sampling: one sample every `spacing` pixels of path length
+DEFAULT_SAMPLE_SPACING = 2.0
+MIN_PATH_SAMPLES = 2
+MAX_PATH_SAMPLES = 2000
+
+_COMMAND_ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "Q": 4, "C": 6, "Z": 0}
+_PATH_TOKEN_PATTERN = re.compile(
+    r"[A-Za-z]|[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?"
+)
+
+PathCommands = Union[str, Sequence[Sequence[Union[str, float]]]]
+
+
+class ParsedPath:
+    """A path as cubic Bezier control points with an arc-length lookup table.
+
+    Lines and quadratic curves are elevated to cubics so every segment is
+    evaluated by the same vectorized formula.
+    """
+
+    def __init__(self, segments: np.ndarray) -> None:
+        self.segments = segments  # (n, 4, 2) control points
+
+        ts = np.linspace(0.0, 1.0, ARC_LENGTH_LUT_RESOLUTION + 1)
+        lut_points = _evaluate_cubics(segments[:, None], ts[None, :])
+        chords = np.linalg.norm(np.diff(lut_points, axis=1), axis=2).ravel()
+        self._cumulative_lengths = np.concatenate(([0.0], np.cumsum(chords)))
+        self.length = float(self._cumulative_lengths[-1])
+
+    def get_sample_count(self, spacing: float = DEFAULT_SAMPLE_SPACING) -> int:
+        count = int(np.ceil(self.length / spacing)) + 1
+        return int(np.clip(count, MIN_PATH_SAMPLES, MAX_PATH_SAMPLES))
+
+    def sample(self, num_samples: Optional[int] = None) -> np.ndarray:
+        """Sample points evenly spaced by arc length.
+
+        Args:
+            num_samples: Number of points, adaptive to the path length if omitted
+
+        Returns:
+            (num_samples, 2) array of (x, y) points, empty if the path has
+            zero length
+        """
+        if num_samples is None:
+            num_samples = self.get_sample_count()
+        if self.length == 0:
+            return np.empty((0, 2))
+
+        targets = np.linspace(0.0, self.length, num_samples)
+        chord_indices = np.clip(
+            np.searchsorted(self._cumulative_lengths, targets, side="right") - 1,
+            0,
+            len(self._cumulative_lengths) - 2,
+        )
+        chord_starts = self._cumulative_lengths[chord_indices]
+        chord_lengths = self._cumulative_lengths[chord_indices + 1] - chord_starts
+        fractions = np.divide(
+            targets - chord_starts,
+            chord_lengths,
+            out=np.zeros_like(targets),
+            where=chord_lengths > 0,
+        )
+
+        segment_indices = chord_indices // ARC_LENGTH_LUT_RESOLUTION
+        ts = (
+            chord_indices % ARC_LENGTH_LUT_RESOLUTION + np.clip(fractions, 0.0, 1.0)
+        ) / ARC_LENGTH_LUT_RESOLUTION
+        return _evaluate_cubics(self.segments[segment_indices], ts)
+
+
+def parse_path(path: PathCommands) -> Optional[ParsedPath]:
+    """Parse Fabric.js path commands or an SVG path string.
+
+    Supports M, L, H, V, Q, C and Z in absolute and relative form. Returns
+    None for anything else (arcs, smooth curves) so callers can fall back to
+    a full SVG parser.
+    """
+    commands = _tokenize_svg_path(path) if isinstance(path, str) else path
+    if commands is None:
+        return None
+
+    segments: List[List[List[float]]] = []
+    start = current = np.zeros(2)
+
+    for command in commands:
+        if not command:
+            continue
+        name = str(command[0])
+        kind = name.upper()
+        if kind not in _COMMAND_ARITY:
+            return None
+
+        try:
+            values = [float(value) for value in command[1:]]
+        except (TypeError, ValueError):
+            return None
+
+        arity = _COMMAND_ARITY[kind]
+        if kind == "Z":
+            if not np.array_equal(current, start):
+                segments.append(_line_to_cubic(current, start))
+            current = start
+            continue
+        if arity == 0 or len(values) % arity != 0 or not values:
+            return None
+
+        for i in range(0, len(values), arity):
+            args = np.array(values[i : i + arity])
+            relative = name.islower()
+
+            if kind == "H":
+                end = np.array([args[0] + (current[0] if relative else 0), current[1]])
+            elif kind == "V":
+                end = np.array([current[0], args[0] + (current[1] if relative else 0)])
+            else:
+                args = args.reshape(-1, 2) + (current if relative else 0)
+                end = args[-1]
+
+            if kind == "M" and i == 0:
+                start = current = end
+                continue
+            if kind in ("M", "L", "H", "V"):
+                segments.append(_line_to_cubic(current, end))
+            elif kind == "Q":
+                segments.append(_quadratic_to_cubic(current, args[0], end))
+            else:
+                segments.append(
+                    [current.tolist(), args[0].tolist(), args[1].tolist(), end.tolist()]
+                )
+            current = end
+
+    if not segments:
+        return None
+
+    return ParsedPath(np.array(segments, dtype=np.float64))
+
+
+def _tokenize_svg_path(path: str) -> Optional[List[List[Union[str, float]]]]:
+    tokens = _PATH_TOKEN_PATTERN.findall(path)
+    commands: List[List[Union[str, float]]] = []
+    for token in tokens:
+        if token.isalpha():
+            commands.append([token])
+        elif commands:
+            commands[-1].append(token)
+        else:
+            return None
+    return commands
+
+
+def _line_to_cubic(p0: np.ndarray, p1: np.ndarray) -> List[List[float]]:
+    return [
+        p0.tolist(),
+        (p0 + (p1 - p0) / 3).tolist(),
+        (p0 + 2 * (p1 - p0) / 3).tolist(),
+        p1.tolist(),
+    ]
+
+
+def _quadratic_to_cubic(
+    p0: np.ndarray, control: np.ndarray, p1: np.ndarray
+) -> List[List[float]]:
+    return [
+        p0.tolist(),
+        (p0 + 2 * (control - p0) / 3).tolist(),
+        (p1 + 2 * (control - p1) / 3).tolist(),
+        p1.tolist(),
+    ]
+
+
+def _evaluate_cubics(control_points: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """Evaluate cubic Beziers; `control_points[..., i, :]` broadcasts against `ts`."""
+    ts = ts[..., None]
+    mt = 1.0 - ts
+    return (
+        mt**3 * control_points[..., 0, :]
+        + 3 * mt**2 * ts * control_points[..., 1, :]
+        + 3 * mt * ts**2 * control_points[..., 2, :]
+        + ts**3 * control_points[..., 3, :]
+    )
@@ -0,0 +1,163 @@
+"""
+Pixel kernels for the hot image paths.
+
+Each kernel has a Numba implementation, compiled with `cache=True` so the JIT
+cost is paid once per deployment rather than once per process, and a pure
+NumPy implementation with identical output that is used when Numba is not
+available.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+
+
+def _njit(func):
+    if numba is None:
+        return None
+    return numba.njit(cache=True, nogil=True)(func)
+
+
+# Masked-region extraction ----------------------------------------------------
+
+
+def apply_mask_to_alpha(
+    image: np.ndarray, mask: np.ndarray, threshold: int = 127
+) -> np.ndarray:
+    """Zero the alpha of RGBA pixels whose mask value is not above `threshold`.
+
+    Args:
+        image: (height, width, 4) uint8 RGBA pixels
+        mask: (height, width) uint8 mask
+
+    Returns:
+        New (height, width, 4) uint8 RGBA array
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    mask = np.ascontiguousarray(mask, dtype=np.uint8)
+    if _apply_mask_to_alpha_numba is not None:
+        return _apply_mask_to_alpha_numba(image, mask, threshold)
+    return _apply_mask_to_alpha_numpy(image, mask, threshold)
+
+
+def _apply_mask_to_alpha_numpy(
+    image: np.ndarray, mask: np.ndarray, threshold: int
+) -> np.ndarray:
+    result = image.copy()
+    result[:, :, 3] = np.where(mask > threshold, image[:, :, 3], 0)
+    return result
+
+
+@_njit
+def _apply_mask_to_alpha_numba(image, mask, threshold):
+    height, width, _ = image.shape
+    result = image.copy()
+    for y in range(height):
+        for x in range(width):
+            if mask[y, x] <= threshold:
+                result[y, x, 3] = 0
+    return result
+
+
+# Thick-polyline rasterisation ------------------------------------------------
+
+
+def rasterize_thick_polyline(
+    points: np.ndarray, width: int, height: int, radius: float
+) -> np.ndarray:
+    """Rasterize a polyline with round caps and joins into a boolean mask.
+
+    A pixel is set when its center lies within `radius` of any segment.
+
+    Args:
+        points: (n, 2) array of (x, y) pixel coordinates
+        width: Mask width
+        height: Mask height
+        radius: Half of the stroke width
+
+    Returns:
+        (height, width) boolean mask
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+    if points.shape[0] == 0:
+        return np.zeros((height, width), dtype=bool)
+    if _rasterize_thick_polyline_numba is not None:
+        return _rasterize_thick_polyline_numba(points, width, height, float(radius))
+    return _rasterize_thick_polyline_numpy(points, width, height, float(radius))
+
+
+def _get_segment_window(
+    ax: float, ay: float, bx: float, by: float, width: int, height: int, radius: float
+) -> Tuple[int, int, int, int]:
+    x1 = max(0, int(np.ceil(min(ax, bx) - radius)))
+    y1 = max(0, int(np.ceil(min(ay, by) - radius)))
+    x2 = min(width, int(np.floor(max(ax, bx) + radius)) + 1)
+    y2 = min(height, int(np.floor(max(ay, by) + radius)) + 1)
+    return x1, y1, x2, y2
+
+
+def _rasterize_thick_polyline_numpy(
+    points: np.ndarray, width: int, height: int, radius: float
+) -> np.ndarray:
+    mask = np.zeros((height, width), dtype=bool)
+    segments = (
+        np.stack((points[:-1], points[1:]), axis=1)
+        if points.shape[0] > 1
+        else np.stack((points, points), axis=1)
+    )
+    for (ax, ay), (bx, by) in segments:
+        x1, y1, x2, y2 = _get_segment_window(ax, ay, bx, by, width, height, radius)
+        if x1 >= x2 or y1 >= y2:
+            continue
+        xs = np.arange(x1, x2, dtype=np.float64)[None, :]
+        ys = np.arange(y1, y2, dtype=np.float64)[:, None]
+        dx = bx - ax
+        dy = by - ay
+        length_squared = dx * dx + dy * dy
+        if length_squared > 0:
+            t = np.clip(((xs - ax) * dx + (ys - ay) * dy) / length_squared, 0.0, 1.0)
+        else:
+            t = np.zeros((y2 - y1, x2 - x1))
+        distance_squared = (xs - ax - t * dx) ** 2 + (ys - ay - t * dy) ** 2
+        mask[y1:y2, x1:x2] |= distance_squared <= radius * radius
+    return mask
+
+
+@_njit
+def _rasterize_thick_polyline_numba(points, width, height, radius):
+    mask = np.zeros((height, width), dtype=np.bool_)
+    radius_squared = radius * radius
+    num_points = points.shape[0]
+    num_segments = max(1, num_points - 1)
+    for i in range(num_segments):
+        ax = points[i, 0]
+        ay = points[i, 1]
+        bx = points[min(i + 1, num_points - 1), 0]
+        by = points[min(i + 1, num_points - 1), 1]
+        x1 = max(0, int(np.ceil(min(ax, bx) - radius)))
+        y1 = max(0, int(np.ceil(min(ay, by) - radius)))
+        x2 = min(width, int(np.floor(max(ax, bx) + radius)) + 1)
+        y2 = min(height, int(np.floor(max(ay, by) + radius)) + 1)
+        dx = bx - ax
+        dy = by - ay
+        length_squared = dx * dx + dy * dy
+        for y in range(y1, y2):
+            for x in range(x1, x2):
+                if mask[y, x]:
+                    continue
+                t = 0.0
+                if length_squared > 0:
+                    t = ((x - ax) * dx + (y - ay) * dy) / length_squared
+                    t = min(1.0, max(0.0, t))
+                px = x - ax - t * dx
+                py = y - ay - t * dy
+                if px * px + py * py <= radius_squared:
+                    mask[y, x] = True
+    return mask
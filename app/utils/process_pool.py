@@ -0,0 +1,64 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from app.env import PROCESS_POOL_MAX_WORKERS
+
+# (shared memory name, shape, dtype) - enough for a worker to rebuild the array
+SharedArray = Tuple[str, Tuple[int, ...], str]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the app-wide process pool, creating it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        # Spawn instead of fork: the parent runs an event loop and HTTP clients
+        # whose state must not be duplicated into the workers.
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PROCESS_POOL_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+@contextmanager
+def share_ndarray(array: np.ndarray) -> Iterator[SharedArray]:
+    """Copy an array into shared memory for the duration of the block.
+
+    Workers attach to the block by name with `attach_ndarray` instead of
+    receiving a pickled copy of the pixels with every task.
+    """
+    shm = SharedMemory(create=True, size=max(1, array.nbytes))
+    try:
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        shared[...] = array
+        del shared
+        yield shm.name, array.shape, array.dtype.str
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def attach_ndarray(shared_array: SharedArray) -> Iterator[np.ndarray]:
+    name, shape, dtype = shared_array
+    shm = SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        yield array
+        del array
+    finally:
+        shm.close()
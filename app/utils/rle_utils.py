@@ -0,0 +1,130 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def encode_mask_to_rle_counts(mask: np.ndarray) -> List[int]:
+    """Encode a binary mask as COCO run lengths.
+
+    Runs are taken in column-major order and alternate background/foreground,
+    starting with background (so the first count may be 0).
+    """
+    flat = np.asarray(mask, dtype=bool).ravel(order="F")
+    if flat.size == 0:
+        return []
+
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    boundaries = np.concatenate(([0], changes, [flat.size]))
+    counts = np.diff(boundaries)
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts.tolist()
+
+
+def decode_rle_counts_to_mask(
+    counts: Sequence[int], size: Tuple[int, int]
+) -> np.ndarray:
+    """Decode COCO run lengths into a boolean (height, width) mask."""
+    height, width = size
+    values = np.zeros(len(counts), dtype=bool)
+    values[1::2] = True
+    flat = np.repeat(values, counts)
+    return flat.reshape((height, width), order="F")
+
+
+def get_rle_counts_bbox(
+    counts: Sequence[int], size: Tuple[int, int]
+) -> Optional[Tuple[int, int, int, int]]:
+    """Get the (x1, y1, x2, y2) bbox of the foreground, PIL `getbbox` style.
+
+    Works on the runs only; the mask is never decoded.
+    """
+    height, _ = size
+    counts = np.asarray(counts, dtype=np.int64)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+
+    fg_starts = starts[1::2]
+    fg_ends = ends[1::2] - 1
+    nonempty = counts[1::2] > 0
+    if not np.any(nonempty):
+        return None
+
+    fg_starts = fg_starts[nonempty]
+    fg_ends = fg_ends[nonempty]
+
+    # A run that wraps into the next column covers both the last and first row
+    wraps = fg_ends // height > fg_starts // height
+    y_min = np.where(wraps, 0, fg_starts % height)
+    y_max = np.where(wraps, height - 1, fg_ends % height)
+
+    return (
+        int(fg_starts.min() // height),
+        int(y_min.min()),
+        int(fg_ends.max() // height) + 1,
+        int(y_max.max()) + 1,
+    )
+
+
+def get_rle_counts_area(counts: Sequence[int]) -> int:
+    return int(sum(counts[1::2]))
+
+
+def paste_rle_counts(
+    canvas: np.ndarray,
+    counts: Sequence[int],
+    size: Tuple[int, int],
+    x: int,
+    y: int,
+) -> np.ndarray:
+    """OR an RLE mask into a boolean canvas at (x, y), clipping to the canvas."""
+    height, width = size
+    canvas_height, canvas_width = canvas.shape[:2]
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(canvas_width, x + width), min(canvas_height, y + height)
+    if x1 >= x2 or y1 >= y2:
+        return canvas
+
+    mask = decode_rle_counts_to_mask(counts, size)
+    canvas[y1:y2, x1:x2] |= mask[y1 - y : y2 - y, x1 - x : x2 - x]
+    return canvas
+
+
+def compress_rle_counts(counts: Sequence[int]) -> str:
+    """Compress run lengths into the COCO (pycocotools) counts string."""
+    chars = []
+    for i, count in enumerate(counts):
+        value = int(count)
+        if i > 2:
+            value -= int(counts[i - 2])
+        more = True
+        while more:
+            char = value & 0x1F
+            value >>= 5
+            more = value != -1 if char & 0x10 else value != 0
+            if more:
+                char |= 0x20
+            chars.append(chr(char + 48))
+    return "".join(chars)
+
+
+def decompress_rle_counts(counts_string: str) -> List[int]:
+    """Inverse of `compress_rle_counts`."""
+    counts: List[int] = []
+    position = 0
+    while position < len(counts_string):
+        value = 0
+        shift = 0
+        more = True
+        while more:
+            char = ord(counts_string[position]) - 48
+            value |= (char & 0x1F) << shift
+            more = bool(char & 0x20)
+            position += 1
+            shift += 5
+            if not more and char & 0x10:
+                value |= -1 << shift
+        if len(counts) > 2:
+            value += counts[-2]
+        counts.append(value)
+    return counts
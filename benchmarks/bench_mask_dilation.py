@@ -0,0 +1,50 @@
+"""Compare `dilate_mask` with `scipy.ndimage.binary_dilation`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_mask_dilation
+"""
+
+from typing import Tuple
+
+import numpy as np
+from scipy.ndimage import binary_dilation
+
+from app.utils.mask_utils import dilate_mask
+from benchmarks.timing import best_of
+
+# (canvas height, width), (object top, left, height, width), radius
+CASES = [
+    ((1024, 1024), (300, 300, 200, 200), 10),
+    ((1024, 1024), (100, 100, 800, 800), 10),
+    ((2160, 3840), (800, 1500, 400, 500), 20),
+    ((2160, 3840), (800, 1500, 400, 500), 40),
+]
+
+
+def create_ellipse_mask(
+    shape: Tuple[int, int], box: Tuple[int, int, int, int]
+) -> np.ndarray:
+    top, left, height, width = box
+    ys, xs = np.ogrid[:height, :width]
+    mask = np.zeros(shape, dtype=bool)
+    mask[top : top + height, left : left + width] = (
+        (ys - height / 2) ** 2 / (height / 2) ** 2
+        + (xs - width / 2) ** 2 / (width / 2) ** 2
+    ) < 1
+    return mask
+
+
+def main() -> None:
+    for shape, box, radius in CASES:
+        mask = create_ellipse_mask(shape, box)
+        baseline = best_of(lambda: binary_dilation(mask, iterations=radius))
+        dilated = best_of(lambda: dilate_mask(mask, radius))
+        print(
+            f"{shape[1]}x{shape[0]}, {box[3]}x{box[2]} object, r={radius}: "
+            f"binary_dilation {baseline:.1f} ms, dilate_mask {dilated:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
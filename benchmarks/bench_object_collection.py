@@ -0,0 +1,85 @@
+"""Compare `ObjectCollection` with the plain object list it replaced.
+
+The baseline is an `Image` whose objects are a plain list again, removing
+and selecting objects by scanning it as before. Run from the repository
+root:
+
+    python -m benchmarks.bench_object_collection
+"""
+
+import time
+from typing import List
+
+from pydantic import Field, field_validator
+
+from app.core.chat2edit.models import Image, Object
+from app.core.chat2edit.models.fabric.objects import FabricObject
+from app.core.chat2edit.models.image import Entity
+from app.core.chat2edit.utils.image_utils import get_own_objects
+from benchmarks.timing import best_of
+
+NUM_OBJECTS = [1000, 5000]
+
+
+class ListImage(Image):
+    objects: List[Entity] = Field(default_factory=list)
+
+    @field_validator("objects", mode="after")
+    @classmethod
+    def _index_objects(cls, objects: List[Entity]) -> List[Entity]:
+        return objects
+
+    def remove_object(self, object: FabricObject) -> "ListImage":
+        self.objects = [obj for obj in self.objects if obj.id != object.id]
+        return self
+
+
+def get_own_objects_from_list(
+    image: ListImage, objects: List[FabricObject]
+) -> List[FabricObject]:
+    object_ids = set(obj.id for obj in objects)
+    return [obj for obj in image.get_objects() if obj.id in object_ids]
+
+
+def create_image(image_class: type, num_objects: int) -> Image:
+    base = {"type": "Image", "src": "data:,", "width": 10, "height": 10, "id": "base"}
+    objects = [
+        Object(src="data:,", id=f"object-{i}", left=i, ephemeral=i % 2 == 0)
+        for i in range(num_objects)
+    ]
+    return image_class(objects=[base, *objects], width=10, height=10)
+
+
+def remove_ephemeral_objects(image_class: type, num_objects: int) -> float:
+    """Best of 3 in milliseconds, on a fresh image each time."""
+    best = float("inf")
+    for _ in range(3):
+        image = create_image(image_class, num_objects)
+        start = time.perf_counter()
+        for obj in image.get_objects():
+            if obj.ephemeral:
+                image.remove_object(obj)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    for num_objects in NUM_OBJECTS:
+        removed_from_list = remove_ephemeral_objects(ListImage, num_objects)
+        removed = remove_ephemeral_objects(Image, num_objects)
+
+        list_image = create_image(ListImage, num_objects)
+        image = create_image(Image, num_objects)
+        selected = image.get_objects()[::50]
+        own_from_list = best_of(lambda: get_own_objects_from_list(list_image, selected))
+        own = best_of(lambda: get_own_objects(image, selected))
+
+        print(
+            f"{num_objects} objects: remove ephemeral list {removed_from_list:.1f} ms, "
+            f"ObjectCollection {removed:.1f} ms; get_own_objects of 1/50 "
+            f"list {own_from_list:.3f} ms, ObjectCollection {own:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare `convert_scribble_to_mask_image` with the PIL rasterizer it replaced.
+
+The baseline samples 500 points with svgpathtools and draws a line and a
+dot per sample with `ImageDraw`. Its chords cut the corners of the curve,
+so the masks are also compared with the baseline sampled as densely as
+`convert_scribble_to_mask_image` samples. Run from the repository root:
+
+    python -m benchmarks.bench_scribble_rasterization
+"""
+
+from typing import List
+
+import numpy as np
+from PIL import Image as PILImage
+from PIL import ImageDraw
+
+from app.core.chat2edit.models.scribble import Scribble
+from app.core.chat2edit.utils import scribble_utils
+from app.core.chat2edit.utils.scribble_utils import convert_scribble_to_mask_image
+from benchmarks.timing import best_of
+
+WIDTH, HEIGHT = 3840, 2160
+NUM_PATH_POINTS = 400
+STROKE_WIDTHS = [10, 40]
+
+
+def create_path(num_points: int) -> List[list]:
+    rng = np.random.default_rng(0)
+    points = np.cumsum(rng.normal(0, 15, (num_points, 2)), axis=0) + [1900, 1000]
+    return [["M", *points[0]]] + [
+        ["Q", *points[i], *points[i + 1]] for i in range(1, num_points - 1, 2)
+    ]
+
+
+def convert_scribble_to_mask_image_with_pil(
+    scribble: Scribble, width: int, height: int, num_samples: int = 500
+) -> PILImage.Image:
+    mask = PILImage.new("L", (width, height), 0)
+    path_string = scribble_utils._convert_path_commands_to_svg_string(scribble.path)
+    sampled_points = scribble_utils._sample_path_points(path_string, num_samples)
+    points = [
+        (max(0, min(int(x), width - 1)), max(0, min(int(y), height - 1)))
+        for x, y in sampled_points
+    ]
+
+    draw = ImageDraw.Draw(mask)
+    stroke_width = max(3, int(scribble.strokeWidth or 10))
+    for start, end in zip(points, points[1:]):
+        draw.line([start, end], fill=255, width=stroke_width)
+    radius = max(2, stroke_width // 2)
+    for x, y in points:
+        draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=255)
+    return mask
+
+
+def convert_scribble_to_mask_image_uncached(
+    scribble: Scribble, width: int, height: int
+) -> PILImage.Image:
+    # Parsed paths are cached per scribble; time the first conversion
+    scribble_utils._scribble_path_cache.clear()
+    return convert_scribble_to_mask_image(scribble, width, height)
+
+
+def main() -> None:
+    path = create_path(NUM_PATH_POINTS)
+    for stroke_width in STROKE_WIDTHS:
+        scribble = Scribble(path=path, strokeWidth=stroke_width)
+        baseline = best_of(
+            lambda: convert_scribble_to_mask_image_with_pil(scribble, WIDTH, HEIGHT),
+            repeat=5,
+        )
+        rasterized = best_of(
+            lambda: convert_scribble_to_mask_image_uncached(scribble, WIDTH, HEIGHT),
+            repeat=5,
+        )
+
+        actual = np.asarray(convert_scribble_to_mask_image(scribble, WIDTH, HEIGHT)) > 0
+        num_samples = len(scribble_utils.sample_scribble_points(scribble))
+        ious = []
+        for baseline_samples in (500, num_samples):
+            expected = np.asarray(
+                convert_scribble_to_mask_image_with_pil(
+                    scribble, WIDTH, HEIGHT, baseline_samples
+                )
+            ) > 0
+            ious.append((expected & actual).sum() / (expected | actual).sum())
+        print(
+            f"{len(path) - 1}-segment path on {WIDTH}x{HEIGHT}, "
+            f"stroke {stroke_width}: PIL {baseline:.0f} ms, "
+            f"convert_scribble_to_mask_image {rasterized:.0f} ms, "
+            f"IoU {ious[0]:.3f} ({ious[1]:.3f} at {num_samples} samples)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import os
+
+# app.env requires the inference service URL; tests never call it
+os.environ.setdefault("INFERENCE_API_URL", "http://localhost:8001")
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+import pytest
+from chat2edit.execution.strategies import DefaultExecutionStrategy
+from chat2edit.models import Message
+
+from app.core.chat2edit.command_parser import parse_command
+from app.core.chat2edit.functions import flip_entities, respond_user, rotate_entities
+from app.core.chat2edit.models import Image, Object
+
+
+def create_context() -> Dict[str, Any]:
+    obj = Object(src="data:,", id="object", inpainted=True)
+    image = Image(
+        objects=[{"type": "Image", "src": "data:,", "id": "base"}, obj],
+        width=10,
+        height=10,
+    )
+    obj.image_id = image.id
+    return {
+        "image_0": image,
+        "object_0": obj,
+        "flip_entities": flip_entities,
+        "rotate_entities": rotate_entities,
+        "respond_user": respond_user,
+    }
+
+
+def run_program(code: str, context: Dict[str, Any]) -> Optional[Message]:
+    async def run() -> Optional[Message]:
+        strategy = DefaultExecutionStrategy()
+        for statement in strategy.parse(code):
+            error, feedback, response, _ = await strategy.execute(
+                strategy.process(statement, context), context
+            )
+            assert error is None and feedback is None
+            if response is not None:
+                return response
+        return None
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "flip the image horizontally",
+        "mirror the image",
+        "flip it upside down",
+        "rotate it 90 degrees",
+        "rotate the photo by 45 degrees counterclockwise",
+    ],
+)
+def test_whole_image_flips_and_rotations_are_left_to_the_llm(text):
+    request = Message(text=text, attachments=["image_0"])
+    assert parse_command(request, ["image_0"]) is None
+
+
+@pytest.mark.parametrize(
+    "text, flip_x, flip_y",
+    [
+        ("flip @object_0 horizontally", True, False),
+        ("mirror @object_0", True, False),
+        ("flip @object_0 upside down", False, True),
+    ],
+)
+def test_object_flip_program_flips_the_object(text, flip_x, flip_y):
+    context = create_context()
+    request = Message(text=text, attachments=["image_0", "object_0"])
+    command = parse_command(request, list(context))
+
+    response = run_program(command.code, context)
+
+    edited = context["image_1"].objects.get("object")
+    assert (edited.flipX, edited.flipY) == (flip_x, flip_y)
+    assert response.attachments == [context["image_1"]]
+    assert not context["image_0"].objects.get("object").flipX
+
+
+@pytest.mark.parametrize(
+    "text, angle",
+    [
+        ("rotate @object_0 90 degrees", 90),
+        ("rotate @object_0 by 30 degrees counterclockwise", -30),
+    ],
+)
+def test_object_rotation_program_rotates_the_object(text, angle):
+    context = create_context()
+    request = Message(text=text, attachments=["image_0", "object_0"])
+    command = parse_command(request, list(context))
+
+    run_program(command.code, context)
+
+    assert context["image_1"].objects.get("object").angle == angle
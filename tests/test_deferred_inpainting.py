@@ -0,0 +1,62 @@
+import asyncio
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+
+from app.clients.inference_client import inference_client
+from app.core.chat2edit.models import Image, Object
+from app.core.chat2edit.models.rle_mask import RleMask
+from app.core.chat2edit.utils import inpaint_utils
+from app.core.versioning.version_store import VersionStore
+from app.utils.image_utils import convert_image_to_data_url
+
+
+@pytest.fixture
+def deferred_image(monkeypatch) -> Image:
+    monkeypatch.setattr(inpaint_utils, "DEFERRED_INPAINTING", True)
+    src = convert_image_to_data_url(PILImage.new("RGB", (10, 10), "black"))
+    base = {"type": "Image", "src": src, "width": 10, "height": 10}
+    image = Image(objects=[base], width=10, height=10)
+    obj = Object(
+        src="data:,",
+        width=4,
+        height=4,
+        image_id=image.id,
+        rle_mask=RleMask.from_mask(np.ones((4, 4), dtype=bool)),
+    )
+    image.add_object(obj)
+    asyncio.run(inpaint_utils.inpaint_uninpainted_objects_in_entities(image, [obj]))
+    return image
+
+
+def test_image_with_pending_inpaints_is_not_serialized(deferred_image):
+    assert deferred_image.has_pending_inpaints()
+    with pytest.raises(ValueError, match="pending inpaints"):
+        deferred_image.model_dump()
+    with pytest.raises(ValueError, match="pending inpaints"):
+        VersionStore().commit(deferred_image)
+
+
+def test_copies_keep_their_own_pending_inpaints(deferred_image):
+    copy = deferred_image.model_copy()
+    copy.defer_inpaint(copy.get_objects())
+
+    assert len(copy.get_pending_inpaints()) == 2
+    assert len(deferred_image.get_pending_inpaints()) == 1
+
+
+def test_materialized_image_is_serialized_with_its_holes_filled(
+    deferred_image, monkeypatch
+):
+    async def object_clear_inpaint(image, mask, prompt):
+        assert np.asarray(mask).any()
+        return PILImage.new("RGB", image.size, "white")
+
+    monkeypatch.setattr(inference_client, "object_clear_inpaint", object_clear_inpaint)
+    asyncio.run(inpaint_utils.materialize_pending_inpaints_in_values([deferred_image]))
+
+    dumped = Image.model_validate(deferred_image.model_dump())
+    assert not deferred_image.has_pending_inpaints()
+    assert dumped.get_image().getpixel((0, 0)) == (255, 255, 255)
+    assert all(obj.inpainted for obj in dumped.get_objects())
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from app.clients.inference_cache import (
+    InferenceRequestCache,
+    claimed_inference_request,
+    shared_inference_request,
+    use_inference_cache,
+)
+
+
+class CountingClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @shared_inference_request
+    async def score(self, prompt: str) -> int:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.calls
+
+    @claimed_inference_request
+    async def generate(self, prompt: str) -> int:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.calls
+
+
+def run_with_cache(work: Callable[[InferenceRequestCache], Awaitable[Any]]) -> Any:
+    async def run() -> Any:
+        cache = InferenceRequestCache()
+        with use_inference_cache(cache):
+            return await work(cache)
+
+    return asyncio.run(run())
+
+
+def test_identical_deterministic_requests_are_shared():
+    client = CountingClient()
+
+    async def work(cache: InferenceRequestCache):
+        return await client.score("cat"), await client.score(prompt="cat")
+
+    assert run_with_cache(work) == (1, 1)
+    assert client.calls == 1
+
+
+def test_identical_generative_requests_sample_anew():
+    client = CountingClient()
+
+    async def work(cache: InferenceRequestCache):
+        return await client.generate("cat"), await client.generate("cat")
+
+    assert run_with_cache(work) == (1, 2)
+    assert client.calls == 2
+
+
+def test_prefetched_generative_request_is_claimed_once():
+    client = CountingClient()
+
+    async def work(cache: InferenceRequestCache):
+        await cache.prefetch(client.generate("cat"))
+        results = await client.generate("cat"), await client.generate("cat")
+        return results, cache.stats.hits
+
+    assert run_with_cache(work) == ((1, 2), 1)
+    assert client.calls == 2
+
+
+def test_unclaimed_prefetches_are_cancelled():
+    client = CountingClient()
+
+    async def work(cache: InferenceRequestCache):
+        prefetch = cache.prefetch(client.generate("cat"))
+        while not client.calls:
+            await asyncio.sleep(0)
+        cache.cancel_pending()
+        await asyncio.gather(prefetch, return_exceptions=True)
+        return await client.generate("cat")
+
+    assert run_with_cache(work) == 2
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from chat2edit.models import Message
+from chat2edit.prompting.llms import Llm
+
+from app.core.chat2edit.llms import LlmAnswerCache, LlmHedger, get_credential_scope
+
+
+class ScriptedLlm(Llm):
+    def __init__(self, model: str, text: str, delay: float = 0.0) -> None:
+        self.model = model
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Message(text=self.text)
+
+    def get_info(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": 0}
+
+
+def generate(llm: Llm) -> str:
+    return asyncio.run(llm.generate(Message(text="prompt"), [])).text
+
+
+def test_answers_are_scoped_by_credential():
+    cache = LlmAnswerCache()
+    llm = ScriptedLlm("model", "answer")
+    first_key = cache.wrap(get_credential_scope("openai", "key-1"), llm)
+    second_key = cache.wrap(get_credential_scope("openai", "key-2"), llm)
+
+    generate(first_key)
+    generate(first_key)
+    generate(second_key)
+
+    assert llm.calls == 2
+    assert cache.stats.hits == 1
+
+
+def test_hedged_answers_are_stored_under_the_llm_that_gave_them():
+    cache = LlmAnswerCache()
+    hedger = LlmHedger(default_delay=0.01)
+    primary = ScriptedLlm("primary", "primary answer", delay=1.0)
+    alternate = ScriptedLlm("alternate", "alternate answer")
+    primary_scope = get_credential_scope("openai", "user-key")
+    alternate_scope = get_credential_scope("google", "server-key")
+
+    hedged = cache.wrap(
+        primary_scope,
+        hedger.wrap(
+            "primary",
+            cache.wrap(primary_scope, primary, lookup=False),
+            cache.wrap(alternate_scope, alternate, lookup=False),
+        ),
+        store=False,
+    )
+
+    assert generate(hedged) == "alternate answer"
+    assert len(cache) == 1
+
+    # The alternate's answer is not replayed as the primary's
+    primary.delay = 0.0
+    assert generate(hedged) == "primary answer"
+    assert generate(hedged) == "primary answer"
+    assert cache.stats.hits == 1
+
+    # It is kept for calls that ask the alternate LLM directly
+    assert generate(cache.wrap(alternate_scope, alternate)) == "alternate answer"
+    assert alternate.calls == 1
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from scipy.ndimage import binary_dilation
+
+from app.utils.mask_utils import dilate_mask, get_mask_bbox
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_dilate_mask_matches_binary_dilation(seed):
+    rng = np.random.default_rng(seed)
+    height, width = rng.integers(5, 80, 2)
+    mask = rng.random((height, width)) < 0.05
+    radius = int(rng.integers(1, 15))
+
+    expected = binary_dilation(mask, iterations=radius)
+    assert (dilate_mask(mask, radius) == expected).all()
+    assert (dilate_mask(mask, radius, bbox=get_mask_bbox(mask)) == expected).all()
+
+
+def test_dilate_mask_euclidean_is_within_taxicab_square():
+    mask = np.zeros((41, 41), dtype=bool)
+    mask[20, 20] = True
+
+    dilated = dilate_mask(mask, 5, metric="euclidean")
+
+    assert dilated[20, 15] and dilated[16, 17]
+    assert not dilated[15, 15]
+
+
+def test_dilate_mask_empty_mask():
+    mask = np.zeros((10, 10), dtype=bool)
+    assert not dilate_mask(mask, 3).any()
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    [
+        # Objects off the canvas, whose bbox was clamped to it
+        (105, 10, 100, 30),
+        (100, 10, 100, 30),
+        (90, 10, 100, 30),
+    ],
+)
+def test_dilate_mask_bbox_without_mask_pixels(bbox):
+    mask = np.zeros((100, 100), dtype=bool)
+    mask[50, 50] = True
+
+    dilated = dilate_mask(mask, 10, bbox=bbox)
+
+    assert (dilated == mask).all()
+    assert dilated is not mask
@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from app.utils.path_utils import parse_path
+
+
+@pytest.mark.parametrize("path", ["M 5 5 L 5 5", [["M", 1, 1], ["L", 1, 1]]])
+def test_sample_zero_length_path_is_empty(path):
+    assert parse_path(path).sample().shape == (0, 2)
+    assert parse_path(path).sample(10).shape == (0, 2)
+
+
+def test_sample_is_evenly_spaced_by_arc_length():
+    points = parse_path("M 0 0 L 10 0 L 10 10").sample(5)
+    assert np.allclose(points, [[0, 0], [5, 0], [10, 0], [10, 5], [10, 10]])
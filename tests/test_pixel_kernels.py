@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from app.utils import pixel_kernels
+
+requires_numba = pytest.mark.skipif(
+    not pixel_kernels.NUMBA_AVAILABLE, reason="numba is not installed"
+)
+
+
+def _apply_mask_to_alpha_reference(image, mask):
+    # What extract_masked_region did before the kernel
+    result = image.copy()
+    result[:, :, 3] = result[:, :, 3] * (mask > 127).astype(np.uint8)
+    return result
+
+
+def _rasterize_thick_polyline_reference(points, width, height, radius):
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float64)
+    mask = np.zeros((height, width), dtype=bool)
+    ends = points[1:] if len(points) > 1 else points
+    for (ax, ay), (bx, by) in zip(points, ends):
+        dx, dy = bx - ax, by - ay
+        length_squared = dx * dx + dy * dy
+        t = 0.0
+        if length_squared > 0:
+            t = np.clip(((xs - ax) * dx + (ys - ay) * dy) / length_squared, 0, 1)
+        mask |= (xs - ax - t * dx) ** 2 + (ys - ay - t * dy) ** 2 <= radius**2
+    return mask
+
+
+def _create_inputs(seed):
+    rng = np.random.default_rng(seed)
+    height, width = (int(n) for n in rng.integers(1, 50, 2))
+    return rng, height, width
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_apply_mask_to_alpha_matches_reference(seed):
+    rng, height, width = _create_inputs(seed)
+    image = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    mask = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    expected = _apply_mask_to_alpha_reference(image, mask)
+
+    assert (pixel_kernels._apply_mask_to_alpha_numpy(image, mask, 127) == expected).all()
+    assert (pixel_kernels.apply_mask_to_alpha(image, mask) == expected).all()
+
+
+@requires_numba
+@pytest.mark.parametrize("seed", range(20))
+def test_apply_mask_to_alpha_numba_matches_numpy(seed):
+    rng, height, width = _create_inputs(seed)
+    image = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    mask = rng.integers(0, 256, (height, width), dtype=np.uint8)
+
+    assert (
+        pixel_kernels._apply_mask_to_alpha_numba(image, mask, 127)
+        == pixel_kernels._apply_mask_to_alpha_numpy(image, mask, 127)
+    ).all()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rasterize_thick_polyline_matches_reference(seed):
+    rng, height, width = _create_inputs(seed)
+    points = rng.random((int(rng.integers(1, 20)), 2)) * [width + 10, height + 10] - 5
+    radius = float(rng.random() * 6)
+    expected = _rasterize_thick_polyline_reference(points, width, height, radius)
+
+    assert (
+        pixel_kernels._rasterize_thick_polyline_numpy(points, width, height, radius)
+        == expected
+    ).all()
+    assert (
+        pixel_kernels.rasterize_thick_polyline(points, width, height, radius)
+        == expected
+    ).all()
+
+
+@requires_numba
+@pytest.mark.parametrize("seed", range(20))
+def test_rasterize_thick_polyline_numba_matches_numpy(seed):
+    rng, height, width = _create_inputs(seed)
+    points = rng.random((int(rng.integers(1, 20)), 2)) * [width + 10, height + 10] - 5
+    radius = float(rng.random() * 6)
+
+    assert (
+        pixel_kernels._rasterize_thick_polyline_numba(points, width, height, radius)
+        == pixel_kernels._rasterize_thick_polyline_numpy(points, width, height, radius)
+    ).all()
+
+
+def test_rasterize_thick_polyline_without_points():
+    mask = pixel_kernels.rasterize_thick_polyline(np.zeros((0, 2)), 10, 8, 2.0)
+    assert mask.shape == (8, 10) and not mask.any()
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from app.utils.rle_utils import (
+    decode_rle_counts_to_mask,
+    encode_mask_to_rle_counts,
+    paste_rle_counts,
+)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_paste_rle_counts_matches_decoded_mask(seed):
+    rng = np.random.default_rng(seed)
+    height, width = (int(n) for n in rng.integers(1, 50, 2))
+    mask = rng.random((height, width)) < 0.4
+    x, y = (int(n) for n in rng.integers(-30, 50, 2))
+    canvas = rng.random((60, 60)) < 0.1
+
+    expected = canvas.copy()
+    for row, column in zip(*np.nonzero(mask)):
+        if 0 <= y + row < 60 and 0 <= x + column < 60:
+            expected[y + row, x + column] = True
+
+    counts = encode_mask_to_rle_counts(mask)
+    assert (decode_rle_counts_to_mask(counts, (height, width)) == mask).all()
+    assert (paste_rle_counts(canvas, counts, (height, width), x, y) == expected).all()
@@ -0,0 +1,52 @@
+import asyncio
+
+import numpy as np
+from chat2edit.execution.strategies import DefaultExecutionStrategy
+
+from app.core.chat2edit.functions import segment_object
+from app.core.chat2edit.models import Image, Object, Point
+from app.core.chat2edit.models.rle_mask import RleMask
+from app.core.chat2edit.utils.segmentation_reuse import use_reuse_listener
+
+
+def create_image() -> Image:
+    image = Image(
+        objects=[{"type": "Image", "src": "data:,", "id": "base"}], width=10, height=10
+    )
+    image.add_object(
+        Object(
+            src="data:,",
+            id="object",
+            width=4,
+            height=4,
+            image_id=image.id,
+            rle_mask=RleMask.from_mask(np.ones((4, 4), dtype=bool)),
+        )
+    )
+    return image
+
+
+def test_reused_objects_are_reported_without_flagging_the_object():
+    image = create_image()
+    context = {
+        "image_0": image,
+        "point_0": Point(left=0, top=0),
+        "segment_object": segment_object,
+    }
+    reused = []
+
+    async def run() -> None:
+        strategy = DefaultExecutionStrategy()
+        code = "object_0 = segment_object(image_0, positive_points=[point_0])"
+        error, feedback, _, _ = await strategy.execute(
+            strategy.process(code, context), context
+        )
+        assert error is None and feedback is None
+
+    with use_reuse_listener(reused.append):
+        asyncio.run(run())
+
+    obj = context["object_0"]
+    assert obj.id == "object"
+    assert [obj.id for obj in reused] == ["object"]
+    assert "segmentation_reused" not in obj.model_dump()
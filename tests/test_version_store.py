@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from app.core.chat2edit.models import Image, Object
+from app.core.versioning import VersionNotFoundError, VersionStore
+
+# Long enough to be stored as a blob
+PAYLOAD = "data:image/png;base64," + "A" * 512
+
+
+def create_image(image_id: str = "image") -> Image:
+    return Image(
+        id=image_id,
+        width=10,
+        height=10,
+        objects=[
+            {"type": "Image", "id": "base", "src": PAYLOAD, "width": 10, "height": 10},
+            Object(id="object", src=PAYLOAD + "0"),
+        ],
+    )
+
+
+def commit_edits(store: VersionStore, image: Image, count: int) -> Image:
+    for i in range(count):
+        image = image.snapshot()
+        image.objects.get("object").src = f"{PAYLOAD}{i + 1}"
+        store.commit(image, message=f"edit {i}")
+    return image
+
+
+def test_round_trip():
+    store = VersionStore()
+    image = create_image()
+
+    version = store.commit(image)
+
+    assert store.get_image(version.id).model_dump_json() == image.model_dump_json()
+
+
+def test_keeps_newest_versions_per_image():
+    store = VersionStore(max_versions_per_image=5)
+    image = create_image()
+    store.commit(image)
+
+    commit_edits(store, image, 20)
+
+    log = store.get_log(image.id)
+    assert [version.message for version in log] == [f"edit {i}" for i in range(19, 14, -1)]
+    # Payloads of pruned versions are freed
+    assert store.get_stats()["blobs"] == 6
+
+    for _ in range(4):
+        store.undo(image.id)
+    with pytest.raises(ValueError):
+        store.undo(image.id)
+    assert store.redo(image.id).message == "edit 16"
+
+
+def test_keeps_branch_heads():
+    store = VersionStore(max_versions_per_image=3)
+    image = create_image()
+    first = store.commit(image)
+    store.create_branch(image.id, "draft", first.id)
+
+    commit_edits(store, image, 10)
+
+    assert store.get_head(image.id, "draft").id == first.id
+    assert store.get_image(first.id).model_dump_json() == image.model_dump_json()
+
+
+def test_evicts_least_recently_used_images():
+    store = VersionStore(max_images=2)
+    store.commit(create_image("first"))
+    store.commit(create_image("second"))
+    store.get_head("first")
+
+    store.commit(create_image("third"))
+
+    assert store.get_stats()["images"] == 2
+    store.get_head("first")
+    with pytest.raises(VersionNotFoundError):
+        store.get_head("second")
+
+
+def test_evicts_idle_images():
+    store = VersionStore(max_idle_seconds=0.05)
+    version = store.commit(create_image("first"))
+    time.sleep(0.1)
+
+    store.commit(create_image("second"))
+
+    with pytest.raises(VersionNotFoundError):
+        store.get_version(version.id)
+    assert store.get_stats()["versions"] == 1